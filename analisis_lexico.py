@@ -1,11 +1,26 @@
 import re  # Se importa el módulo 're' para trabajar con expresiones regulares
+from array import array
+import codecs
+import io
+import mmap
+import os
+import sys
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, islice
+
+from diagnosticos import Diagnostico, ERROR, FaseDetenida, lista_para_fase
+
+# Palabras reservadas del lenguaje (el orden es el de la alternativa RESERVADA de TOKEN_REGEX)
+PALABRAS_RESERVADAS = ("if", "else", "end", "do", "while", "switch", "case", "int", "float", "bool", "main",
+                       "cin", "cout", "then", "repeat", "read", "write", "until", "true", "false", "break")
+RESERVADAS = frozenset(PALABRAS_RESERVADAS)
 
 # Lista de tuplas que define los tipos de tokens junto con su expresión regular
 TOKEN_REGEX = [
     ("COMENTARIO_MULTILINEA", r"/\*.*?\*/", re.DOTALL),  # Comentarios tipo /* ... */
     ("COMENTARIO_SIMPLE", r"//.*"),                     # Comentarios tipo //
     ("CADENA", r'"(?:[^"\\]|\\.)*"'),                   # Cadenas literales entre comillas dobles
-    ("RESERVADA", r"\b(if|else|end|do|while|switch|case|int|float|bool|main|cin|cout|then|repeat|read|write|until|true|false|break)\b"),
+    ("RESERVADA", rf"\b({'|'.join(PALABRAS_RESERVADAS)})\b"),
     ("OPERADOR_ARIT", r"\+\+|--|[+\-*/%^]"),             # Operadores aritméticos
     ("OPERADOR_REL", r"<<|>>|<=|>=|==|!=|<|>"),          # << y >> primero
     ("OPERADOR_LOG", r"&&|\|\||!|&"),                    # Operadores lógicos
@@ -18,6 +33,115 @@ TOKEN_REGEX = [
     ("DESCONOCIDO", r"."),                               # Cualquier otro carácter
 ]
 
+# Códigos enteros pequeños para los tipos de token (índice en TOKEN_REGEX)
+TIPOS_TOKEN = tuple(regla[0] for regla in TOKEN_REGEX)
+CODIGOS_TIPO = {tipo: codigo for codigo, tipo in enumerate(TIPOS_TOKEN)}
+
+class Token:
+    __slots__ = ("tipo", "lexema", "linea", "columna", "clase")
+
+    def __init__(self, tipo, lexema, linea, columna, clase=None):
+        self.tipo = tipo
+        self.lexema = lexema
+        self.linea = linea
+        self.columna = columna
+        # Clase para el analizador sintáctico (ver CLASES), si quien crea el token no la sabe ya
+        self.clase = clase_token(CODIGOS_TIPO[tipo], lexema) if clase is None else clase
+
+    def __str__(self):
+        return f"{self.tipo}('{self.lexema}') en L{self.linea} C{self.columna}"
+
+# Letras de bandera en línea equivalentes a las banderas de 're' usadas en TOKEN_REGEX
+_BANDERAS_EN_LINEA = {re.DOTALL: "s", re.IGNORECASE: "i", re.MULTILINE: "m"}
+
+# Construye una sola expresión regular con un grupo nombrado por tipo de token.
+# La alternancia respeta el orden de TOKEN_REGEX, así que gana la primera regla que coincide,
+# igual que al probar las expresiones una por una.
+def construir_regex_maestra(reglas):
+    partes = []
+    for token_type, regex, *flags in reglas:
+        flag = flags[0] if flags else 0
+        letras = "".join(letra for bandera, letra in _BANDERAS_EN_LINEA.items() if flag & bandera)
+        if letras:
+            regex = f"(?{letras}:{regex})"
+        partes.append(f"(?P<{token_type}>{regex})")
+    return re.compile("|".join(partes))
+
+# Expresión maestra compilada una sola vez al importar el módulo
+REGEX_MAESTRA = construir_regex_maestra(TOKEN_REGEX)
+
+# Expresión que usa el analizador: sin la alternativa RESERVADA y con IDENTIFICADOR en su lugar.
+# Una palabra se reconoce una sola vez como identificador y luego se clasifica con RESERVADAS;
+# el resultado es el mismo porque una palabra reservada solo coincide si es la palabra completa.
+def _reglas_escaner(reglas):
+    identificador = next(regla for regla in reglas if regla[0] == "IDENTIFICADOR")
+    return [identificador if regla[0] == "RESERVADA" else regla
+            for regla in reglas if regla[0] != "IDENTIFICADOR"]
+
+REGEX_ESCANER = construir_regex_maestra(_reglas_escaner(TOKEN_REGEX))
+
+# Operadores y símbolos de longitud fija con su tipo de token. Al reconocerlos gana el más largo,
+# que es lo mismo que da el orden de TOKEN_REGEX ("==" antes que "=", "!=" antes que "!", etc.).
+OPERADORES = {
+    "++": "OPERADOR_ARIT", "--": "OPERADOR_ARIT", "+": "OPERADOR_ARIT", "-": "OPERADOR_ARIT",
+    "*": "OPERADOR_ARIT", "/": "OPERADOR_ARIT", "%": "OPERADOR_ARIT", "^": "OPERADOR_ARIT",
+    "<<": "OPERADOR_REL", ">>": "OPERADOR_REL", "<=": "OPERADOR_REL", ">=": "OPERADOR_REL",
+    "==": "OPERADOR_REL", "!=": "OPERADOR_REL", "<": "OPERADOR_REL", ">": "OPERADOR_REL",
+    "&&": "OPERADOR_LOG", "||": "OPERADOR_LOG", "!": "OPERADOR_LOG", "&": "OPERADOR_LOG",
+    "=": "ASIGNACION",
+    "(": "SIMBOLO", ")": "SIMBOLO", "{": "SIMBOLO", "}": "SIMBOLO", "[": "SIMBOLO", "]": "SIMBOLO",
+    ".": "SIMBOLO", ",": "SIMBOLO", ";": "SIMBOLO", ":": "SIMBOLO",
+}
+
+def construir_trie(operadores):
+    """Trie de caracteres: cada nodo es (tipo del operador que termina ahí o None, hijos)"""
+    raiz = {}
+    for lexema, tipo in operadores.items():
+        hijos, nodo = raiz, None
+        for c in lexema:
+            nodo = hijos.setdefault(c, [None, {}])
+            hijos = nodo[1]
+        nodo[0] = tipo
+    def congelar(hijos):
+        return {c: (tipo, congelar(sub)) for c, (tipo, sub) in hijos.items()}
+    return congelar(raiz)
+
+TRIE_OPERADORES = construir_trie(OPERADORES)
+
+# Clases de token: enteros pequeños que el analizador sintáctico compara en lugar del tipo y el
+# lexema. Cada palabra reservada, operador y símbolo tiene su propia clase y los demás tokens
+# (identificadores, números, cadenas...) usan el código de su tipo. TIPO_CLASE da el código del
+# tipo de cada clase y NOMBRES_CLASE su lexema o el nombre del tipo.
+CLASES_LEXEMA = {lexema: codigo for codigo, lexema in enumerate((*PALABRAS_RESERVADAS, *OPERADORES), len(TIPOS_TOKEN))}
+CLASES = {**CODIGOS_TIPO, **CLASES_LEXEMA}
+NOMBRES_CLASE = tuple(CLASES)
+TIPO_CLASE = tuple(CODIGOS_TIPO[OPERADORES.get(nombre, "RESERVADA")] if nombre in CLASES_LEXEMA else CODIGOS_TIPO[nombre]
+                   for nombre in NOMBRES_CLASE)
+
+def clase_token(codigo, lexema):
+    """Clase de un token con tipo de código 'codigo': la de su lexema solo si es de ese tipo"""
+    clase = CLASES_LEXEMA.get(lexema, codigo)
+    return clase if TIPO_CLASE[clase] == codigo else codigo
+
+def reconocer_operador(text, pos, trie=TRIE_OPERADORES):
+    """Operador más largo que empieza en 'pos': (tipo, fin) o None"""
+    hijos, encontrado, i, length = trie, None, pos, len(text)
+    while hijos and i < length:
+        nodo = hijos.get(text[i])
+        if nodo is None:
+            break
+        i += 1
+        if nodo[0] is not None:
+            encontrado = (nodo[0], i)
+        hijos = nodo[1]
+    return encontrado
+
+# Dígitos consecutivos (usado para calcular hasta dónde examinó un número)
+_DIGITOS = re.compile(r"\d*")
+
+# Tipos de token que se reconocen pero no se agregan a la lista de tokens
+TOKENS_IGNORADOS = frozenset({"ESPACIO", "COMENTARIO_SIMPLE", "COMENTARIO_MULTILINEA"})
+
 # Función para calcular la línea y columna de un carácter en un texto dado su índice
 def calcular_linea_columna(texto, index):
     linea = texto.count('\n', 0, index) + 1
@@ -25,88 +149,672 @@ def calcular_linea_columna(texto, index):
     columna = index + 1 if ultima_nueva_linea == -1 else index - ultima_nueva_linea
     return linea, columna
 
-# Función principal que recibe un texto y devuelve los tokens reconocidos y los errores encontrados
-def tokenize(text):
-    tokens = []  # Lista de tokens válidos
-    errors = []  # Lista de errores
-    pos = 0
+class ArchivoFuente:
+    """Texto fuente con un índice de inicios de línea construido una sola vez.
+
+    Traduce desplazamientos a (línea, columna) con bisect, o avanzando desde la
+    última línea consultada cuando las consultas van hacia adelante (como en tokenize).
+    """
+    def __init__(self, texto):
+        self.texto = texto
+        # inicios_linea[i] es el desplazamiento del primer carácter de la línea i + 1
+        self.inicios_linea = list(accumulate((len(linea) + 1 for linea in texto.split('\n')), initial=0))[:-1]
+        self._linea_previa = 0
+
+    @property
+    def num_lineas(self):
+        return len(self.inicios_linea)
+
+    def linea_columna(self, offset):
+        """Devuelve (línea, columna) empezando en 1, igual que calcular_linea_columna"""
+        inicios = self.inicios_linea
+        i = self._linea_previa
+        if inicios[i] <= offset:
+            # Consulta hacia adelante: unas pocas líneas se recorren, saltos largos usan bisect
+            limite = min(i + 8, len(inicios))
+            while i + 1 < limite and inicios[i + 1] <= offset:
+                i += 1
+            if i + 1 == limite and limite < len(inicios) and inicios[limite] <= offset:
+                i = bisect_right(inicios, offset) - 1
+        else:
+            i = bisect_right(inicios, offset) - 1
+        self._linea_previa = i
+        return i + 1, offset - inicios[i] + 1
+
+    def offset(self, linea, columna):
+        """Operación inversa de linea_columna"""
+        return self.inicios_linea[linea - 1] + columna - 1
+
+# Núcleo del analizador: reconoce tokens desde 'pos' y los agrega a 'tokens' y 'errors'.
+# Con final=False el texto es sólo un prefijo de la entrada y el recorrido se detiene antes de
+# cualquier token que podría cambiar con los datos que faltan. Devuelve la posición alcanzada y,
+# si se detuvo ante un comentario o cadena sin cerrar, el terminador que hay que esperar.
+# Para el análisis incremental: 'limite' detiene el recorrido en la primera frontera de token
+# >= limite, 'pasos' recibe (inicio, fin del paso, alcance) por cada token, donde el alcance es
+# el primer carácter que el paso no examinó, y 'abiertos' las posiciones de '/*' y '"' sin cerrar.
+def _escanear(text, pos, ubicar, tokens, errors, final=True, limite=None, pasos=None, abiertos=None):
     length = len(text)
+    fin_recorrido = length if limite is None else min(limite, length)
 
-    while pos < length:
+    while pos < fin_recorrido:
         # Caso especial para detectar operadores ++ y -- incluso si hay espacios o saltos de línea entre ellos
         if text[pos] in ['+', '-']:
             symbol = text[pos]
             next_pos = pos + 1
             while next_pos < length and text[next_pos] in [' ', '\t', '\n']:
                 next_pos += 1
+            if next_pos >= length and not final:
+                return pos, None
             if next_pos < length and text[next_pos] == symbol:
-                linea, columna = calcular_linea_columna(text, pos)
+                linea, columna = ubicar(pos)
                 tokens.append(("OPERADOR_ARIT", symbol * 2, linea, columna))
+                if pasos is not None:
+                    pasos.append((pos, next_pos + 1, next_pos + 3))
                 pos = next_pos + 1
                 continue
 
-        match = None
-        # Intentamos hacer match con cada una de las expresiones regulares
-        for token_type, regex, *flags in TOKEN_REGEX:
-            flag = flags[0] if flags else 0
-            pattern = re.compile(regex, flag)
-            match = pattern.match(text, pos)
-
-            if match:
-                lexeme = match.group(0)
-
-                # Validación: número entero seguido de un punto mal formado 
-                if token_type == "NUMERO_ENTERO":
-                    fin = pos + len(lexeme)
-                    if fin < length and text[fin] == '.':
-                        if fin + 1 >= length or not text[fin + 1].isdigit():
-                            linea, columna = calcular_linea_columna(text, fin)
-                            errors.append(f"Línea {linea}, Columna {columna+1}: error en '{text[fin]}', se esperaba un dígito después del punto")
-                            pos = fin + 1
-                            break
-
-                # Validación: número real mal seguido de letra o punto extra
-                if token_type == "NUMERO_REAL":
-                    fin = pos + len(lexeme)
-                    if fin < length:
-                        siguiente = text[fin]
-                        if siguiente.isalpha():
-                            linea, columna = calcular_linea_columna(text, fin)
-                            errors.append(f"Línea {linea}, Columna {columna+1}: error en '{siguiente}', después de un número real no se esperaba '{siguiente}'")
-                            pos = fin + 1
-                            break
-                        elif siguiente == '.':
-                            # Agregar el token como válido
-                            linea, columna = calcular_linea_columna(text, pos)
-                            tokens.append((token_type, lexeme, linea, columna))
-                            # Y registrar el error por el punto adicional
-                            linea_punto, columna_punto = calcular_linea_columna(text, fin)
-                            errors.append(f"Línea {linea_punto}, Columna {columna_punto+1}: carácter inválido '.' después de número real")
-                            pos = fin + 1
-                            break
-
-                # Ignorar espacios y comentarios (no se agregan a tokens)
-                if token_type in ["ESPACIO", "COMENTARIO_SIMPLE", "COMENTARIO_MULTILINEA"]:
-                    pos = match.end()
+        # Operadores y símbolos: el mismo recorrido del trie que reconocer_operador, escrito aquí
+        # para evitar la llamada ('/' puede iniciar un comentario, que decide la expresión regular)
+        token_type = None
+        nodo = TRIE_OPERADORES.get(text[pos])
+        if nodo is not None and not text.startswith(('//', '/*'), pos):
+            token_type, hijos = nodo
+            fin = i = pos + 1
+            while hijos and i < length:
+                nodo = hijos.get(text[i])
+                if nodo is None:
                     break
+                i += 1
+                if nodo[0] is not None:
+                    token_type, fin = nodo[0], i
+                hijos = nodo[1]
+        if token_type is not None:
+            lexeme = text[pos:fin]
+        else:
+            # Un solo intento de coincidencia contra la expresión del analizador
+            match = REGEX_ESCANER.match(text, pos)
 
-                # Caracter inválido
-                if token_type == "DESCONOCIDO":
-                    linea, columna = calcular_linea_columna(text, pos)
-                    errors.append(f"Línea {linea}, Columna {columna}: carácter inválido '{lexeme}'")
-                    pos = match.end()
-                    break
+            # Si no se hizo match con ninguna expresión regular
+            if not match:
+                linea, columna = ubicar(pos)
+                errors.append(Diagnostico("LEX001", ERROR, pos, (linea, columna)))
+                pos += 1
+                continue
 
-                # Token válido, se agrega a la lista
-                linea, columna = calcular_linea_columna(text, pos)
-                tokens.append((token_type, lexeme, linea, columna))
-                pos = match.end()
-                break
+            token_type = match.lastgroup
+            lexeme = match.group()
+            fin = match.end()
+            # Las palabras se reconocen como identificadores y aquí se separan las reservadas
+            if token_type == "IDENTIFICADOR" and lexeme in RESERVADAS:
+                token_type = "RESERVADA"
+
+        if not final:
+            # Comentario o cadena que todavía no se cierra dentro del texto disponible
+            if token_type == "OPERADOR_ARIT" and text.startswith('/*', pos):
+                return pos, '*/'
+            if token_type == "DESCONOCIDO" and lexeme == '"':
+                return pos, '"'
+            # Las validaciones y las fronteras de palabra miran hasta dos caracteres más allá del token
+            if fin + 1 >= length:
+                return pos, None
+
+        # Validación: número entero seguido de un punto mal formado
+        if token_type == "NUMERO_ENTERO":
+            if fin < length and text[fin] == '.':
+                if fin + 1 >= length or not text[fin + 1].isdigit():
+                    linea, columna = ubicar(fin)
+                    errors.append(Diagnostico("LEX002", ERROR, fin, (linea, columna + 1, text[fin])))
+                    pos = fin + 1
+                    continue
 
-        # Si no se hizo match con ninguna expresión regular
-        if not match:
-            linea, columna = calcular_linea_columna(text, pos)
-            errors.append(f"Línea {linea}, Columna {columna}: carácter no reconocido.")
-            pos += 1
+        # Validación: número real mal seguido de letra o punto extra
+        elif token_type == "NUMERO_REAL":
+            if fin < length:
+                siguiente = text[fin]
+                if siguiente.isalpha():
+                    linea, columna = ubicar(fin)
+                    errors.append(Diagnostico("LEX003", ERROR, fin, (linea, columna + 1, siguiente)))
+                    pos = fin + 1
+                    continue
+                elif siguiente == '.':
+                    # Agregar el token como válido
+                    linea, columna = ubicar(pos)
+                    tokens.append((token_type, lexeme, linea, columna))
+                    if pasos is not None:
+                        pasos.append((pos, fin + 1, fin + 3))
+                    # Y registrar el error por el punto adicional
+                    linea_punto, columna_punto = ubicar(fin)
+                    errors.append(Diagnostico("LEX004", ERROR, fin, (linea_punto, columna_punto + 1)))
+                    pos = fin + 1
+                    continue
 
+        # Ignorar espacios y comentarios (no se agregan a tokens)
+        elif token_type in TOKENS_IGNORADOS:
+            pos = fin
+            continue
+
+        # Caracter inválido
+        elif token_type == "DESCONOCIDO":
+            if abiertos is not None and lexeme == '"':
+                abiertos.append(pos)
+            linea, columna = ubicar(pos)
+            errors.append(Diagnostico("LEX005", ERROR, pos, (linea, columna, lexeme)))
+            pos = fin
+            continue
+
+        # Token válido, se agrega a la lista
+        linea, columna = ubicar(pos)
+        tokens.append((token_type, lexeme, linea, columna))
+        if pasos is not None:
+            alcance = fin + 2
+            if lexeme in ('+', '-'):
+                # La regla de ++/-- examinó los espacios que siguen al operador
+                alcance = max(alcance, next_pos + 1)
+            elif abiertos is not None and lexeme == '/' and text.startswith('/*', pos):
+                abiertos.append(pos)
+            elif token_type == "NUMERO_ENTERO" and text.startswith('.', fin):
+                # El intento fallido de NUMERO_REAL examinó los dígitos después del punto
+                alcance = max(alcance, _DIGITOS.match(text, fin + 1).end() + 1)
+            pasos.append((pos, fin, alcance))
+        pos = fin
+
+    return pos, None
+
+# Función principal que recibe un texto y devuelve los tokens reconocidos y los errores encontrados
+# (acepta un str o un ArchivoFuente ya indexado). Con procesos distinto de 1 (None = todos los
+# núcleos) los textos grandes se analizan en paralelo; el resultado es el mismo.
+# Los errores son Diagnostico y se agregan a 'errores' (por omisión una ListaDiagnosticos con los
+# límites de la fase léxica); en modo de detención temprana se devuelve lo analizado hasta el límite.
+def tokenize(text, procesos=1, errores=None):
+    fuente = text if isinstance(text, ArchivoFuente) else ArchivoFuente(text)
+    tokens = []  # Lista de tokens válidos
+    errors = lista_para_fase("lexico") if errores is None else errores  # Lista de errores
+    try:
+        if procesos != 1 and len(fuente.texto) >= TAMANO_MINIMO_PARALELO:
+            _tokenize_paralelo(fuente, procesos or os.cpu_count() or 1, tokens, errors)
+        else:
+            _escanear(fuente.texto, 0, fuente.linea_columna, tokens, errors)
+    except FaseDetenida:
+        pass
     return tokens, errors
+
+# Análisis en paralelo: el texto se corta en inicios de línea y cada tramo se analiza por separado
+# suponiendo que empieza fuera de comentarios y cadenas. Al unir, se vuelve a analizar desde donde
+# terminó lo confirmado hasta reencontrar un inicio de token del tramo siguiente; desde ahí sus
+# tokens son los mismos que daría el análisis secuencial. Si un comentario o una cadena cruzó el
+# corte, los tokens especulados dentro de él se descartan y se reanalizan en el proceso principal.
+TAMANO_MINIMO_PARALELO = 1 << 20  # Por debajo de este tamaño no compensa repartir el trabajo
+TRAMOS_POR_PROCESO = 4
+
+class _PasosTramo:
+    """Recibe los pasos de _escanear y guarda el inicio de cada token y cuántos errores lo preceden"""
+    __slots__ = ('inicios', 'errores_previos', 'errores')
+    def __init__(self, errores):
+        self.inicios = array('I')
+        self.errores_previos = array('I')
+        self.errores = errores
+
+    def append(self, paso):
+        self.inicios.append(paso[0])
+        self.errores_previos.append(len(self.errores))
+
+def _analizar_tramo(texto, linea, final):
+    """Analiza un tramo que empieza en la línea 'linea'. Salvo el último, el tramo se trata como
+    prefijo: se detiene antes de los tokens que dependen del texto que sigue."""
+    ubicar = _UbicadorIncremental()
+    ubicar.texto = texto
+    ubicar.linea = linea
+    tokens, errores = [], []
+    pasos = _PasosTramo(errores)
+    parada, _ = _escanear(texto, 0, ubicar, tokens, errores, final, pasos=pasos)
+    return tokens, errores, pasos.inicios, pasos.errores_previos, parada
+
+def _cortes(texto, partes):
+    """Inicios de tramo: desplazamientos justo después de un salto de línea"""
+    cortes = [0]
+    for k in range(1, partes):
+        salto = texto.find('\n', max(len(texto) * k // partes, cortes[-1]))
+        if salto == -1:
+            break
+        if salto + 1 < len(texto) and salto + 1 > cortes[-1]:
+            cortes.append(salto + 1)
+    return cortes
+
+def _tokenize_paralelo(fuente, procesos, tokens, errors):
+    from concurrent.futures import ProcessPoolExecutor
+
+    texto = fuente.texto
+    ubicar = fuente.linea_columna
+    cortes = _cortes(texto, procesos * TRAMOS_POR_PROCESO)
+    limites = cortes[1:] + [len(texto)]
+    pos = 0
+    with ProcessPoolExecutor(procesos) as ejecutor:
+        futuros = [ejecutor.submit(_analizar_tramo, texto[a:b], ubicar(a)[0], b == len(texto))
+                   for a, b in zip(cortes, limites)]
+        try:
+            for base, futuro in zip(cortes, futuros):
+                tokens_tramo, errores_tramo, inicios, errores_previos, parada = futuro.result()
+                # Avanzar lo confirmado hasta coincidir con un inicio de token del tramo
+                j = bisect_left(inicios, pos - base) if pos > base else 0
+                while j < len(inicios):
+                    candidato = base + inicios[j]
+                    pos, _ = _escanear(texto, pos, ubicar, tokens, errors, True, candidato)
+                    if pos == candidato:
+                        tokens.extend(tokens_tramo[j:])
+                        for diagnostico in errores_tramo[errores_previos[j]:]:
+                            diagnostico.offset += base
+                            errors.append(diagnostico)
+                        pos = base + parada
+                        break
+                    j = bisect_left(inicios, pos - base, j)
+        except FaseDetenida:
+            for futuro in futuros:
+                futuro.cancel()
+            raise
+    # Lo que quede después de la última sincronización
+    _escanear(texto, pos, ubicar, tokens, errors)
+
+class FlujoTokens:
+    """Flujo de tokens compacto: una columna 'array' por campo en lugar de una tupla por token.
+
+    Guarda el código del tipo, la clase, los desplazamientos de inicio y fin y la línea de cada token;
+    el lexema se toma del texto fuente y la columna se calcula con el índice de líneas solo
+    cuando se piden. Se indexa como una lista de Token (flujo[i], len(flujo)), de modo que
+    AnalizadorSintactico lo consume sin convertirlo.
+    """
+    def __init__(self, fuente):
+        self.fuente = fuente
+        self.tipos = array('B')
+        self.clases = array('B')
+        self.inicios = array('I')
+        self.fines = array('I')
+        self.lineas = array('I')
+        self._cache = {}  # Últimos Token materializados (el parser consulta el actual y el siguiente)
+
+    def __len__(self):
+        return len(self.tipos)
+
+    def lexema(self, i):
+        lexema = self.fuente.texto[self.inicios[i]:self.fines[i]]
+        if len(lexema) > 2 and self.tipos[i] == _CODIGO_ARIT:
+            # '++' o '--' escrito con espacios o saltos de línea entre los signos
+            lexema = lexema[0] * 2
+        # Los lexemas se repiten mucho (identificadores, palabras reservadas): los nodos del AST
+        # que los guardan comparten una sola copia
+        return sys.intern(lexema)
+
+    def columna(self, i):
+        return self.inicios[i] - self.fuente.inicios_linea[self.lineas[i] - 1] + 1
+
+    def tipo(self, i):
+        return TIPOS_TOKEN[self.tipos[i]]
+
+    def __getitem__(self, i):
+        token = self._cache.get(i)
+        if token is None:
+            if i < 0:
+                i += len(self.tipos)
+            if not 0 <= i < len(self.tipos):
+                raise IndexError("índice de token fuera de rango")
+            token = Token(TIPOS_TOKEN[self.tipos[i]], self.lexema(i), self.lineas[i], self.columna(i), self.clases[i])
+            if len(self._cache) >= 4:
+                self._cache.clear()
+            self._cache[i] = token
+        return token
+
+    def tuplas(self):
+        """Genera los tokens en el formato de tokenize: (tipo, lexema, línea, columna)"""
+        for i in range(len(self.tipos)):
+            yield TIPOS_TOKEN[self.tipos[i]], self.lexema(i), self.lineas[i], self.columna(i)
+
+    # Receptores para _escanear: 'tokens' llega antes que 'pasos' para el mismo token
+    def _agregar_token(self, token):
+        tipo, lexema, linea, _ = token
+        codigo = CODIGOS_TIPO[tipo]
+        self.tipos.append(codigo)
+        self.clases.append(clase_token(codigo, lexema))
+        self.lineas.append(linea)
+        self._largo_pendiente = len(lexema)
+
+    def _agregar_paso(self, paso):
+        inicio, fin_paso, _ = paso
+        self.inicios.append(inicio)
+        # Un ++/-- con espacios abarca todo el paso; los demás terminan donde termina su lexema
+        self.fines.append(fin_paso if self.tipos[-1] == _CODIGO_ARIT else inicio + self._largo_pendiente)
+
+class _Receptor:
+    """Adapta un método al protocolo append que usa _escanear"""
+    __slots__ = ('append',)
+    def __init__(self, append):
+        self.append = append
+
+_CODIGO_ARIT = CODIGOS_TIPO["OPERADOR_ARIT"]
+
+# Igual que tokenize, pero devuelve un FlujoTokens en lugar de una lista de tuplas
+def tokenize_flujo(text, errores=None):
+    fuente = text if isinstance(text, ArchivoFuente) else ArchivoFuente(text)
+    flujo = FlujoTokens(fuente)
+    errors = lista_para_fase("lexico") if errores is None else errores
+    try:
+        _escanear(fuente.texto, 0, fuente.linea_columna, _Receptor(flujo._agregar_token), errors,
+                  pasos=_Receptor(flujo._agregar_paso))
+    except FaseDetenida:
+        pass
+    return flujo, errors
+
+# Análisis léxico incremental para el editor: conserva los tokens con sus desplazamientos y,
+# ante una edición, vuelve a analizar sólo la zona afectada
+class AnalizadorLexicoIncremental:
+    """Mantiene el flujo de tokens de un texto que se edita.
+
+    Cada token se guarda como (inicio, fin del paso, alcance, tipo, lexema). Los registros a
+    partir de '_hueco' guardan desplazamientos sin actualizar, a los que falta sumar '_delta';
+    así, editar repetidamente en la misma zona no obliga a recorrer el resto de los tokens.
+    """
+    def __init__(self, texto):
+        self.texto = texto
+        self._tokens = []
+        self._hueco = 0
+        self._delta = 0
+        self._abiertos = []  # Posiciones de '/*' y '"' sin cerrar (alcanzan hasta el final)
+        self._reanalizar(0, None, 0, 0)
+
+    def _inicio(self, i):
+        inicio = self._tokens[i][0]
+        return inicio + self._delta if i >= self._hueco else inicio
+
+    def _mover_hueco(self, destino):
+        """Deja con desplazamientos absolutos exactamente los registros anteriores a 'destino'"""
+        tokens, delta = self._tokens, self._delta
+        if delta:
+            for i in range(self._hueco, destino):
+                inicio, fin, alcance, tipo, lexema = tokens[i]
+                tokens[i] = (inicio + delta, fin + delta, alcance + delta, tipo, lexema)
+            for i in range(destino, self._hueco):
+                inicio, fin, alcance, tipo, lexema = tokens[i]
+                tokens[i] = (inicio - delta, fin - delta, alcance - delta, tipo, lexema)
+        self._hueco = destino
+        if destino == len(tokens):
+            self._delta = 0
+
+    def _contar_antes(self, offset, desde=0):
+        """Cantidad de tokens cuyo inicio es menor que 'offset'"""
+        return bisect_left(range(len(self._tokens)), offset, lo=desde, key=self._inicio)
+
+    def _reanalizar(self, r, q, reinicio, fin_insertado):
+        """Reemplaza los registros [r, q) analizando desde 'reinicio' hasta reencontrar un token
+        viejo que empiece después de 'fin_insertado'. Devuelve la posición final y los tokens nuevos."""
+        texto = self.texto
+        n = len(self._tokens)
+        ubicar = _UbicadorIncremental()
+        ubicar.texto = texto
+        ubicar.contado = reinicio
+        ubicar.linea, columna = self.linea_columna(reinicio)
+        ubicar.inicio_linea = reinicio - columna + 1
+
+        nuevos, pasos, abiertos = [], [], []
+        pos = reinicio
+        q = n if q is None else q
+        while True:
+            # El token viejo debe conservar también el carácter anterior (fronteras \b)
+            while q < n and self._inicio(q) <= fin_insertado:
+                q += 1
+            candidato = self._inicio(q) if q < n else None
+            pos, _ = _escanear(texto, pos, ubicar, nuevos, [], True, candidato, pasos, abiertos)
+            if candidato is None or pos == candidato:
+                break
+            q = self._contar_antes(pos, q)
+
+        self._tokens[r:q] = [paso + token[:2] for paso, token in zip(pasos, nuevos)]
+        self._hueco = r + len(nuevos)
+        if self._hueco == len(self._tokens):
+            self._delta = 0
+        self._abiertos = ([a for a in self._abiertos if a < reinicio] + abiertos +
+                          [a for a in self._abiertos if a >= pos])
+        return pos, nuevos
+
+    def editar(self, offset, borrados, insertado):
+        """Aplica una edición (borra 'borrados' caracteres en 'offset' e inserta 'insertado').
+
+        Devuelve (inicio, fin, tokens): el rango del texto nuevo que se volvió a analizar y los
+        tokens que contiene, con línea y columna. Fuera de ese rango los tokens no cambiaron.
+        """
+        fin_borrado = offset + borrados
+        r = self._contar_antes(offset)
+        if self._abiertos and self._abiertos[0] < offset:
+            # Un comentario o cadena sin cerrar depende de todo lo que viene después
+            r = min(r, self._contar_antes(self._abiertos[0]))
+        self._mover_hueco(r)
+        # Retroceder mientras algún token anterior haya examinado texto que cambia. Un alcance
+        # puede saltar como máximo dos tokens (el intento de NUMERO_REAL en '3' '.' '14x').
+        while True:
+            afectados = [i for i in range(max(0, r - 3), r) if self._tokens[i][2] > offset]
+            if not afectados:
+                break
+            r = afectados[0]
+        self._mover_hueco(r)
+        reinicio = self._tokens[r - 1][1] if r else 0
+
+        cambio = len(insertado) - borrados
+        self.texto = self.texto[:offset] + insertado + self.texto[fin_borrado:]
+        self._delta += cambio
+        self._abiertos = [a if a < offset else a + cambio for a in self._abiertos
+                          if a < offset or a >= fin_borrado]
+
+        fin, nuevos = self._reanalizar(r, r, reinicio, offset + len(insertado))
+        return reinicio, fin, nuevos
+
+    def editar_texto(self, nuevo):
+        """Deduce la edición comparando el texto actual con 'nuevo' y la aplica.
+        Devuelve lo mismo que editar, o None si el texto no cambió."""
+        edicion = diferencia(self.texto, nuevo)
+        return None if edicion is None else self.editar(*edicion)
+
+    def linea_columna(self, offset):
+        """(línea, columna) de un desplazamiento del texto actual, sin construir el índice completo"""
+        return self.texto.count('\n', 0, offset) + 1, offset - self.texto.rfind('\n', 0, offset)
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def token(self, i):
+        """(tipo, lexema, inicio) del token i del texto actual"""
+        inicio, _, _, tipo, lexema = self._tokens[i]
+        return tipo, lexema, inicio + self._delta if i >= self._hueco else inicio
+
+    def contar_antes(self, offset):
+        """Cantidad de tokens del texto actual que empiezan antes de 'offset'"""
+        return self._contar_antes(offset)
+
+    def tokens(self):
+        """Lista completa de tokens en el formato de tokenize"""
+        ubicar = ArchivoFuente(self.texto).linea_columna
+        resultado = []
+        for i, (inicio, _, _, tipo, lexema) in enumerate(self._tokens):
+            if i >= self._hueco:
+                inicio += self._delta
+            resultado.append((tipo, lexema) + ubicar(inicio))
+        return resultado
+
+def diferencia(anterior, nuevo):
+    """Edición (offset, borrados, insertado) que convierte 'anterior' en 'nuevo', o None si son
+    iguales. El prefijo y el sufijo comunes se buscan por búsqueda binaria (las comparaciones de
+    rebanadas se hacen en C)."""
+    if anterior == nuevo:
+        return None
+    limite = min(len(anterior), len(nuevo))
+    bajo, alto = 0, limite
+    while bajo < alto:
+        medio = (bajo + alto + 1) // 2
+        if anterior[:medio] == nuevo[:medio]:
+            bajo = medio
+        else:
+            alto = medio - 1
+    prefijo = bajo
+    bajo, alto = 0, limite - prefijo
+    while bajo < alto:
+        medio = (bajo + alto + 1) // 2
+        if anterior[len(anterior) - medio:] == nuevo[len(nuevo) - medio:]:
+            bajo = medio
+        else:
+            alto = medio - 1
+    sufijo = bajo
+    return prefijo, len(anterior) - prefijo - sufijo, nuevo[prefijo:len(nuevo) - sufijo]
+
+# Análisis léxico por flujo, para archivos que no conviene cargar completos en memoria
+TAMANO_FRAGMENTO = 1 << 16  # Caracteres leídos por fragmento en iter_tokens
+
+class _UbicadorIncremental:
+    """Ubica desplazamientos crecientes dentro de un búfer que se recorta por el inicio"""
+    def __init__(self):
+        self.texto = ''
+        self.base = 0          # Desplazamiento absoluto de texto[0]
+        self.contado = 0       # Posición (relativa) hasta donde ya se contaron saltos de línea
+        self.linea = 1
+        self.inicio_linea = 0  # Desplazamiento absoluto del inicio de la línea actual
+
+    def __call__(self, pos):
+        texto = self.texto
+        saltos = texto.count('\n', self.contado, pos)
+        if saltos:
+            self.linea += saltos
+            self.inicio_linea = self.base + texto.rfind('\n', self.contado, pos) + 1
+        self.contado = pos
+        return self.linea, self.base + pos - self.inicio_linea + 1
+
+    def recortar(self, corte):
+        """Descarta texto[:corte] sin perder la cuenta de líneas"""
+        self(corte)
+        self.base += corte
+        self.contado = 0
+
+def _leer_fragmentos(source, tamano):
+    """Produce la entrada como fragmentos de texto: ruta, objeto archivo o mmap"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "r", encoding="utf-8") as archivo:
+            yield from iter(lambda: archivo.read(tamano), '')
+        return
+
+    decodificador = codecs.getincrementaldecoder("utf-8")()
+    if isinstance(source, mmap.mmap):
+        # Se lee por rebanadas sin mover la posición del mmap
+        for inicio in range(0, len(source), tamano):
+            yield decodificador.decode(source[inicio:inicio + tamano])
+    else:
+        for fragmento in iter(lambda: source.read(tamano), _fragmento_vacio(source)):
+            yield decodificador.decode(fragmento) if isinstance(fragmento, bytes) else fragmento
+    final = decodificador.decode(b'', final=True)
+    if final:
+        yield final
+
+def _fragmento_vacio(archivo):
+    """Valor que devuelve read() al llegar al final: '' en modo texto, b'' en binario"""
+    return '' if isinstance(archivo, io.TextIOBase) else b''
+
+def iter_tokens(source, errores=None, tamano_fragmento=TAMANO_FRAGMENTO):
+    """Generador que produce los mismos tokens que tokenize leyendo la entrada por fragmentos.
+
+    'source' puede ser una ruta, un objeto archivo (texto o binario) o un mmap. Los errores
+    léxicos (Diagnostico) se agregan a la lista 'errores' si se proporciona; si es una
+    ListaDiagnosticos en modo de detención temprana, el generador termina al llegar al
+    límite. En memoria sólo queda el
+    fragmento actual y el token que quedó incompleto al final de él; un comentario o una
+    cadena sin cerrar se acumula hasta que aparece su terminador o termina la entrada.
+    """
+    if errores is None:
+        errores = []
+    ubicador = _UbicadorIncremental()
+    fragmentos = _leer_fragmentos(source, tamano_fragmento)
+    buffer = ''
+    pos = 0
+    espera = None   # Terminador pendiente ('*/' o '"') antes de volver a escanear
+    pendientes = []  # Fragmentos acumulados mientras se espera el terminador
+    final = False
+
+    while not final:
+        fragmento = next(fragmentos, None)
+        if fragmento is None:
+            final = True
+        elif espera is not None:
+            # Sin el terminador en los datos nuevos el resultado no puede cambiar
+            anterior = pendientes[-1][-1:] if pendientes else buffer[-1:]
+            pendientes.append(fragmento)
+            if (anterior + fragmento).find(espera) == -1:
+                continue
+        else:
+            pendientes.append(fragmento)
+        if pendientes:
+            buffer += ''.join(pendientes)
+            pendientes.clear()
+
+        tokens, nuevos = [], []
+        ubicador.texto = buffer
+        pos, espera = _escanear(buffer, pos, ubicador, tokens, nuevos, final)
+        detenido = False
+        try:
+            for diagnostico in nuevos:
+                diagnostico.offset += ubicador.base
+                errores.append(diagnostico)
+        except FaseDetenida:
+            detenido = True
+        yield from tokens
+        if detenido:
+            return
+
+        # Descartar lo consumido conservando un carácter para las fronteras de palabra (\b)
+        corte = pos - 1
+        if corte > 0:
+            ubicador.recortar(corte)
+            buffer = buffer[corte:]
+            pos -= corte
+
+class VentanaTokens:
+    """Tokens de un iterador (p. ej. iter_tokens) vistos como la secuencia de Token que consume
+    AnalizadorSintactico, sin guardarlos todos.
+
+    Se piden al iterador a medida que hacen falta, manteniendo siempre 'anticipacion' tokens más
+    allá del último índice consultado (el parser mira el actual y el siguiente, así que alcanza
+    con 2). Como el parser nunca retrocede, los tokens viejos se descartan. Mientras el iterador
+    no se agota, len() es la cantidad de tokens leídos hasta ahora: responde bien a las preguntas
+    'índice < len' de cualquier índice dentro de la anticipación.
+    """
+    RETENER = 8  # Tokens anteriores al último consultado que se conservan
+
+    def __init__(self, tokens, anticipacion=2):
+        self._iterador = iter(tokens)
+        self.anticipacion = anticipacion
+        self._tokens = []
+        self._base = 0       # Índice del primer token guardado
+        self._consultado = -1
+        self._agotado = False
+
+    def _leer_hasta(self, indice):
+        """Lee del iterador hasta tener el token 'indice' (o hasta que se agote)"""
+        tokens = self._tokens
+        faltan = indice + 1 - self._base - len(tokens)
+        for tipo, lexema, linea, columna in islice(self._iterador, max(faltan, 0)):
+            tokens.append(Token(tipo, sys.intern(lexema), linea, columna))
+        if self._base + len(tokens) <= indice:
+            self._agotado = True
+        # Descartar los viejos de a muchos para que el costo por token sea constante
+        sobrantes = self._consultado - self.RETENER - self._base
+        if sobrantes >= 1024:
+            del tokens[:sobrantes]
+            self._base += sobrantes
+
+    def __len__(self):
+        if not self._agotado:
+            self._leer_hasta(self._consultado + self.anticipacion)
+        return self._base + len(self._tokens)
+
+    def __getitem__(self, i):
+        if i > self._consultado:
+            self._consultado = i
+            if not self._agotado:
+                self._leer_hasta(i + self.anticipacion)
+        if i < self._base:
+            raise IndexError(f"el token {i} ya se descartó de la ventana")
+        try:
+            return self._tokens[i - self._base]
+        except IndexError:
+            raise IndexError("índice de token fuera de rango") from None
@@ -6,10 +6,19 @@ Implementa:
 - Análisis de declaraciones y uso de variables
 - Generación de código intermedio (tres direcciones)
 """
+import hashlib
+from array import array
+from itertools import count
+
+from codigo_intermedio import (BINARIA, CODIGOS_BINARIOS, COMENTARIO, CONSTANTE, COPIA, DECLARACION, ESCRITURA, ETIQUETA,
+                               ETIQUETA_OPERANDO, LECTURA, LIBERACION, NEGACION_LOGICA, OPERADORES_BINARIOS, SALTO,
+                               SALTO_SI, SALTO_SI_NO, SIN_OPERANDO, VARIABLE, CodigoIntermedio, Temporal)
+from diagnosticos import Diagnostico, ERROR, ADVERTENCIA, FaseDetenida, lista_para_fase
 
 class Simbolo:
     """Representa un símbolo en la tabla de símbolos"""
-    def __init__(self, nombre, tipo, linea, columna, inicializado=False, valor=None, registro=None):
+    def __init__(self, nombre, tipo, linea, columna, inicializado=False, valor=None, registro=None, ambito="Global",
+                 sombreado=None):
         self.nombre = nombre
         self.tipo = tipo  # 'int', 'float', 'bool'
         self.linea = linea
@@ -18,49 +27,192 @@ class Simbolo:
         self.usado = False
         self.valor = valor
         self.registro = registro  # Número de registro en la tabla hash
-        self.lineas_uso = []  # Lista de líneas donde se usa la variable
+        self.numero = None  # Orden de declaración: su número en TablaSimbolos.referencias
+        self.ambito = ambito  # Nombre del ámbito donde se declaró
+        self.sombreado = sombreado  # Símbolo del mismo nombre de un ámbito exterior que este oculta
+
+class IndiceReferencias:
+    """Índice de referencias cruzadas: las posiciones (línea, columna) donde aparece cada símbolo,
+    identificado por su número.
+
+    Cada símbolo tiene un array('I') con un entero por referencia, en el orden en que se
+    registran: la diferencia con la línea de la referencia anterior, en zigzag (los negativos van
+    a los impares), en los 20 bits altos, y la columna + 1 (0 si no se conoce) en los 12 bajos.
+    Si alguna de las dos no cabe, la referencia ocupa tres enteros: ESCAPE, la diferencia y la
+    columna + 1. Las líneas mínima y máxima de cada símbolo permiten saltar los que quedan fuera
+    del rango en en_lineas.
+    """
+    BITS_COLUMNA = 12
+    ESCAPE = (1 << BITS_COLUMNA) - 1
+    LIMITE_DIFERENCIA = 1 << (32 - BITS_COLUMNA)
+
+    def __init__(self):
+        self._posiciones = []
+        self._ultima_linea = array('I')
+        self._minima = array('I')
+        self._maxima = array('I')
+        self._cantidades = array('I')
+
+    def agregar_simbolo(self):
+        """Agrega un símbolo sin referencias y devuelve su número"""
+        self._posiciones.append(array('I'))
+        self._ultima_linea.append(0)
+        self._minima.append(0xFFFFFFFF)
+        self._maxima.append(0)
+        self._cantidades.append(0)
+        return len(self._posiciones) - 1
+
+    def agregar(self, numero, linea, columna=None):
+        diferencia = linea - self._ultima_linea[numero]
+        self._ultima_linea[numero] = linea
+        if linea < self._minima[numero]:
+            self._minima[numero] = linea
+        if linea > self._maxima[numero]:
+            self._maxima[numero] = linea
+        self._cantidades[numero] += 1
+        zigzag = diferencia << 1 if diferencia >= 0 else (-diferencia << 1) - 1
+        columna = 0 if columna is None else columna + 1
+        if zigzag < self.LIMITE_DIFERENCIA and columna < self.ESCAPE:
+            self._posiciones[numero].append(zigzag << self.BITS_COLUMNA | columna)
+        else:
+            self._posiciones[numero].extend((self.ESCAPE, zigzag, columna))
+
+    def cantidad(self, numero):
+        return self._cantidades[numero]
+
+    def referencias(self, numero, desde=None, hasta=None):
+        """Lista de (línea, columna) del símbolo en orden de registro; con 'desde'/'hasta', solo
+        las de esas líneas (inclusive)"""
+        resultado = []
+        if (desde is not None and self._maxima[numero] < desde) or (hasta is not None and self._minima[numero] > hasta):
+            return resultado
+        posiciones = self._posiciones[numero]
+        bits, escape = self.BITS_COLUMNA, self.ESCAPE
+        linea = i = 0
+        while i < len(posiciones):
+            valor = posiciones[i]
+            if valor == escape:
+                zigzag, columna = posiciones[i + 1], posiciones[i + 2]
+                i += 3
+            else:
+                zigzag, columna = valor >> bits, valor & escape
+                i += 1
+            linea += -((zigzag + 1) >> 1) if zigzag & 1 else zigzag >> 1
+            if (desde is None or linea >= desde) and (hasta is None or linea <= hasta):
+                resultado.append((linea, columna - 1 if columna else None))
+        return resultado
+
+    def en_lineas(self, desde, hasta):
+        """(número, línea, columna) de todas las referencias entre las líneas 'desde' y 'hasta'
+        (inclusive), ordenadas por posición"""
+        resultado = [(numero, linea, columna)
+                     for numero in range(len(self._posiciones))
+                     if self._minima[numero] <= hasta and self._maxima[numero] >= desde
+                     for linea, columna in self.referencias(numero, desde, hasta)]
+        resultado.sort(key=lambda r: (r[1], -1 if r[2] is None else r[2], r[0]))
+        return resultado
 
 class TablaSimbolos:
-    """Tabla de símbolos implementada con hash"""
+    """Tabla de símbolos implementada con hash
+
+    Las búsquedas van por un diccionario nombre -> símbolo; las cubetas de 'tabla' son las que
+    muestra la vista "Tabla de Símbolos" (indice_hash). Se reparten con un hash fuerte del nombre
+    (blake2b) y la tabla duplica su tamaño cuando el factor de carga pasa de FACTOR_CARGA.
+
+    Los ámbitos forman una pila: el global y uno por bloque abierto. El diccionario tiene solo
+    el símbolo visible de cada nombre, el del ámbito más interno; cada símbolo recuerda el que
+    oculta (sombreado), que vuelve a ser visible al cerrar su ámbito. Los símbolos de los ámbitos
+    cerrados siguen en 'tabla' y en simbolos_lista.
+    """
+    FACTOR_CARGA = 0.75
+
     def __init__(self, tamano=100):
         self.tamano = tamano
         self.tabla = [[] for _ in range(tamano)]
         self.simbolos_lista = []  # Para mantener orden de inserción
-    
+        self._por_nombre = {}
+        self._hashes = []  # Hash completo de cada símbolo de simbolos_lista, para redistribuir
+        self.referencias = IndiceReferencias()  # Declaración y usos de cada símbolo, por su número
+        self.ambitos = [("Global", [])]  # Pila de (nombre, símbolos declarados en él)
+        self._bloques = 0
+
+    @staticmethod
+    def hash_completo(nombre):
+        """Hash de 64 bits del nombre, el mismo en todas las ejecuciones (hash() de Python no lo es)"""
+        return int.from_bytes(hashlib.blake2b(nombre.encode("utf-8"), digest_size=8).digest(), "little")
+
     def hash(self, nombre):
-        """Función hash simple: suma de valores ASCII módulo tamaño"""
-        return sum(ord(c) for c in nombre) % self.tamano
-    
+        """Cubeta del nombre en la tabla actual"""
+        return self.hash_completo(nombre) % self.tamano
+
+    def _redimensionar(self, tamano):
+        self.tamano = tamano
+        self.tabla = [[] for _ in range(tamano)]
+        for simbolo, completo in zip(self.simbolos_lista, self._hashes):
+            simbolo.registro = completo % tamano
+            self.tabla[simbolo.registro].append(simbolo)
+
+    def abrir_ambito(self):
+        """Entra a un ámbito nuevo (un bloque)"""
+        self._bloques += 1
+        self.ambitos.append((f"Bloque {self._bloques}", []))
+
+    def cerrar_ambito(self):
+        """Sale del ámbito actual: sus símbolos dejan de ser visibles y vuelven a verse los que
+        ocultaban. Devuelve los símbolos que salen de alcance, en orden de declaración"""
+        _, simbolos = self.ambitos.pop()
+        por_nombre = self._por_nombre
+        for simbolo in reversed(simbolos):
+            if simbolo.sombreado is None:
+                del por_nombre[simbolo.nombre]
+            else:
+                por_nombre[simbolo.nombre] = simbolo.sombreado
+        return simbolos
+
     def insertar(self, nombre, tipo, linea, columna, inicializado=False, valor=None):
-        """Inserta un símbolo en la tabla"""
-        indice = self.hash(nombre)
-        
-        # Verificar si ya existe en ese bucket
-        for simbolo in self.tabla[indice]:
-            if simbolo.nombre == nombre:
-                return False, f"Error semántico en L{linea} C{columna}: Variable '{nombre}' ya declarada en L{simbolo.linea} C{simbolo.columna}"
-        
-        # Insertar nuevo símbolo
-        simbolo = Simbolo(nombre, tipo, linea, columna, inicializado, valor=valor, registro=indice)
+        """Inserta un símbolo en el ámbito actual; puede ocultar uno del mismo nombre de un ámbito
+        exterior, pero no repetir uno del mismo ámbito"""
+        ambito, declarados = self.ambitos[-1]
+        existente = self._por_nombre.get(nombre)
+        if existente is not None and existente.ambito == ambito:
+            return False, Diagnostico("SEM001", ERROR, None, (linea, columna, nombre, existente.linea, existente.columna))
+
+        if len(self.simbolos_lista) + 1 > self.FACTOR_CARGA * self.tamano:
+            self._redimensionar(self.tamano * 2)
+        completo = self.hash_completo(nombre)
+        indice = completo % self.tamano
+        simbolo = Simbolo(nombre, tipo, linea, columna, inicializado, valor=valor, registro=indice, ambito=ambito,
+                          sombreado=existente)
+        simbolo.numero = self.referencias.agregar_simbolo()
         self.tabla[indice].append(simbolo)
         self.simbolos_lista.append(simbolo)
+        self._hashes.append(completo)
+        self._por_nombre[nombre] = simbolo
+        declarados.append(simbolo)
         return True, None
-    
+
     def buscar(self, nombre):
         """Busca un símbolo en la tabla"""
-        indice = self.hash(nombre)
-        for simbolo in self.tabla[indice]:
-            if simbolo.nombre == nombre:
-                return simbolo
-        return None
+        return self._por_nombre.get(nombre)
     
-    def marcar_usado(self, nombre, linea=None):
-        """Marca una variable como usada y registra la línea (permite duplicados)"""
+    def marcar_usado(self, nombre, linea=None, columna=None):
+        """Marca una variable como usada y registra la referencia (línea y columna)"""
         simbolo = self.buscar(nombre)
         if simbolo:
             simbolo.usado = True
             if linea is not None:
-                simbolo.lineas_uso.append(linea)
+                self.referencias.agregar(simbolo.numero, linea, columna)
+
+    def buscar_referencias(self, simbolo, desde=None, hasta=None):
+        """(línea, columna) de la declaración y de cada uso del símbolo; con 'desde'/'hasta', solo
+        los de esas líneas"""
+        return self.referencias.referencias(simbolo.numero, desde, hasta)
+
+    def referencias_en_lineas(self, desde, hasta):
+        """(símbolo, línea, columna) de cada referencia entre las líneas 'desde' y 'hasta'"""
+        simbolos = self.simbolos_lista
+        return [(simbolos[numero], linea, columna)
+                for numero, linea, columna in self.referencias.en_lineas(desde, hasta)]
     
     def marcar_inicializado(self, nombre, valor=None):
         """Marca una variable como inicializada y opcionalmente asigna un valor"""
@@ -82,14 +234,14 @@ class TablaSimbolos:
             if bucket:
                 for simbolo in bucket:
                     # Recolectar líneas donde se usa y ordenarlas
-                    lineas_ordenadas = sorted(simbolo.lineas_uso) if simbolo.lineas_uso else [simbolo.linea]
+                    lineas_ordenadas = sorted(linea for linea, _ in self.buscar_referencias(simbolo)) or [simbolo.linea]
                     lineas_uso = ",".join(map(str, lineas_ordenadas))
                     resultado.append({
                         'identificador': simbolo.nombre,
                         'registro': contador,
                         'valor': simbolo.valor if simbolo.valor is not None else '<input>',
                         'tipo_dato': simbolo.tipo,
-                        'ambito': 'Global',  # Por ahora todos son globales
+                        'ambito': simbolo.ambito,
                         'lineas': lineas_uso,
                         'indice_hash': i,
                         'inicializado': simbolo.inicializado,
@@ -99,17 +251,27 @@ class TablaSimbolos:
         return resultado
     
 class GeneradorCodigoIntermedio:
-    """Genera código de tres direcciones"""
+    """Genera código de tres direcciones como cuádruplas (CodigoIntermedio) y el código P"""
+    # Nemónico de código P de cada operador binario; != se traduce aparte (equ y negación) y los
+    # demás de OPERADORES_BINARIOS no tienen traducción
+    NEMONICOS = {
+        '==': 'equ', '<=': 'leq', '>=': 'geq', '&&': 'and', '||': 'or', '<': 'les', '>': 'grt',
+        '+': 'adi', '-': 'sbi', '*': 'mpi', '/': 'dvi', '%': 'mod', '^': 'pot'
+    }
+
     def __init__(self):
-        self.codigo = []
+        self.codigo = CodigoIntermedio()
         self.temp_counter = 0
         self.label_counter = 0
         self.variables = {}  # Mapeo de variables a direcciones de memoria
         self.dir_counter = 0
+        self.libres = []  # Direcciones de variables que salieron de alcance, para reutilizar
+        self._ocultas = {}  # Variable -> direcciones de las del mismo nombre que oculta una local
+        self.ocupantes = {}  # Dirección -> variables que la usaron, en orden
     
     def nuevo_temporal(self):
         """Genera un nuevo temporal"""
-        temp = f"t{self.temp_counter}"
+        temp = Temporal(f"t{self.temp_counter}")
         self.temp_counter += 1
         return temp
     
@@ -118,10 +280,51 @@ class GeneradorCodigoIntermedio:
         label = f"L{self.label_counter}"
         self.label_counter += 1
         return label
-    
-    def agregar(self, instruccion):
-        """Agrega una instrucción al código intermedio"""
-        self.codigo.append(instruccion)
+
+    # Instrucciones. Los operandos son valores del análisis semántico (ver CodigoIntermedio.valor)
+    def agregar_comentario(self, texto):
+        self.codigo.agregar(COMENTARIO, arg1=self.codigo.operando(CONSTANTE, texto))
+
+    def agregar_declaracion(self, var, tipo):
+        codigo = self.codigo
+        codigo.agregar(DECLARACION, codigo.operando(VARIABLE, var), codigo.operando(CONSTANTE, tipo))
+
+    def agregar_liberacion(self, var):
+        self.codigo.agregar(LIBERACION, self.codigo.operando(VARIABLE, var))
+
+    def agregar_lectura(self, var):
+        self.codigo.agregar(LECTURA, self.codigo.operando(VARIABLE, var))
+
+    def agregar_escritura(self, valor, constante=False):
+        """WRITE de una variable o, con 'constante', del literal tal como está en el fuente"""
+        codigo = self.codigo
+        codigo.agregar(ESCRITURA, arg1=codigo.operando(CONSTANTE, valor) if constante else codigo.valor(valor))
+
+    def agregar_etiqueta(self, etiqueta):
+        self.codigo.agregar(ETIQUETA, self.codigo.operando(ETIQUETA_OPERANDO, etiqueta))
+
+    def agregar_salto(self, etiqueta):
+        self.codigo.agregar(SALTO, self.codigo.operando(ETIQUETA_OPERANDO, etiqueta))
+
+    def agregar_salto_si_no(self, condicion, etiqueta):
+        codigo = self.codigo
+        codigo.agregar(SALTO_SI_NO, codigo.operando(ETIQUETA_OPERANDO, etiqueta), codigo.valor(condicion))
+
+    def agregar_salto_si(self, condicion, etiqueta):
+        codigo = self.codigo
+        codigo.agregar(SALTO_SI, codigo.operando(ETIQUETA_OPERANDO, etiqueta), codigo.valor(condicion))
+
+    def agregar_copia(self, destino, fuente):
+        codigo = self.codigo
+        codigo.agregar(COPIA, codigo.valor(destino), codigo.valor(fuente))
+
+    def agregar_binaria(self, destino, izquierdo, operador, derecho):
+        codigo = self.codigo
+        codigo.agregar(CODIGOS_BINARIOS[operador], codigo.valor(destino), codigo.valor(izquierdo), codigo.valor(derecho))
+
+    def agregar_negacion_logica(self, destino, operando):
+        codigo = self.codigo
+        codigo.agregar(NEGACION_LOGICA, codigo.valor(destino), codigo.valor(operando))
         
     def redondear(self, valor, decimales=2):
         """Redondea los números flotantes a un número fijo de decimales"""
@@ -130,258 +333,257 @@ class GeneradorCodigoIntermedio:
         return valor
     
     def obtener_codigo(self):
-        """Retorna el código generado"""
-        return self.codigo
+        """Retorna el código generado como texto de tres direcciones, una cadena por instrucción"""
+        return self.codigo.imprimir()
     
     def obtener_direccion(self, var):
         """Obtiene o asigna dirección de memoria a una variable"""
         if var not in self.variables:
-            self.variables[var] = self.dir_counter
+            self._asignar(var, self.dir_counter)
             self.dir_counter += 1
         return self.variables[var]
+
+    def _asignar(self, var, direccion):
+        self.variables[var] = direccion
+        self.ocupantes.setdefault(direccion, []).append(var)
+
+    def declarar(self, var):
+        """Asigna dirección a una variable declarada, reutilizando primero las liberadas. Si ya
+        había una visible con ese nombre (de un ámbito exterior), queda oculta hasta que la nueva
+        se libere"""
+        if var in self.variables:
+            self._ocultas.setdefault(var, []).append(self.variables.pop(var))
+        if not self.libres:
+            return self.obtener_direccion(var)
+        # Solo las variables declaradas reutilizan direcciones: lo demás que se carga por nombre
+        # (p. ej. True/False en una operación) puede leerse sin haberse escrito y espera un 0
+        self._asignar(var, self.libres.pop())
+        return self.variables[var]
+
+    def liberar(self, var):
+        """La variable sale de alcance: su dirección queda libre y vuelve a verse la que ocultaba"""
+        direccion = self.variables.pop(var, None)
+        if direccion is None:
+            return
+        self.libres.append(direccion)
+        ocultas = self._ocultas.get(var)
+        if ocultas:
+            self.variables[var] = ocultas.pop()
+    
+    def _cargar(self, operando, codigo_p):
+        """Apila un operando: las constantes con ldc (True/False como 1/0) y las variables y
+        temporales desde su dirección"""
+        codigo = self.codigo
+        if codigo.clase(operando) == CONSTANTE:
+            valor = codigo.valores[operando]
+            if isinstance(valor, bool):
+                codigo_p.append(f'ldc {1 if valor else 0}')
+            else:
+                codigo_p.append(f'ldc {codigo.textos[operando]}')
+        else:
+            codigo_p.append(f'lod {self.obtener_direccion(codigo.nombre(operando))}')
+
+    def _en_pila(self):
+        """Temporales que solo lee el salto condicional que sigue a la instrucción que los calcula:
+        se dejan en la pila en lugar de almacenarlos y volver a cargarlos"""
+        codigo = self.codigo
+        destinos, args1 = codigo.destinos, codigo.args1
+        lecturas = {}
+        for operandos in (args1, codigo.args2):
+            for operando in operandos:
+                # Los temporales tienen índice menor que SIN_OPERANDO
+                if operando < SIN_OPERANDO:
+                    lecturas[operando] = lecturas.get(operando, 0) + 1
+        en_pila = set()
+        opcodes = codigo.opcodes
+        for i in range(len(opcodes) - 1):
+            destino = destinos[i]
+            if ((opcodes[i] >= BINARIA or opcodes[i] == NEGACION_LOGICA) and opcodes[i + 1] in (SALTO_SI_NO, SALTO_SI)
+                    and args1[i + 1] == destino and destino < SIN_OPERANDO and lecturas[destino] == 1):
+                en_pila.add(destino)
+        return en_pila
     
     def generar_codigo_p(self):
-        """Genera código P a partir del código de tres direcciones"""
+        """Genera código P a partir de las cuádruplas del código intermedio"""
         codigo_p = []
 
         # Añadir comentario identificador del generador (útil para confirmar versión en UI)
         codigo_p.append('; Generador: etiquetas lab/fjp/ujp (minusculas)')
 
-        def es_numero(s):
-            try:
-                float(s)
-                return True
-            except Exception:
-                return False
-
-        # Pre-analizar para detectar temporales que solo se usan en condiciones
-        temporales_en_condicion = set()
-        temporales_usados_en_operaciones = set()
-        
-        # Primero, detectar temporales usados en otras operaciones (como AND, OR)
-        for instruccion in self.codigo:
-            inst = instruccion.strip()
-            if '=' in inst:
-                _, expresion = inst.split('=', 1)
-                expresion = expresion.strip()
-                # Si la expresión contiene un temporal (t0, t1, etc.)
-                import re
-                temporales_en_expr = re.findall(r'\bt\d+\b', expresion)
-                temporales_usados_en_operaciones.update(temporales_en_expr)
-        
-        # Luego, detectar temporales que van directo a if
-        for i, instruccion in enumerate(self.codigo):
-            inst = instruccion.strip()
-            # Detectar: temporal = comparación seguido de if not temporal
-            if '=' in inst and i + 1 < len(self.codigo):
-                next_inst = self.codigo[i + 1].strip()
-                if next_inst.startswith('if not') or next_inst.startswith('if '):
-                    destino = inst.split('=')[0].strip()
-                    # Solo optimizar si NO se usa en otras operaciones
-                    if destino.startswith('t') and destino not in temporales_usados_en_operaciones:
-                        temporales_en_condicion.add(destino)
-
-        # Traducción instrucción a instrucción manteniendo etiquetas simbólicas
-        i = 0
-        while i < len(self.codigo):
-            instruccion = self.codigo[i]
-            inst = instruccion.strip()
-            inst = instruccion.strip()
+        codigo = self.codigo
+        opcodes, destinos, args1, args2 = codigo.opcodes, codigo.destinos, codigo.args1, codigo.args2
+        valores, textos, nombre = codigo.valores, codigo.textos, codigo.nombre
+        en_pila = self._en_pila()
+        cargar = self._cargar
 
-            # Comentarios
-            if inst.startswith('#'):
-                codigo_p.append(f"; {inst[1:].strip()}")
-                i += 1
-                continue
+        for i in range(len(opcodes)):
+            opcode, destino, arg1 = opcodes[i], destinos[i], args1[i]
 
-            # DECLARE var tipo -> reservar dirección (no emite instrucción de máquina)
-            if inst.startswith('DECLARE'):
-                partes = inst.split()
-                if len(partes) >= 2:
-                    var = partes[1]
-                    self.obtener_direccion(var)
-                i += 1
-                continue
+            # destino = arg1 operador arg2
+            if opcode >= BINARIA:
+                operador = OPERADORES_BINARIOS[opcode - BINARIA]
+                if operador not in self.NEMONICOS and operador != '!=':
+                    # Operador sin nemónico (<<, >>, &, ! binario): la expresión se carga entera
+                    # como si fuera una variable
+                    codigo_p.append(f'lod {self.obtener_direccion(f"{nombre(arg1)} {operador} {nombre(args2[i])}")}')
+                    codigo_p.append(f'sto {self.obtener_direccion(nombre(destino))}')
+                    continue
+                cargar(arg1, codigo_p)
+                cargar(args2[i], codigo_p)
+                if operador == '!=':
+                    # Implementar != como equ + ldc 0 + equ (negación)
+                    codigo_p.append('equ')
+                    codigo_p.append('ldc 0')
+                    codigo_p.append('equ')
+                else:
+                    codigo_p.append(self.NEMONICOS[operador])
+                if destino not in en_pila:
+                    codigo_p.append(f'sto {self.obtener_direccion(nombre(destino))}')
 
-            # READ var
-            if inst.startswith('READ'):
-                var = inst.split()[1]
-                dir_var = self.obtener_direccion(var)
-                codigo_p.append('rd')
-                codigo_p.append(f'sto {dir_var}')
-                i += 1
-                continue
+            # destino = arg1
+            elif opcode == COPIA:
+                cargar(arg1, codigo_p)
+                codigo_p.append(f'sto {self.obtener_direccion(nombre(destino))}')
 
-            # WRITE var o literal
-            if inst.startswith('WRITE'):
-                partes = inst.split(None, 1)
-                if len(partes) >= 2:
-                    valor = partes[1]
-                    # Si es una cadena literal (empieza con comilla)
-                    if valor.startswith('"') or valor.startswith("'"):
-                        codigo_p.append(f'ldc {valor}')
-                        codigo_p.append('wr')
-                    # Si es un número literal
-                    elif es_numero(valor):
-                        codigo_p.append(f'ldc {valor}')
-                        codigo_p.append('wr')
-                    # Si es una variable
-                    else:
-                        dir_var = self.obtener_direccion(valor)
-                        codigo_p.append(f'lod {dir_var}')
-                        codigo_p.append('wr')
-                i += 1
-                continue
+            # destino = !arg1, como arg1 == 0
+            elif opcode == NEGACION_LOGICA:
+                cargar(arg1, codigo_p)
+                codigo_p.append('ldc 0')
+                codigo_p.append('equ')
+                if destino not in en_pila:
+                    codigo_p.append(f'sto {self.obtener_direccion(nombre(destino))}')
 
-            # Etiqueta sintáctica (ej: L0:)
-            if inst.endswith(':') and not '=' in inst:
-                label = inst.replace(':', '').strip()
-                # Emitir etiqueta en formato: lab L0
-                codigo_p.append(f'lab {label}')
-                i += 1
-                continue
+            # if not arg1 goto destino
+            elif opcode == SALTO_SI_NO:
+                if arg1 not in en_pila:
+                    cargar(arg1, codigo_p)
+                codigo_p.append(f'fjp {textos[destino]}')
 
-            # Salto incondicional
-            if inst.startswith('goto'):
-                label = inst.split()[1]
-                codigo_p.append(f'ujp {label}')
-                i += 1
-                continue
+            # if arg1 goto destino: comparar con cero -> si igual a 0 entonces falso
+            elif opcode == SALTO_SI:
+                if arg1 not in en_pila:
+                    cargar(arg1, codigo_p)
+                codigo_p.append('ldc 0')
+                codigo_p.append('equ')
+                codigo_p.append(f'fjp {textos[destino]}')
 
-            # if not <cond> goto <label>
-            if inst.startswith('if not'):
-                partes = inst.split()
-                # formato esperado: if not <cond> goto <label>
-                if len(partes) >= 5:
-                    cond = partes[2]
-                    label = partes[4]
-                    # Si el temporal ya NO fue almacenado, no cargarlo
-                    if cond not in temporales_en_condicion:
-                        # Manejar literales numéricos y booleanos
-                        if es_numero(cond):
-                            codigo_p.append(f'ldc {cond}')
-                        elif cond in ('True', 'true', 'False', 'false'):
-                            # traducir booleanos a 1/0
-                            val = '1' if cond.lower() == 'true' else '0'
-                            codigo_p.append(f'ldc {val}')
-                        else:
-                            dir_cond = self.obtener_direccion(cond)
-                            codigo_p.append(f'lod {dir_cond}')
-                    codigo_p.append(f'fjp {label}')
-                    i += 1
-                    continue
+            elif opcode == SALTO:
+                codigo_p.append(f'ujp {textos[destino]}')
 
-            # if <cond> goto <label>  (forma alternativa)
-            if inst.startswith('if') and 'not' not in inst:
-                partes = inst.split()
-                if len(partes) >= 4:
-                    cond = partes[1]
-                    label = partes[3]
-                    if cond not in temporales_en_condicion:
-                        if es_numero(cond):
-                            codigo_p.append(f'ldc {cond}')
-                        elif cond in ('True', 'true', 'False', 'false'):
-                            val = '1' if cond.lower() == 'true' else '0'
-                            codigo_p.append(f'ldc {val}')
-                        else:
-                            dir_cond = self.obtener_direccion(cond)
-                            codigo_p.append(f'lod {dir_cond}')
-                    # comparar con cero -> si igual a 0 entonces falso
-                    codigo_p.append('ldc 0')
-                    codigo_p.append('equ')
-                    codigo_p.append(f'fjp {label}')
-                    i += 1
-                    continue
+            elif opcode == ETIQUETA:
+                codigo_p.append(f'lab {textos[destino]}')
 
-            # Asignaciones y operaciones
-            if '=' in inst:
-                destino, expresion = inst.split('=', 1)
-                destino = destino.strip()
-                expresion = expresion.strip()
-
-                # Manejar valores booleanos (True/False)
-                if expresion in ('True', 'False', 'true', 'false'):
-                    dir_dest = self.obtener_direccion(destino)
-                    valor = '1' if expresion.lower() == 'true' else '0'
-                    codigo_p.append(f'ldc {valor}')
-                    codigo_p.append(f'sto {dir_dest}')
-                    i += 1
-                    continue
+            elif opcode == LECTURA:
+                dir_var = self.obtener_direccion(valores[destino])
+                codigo_p.append('rd')
+                codigo_p.append(f'sto {dir_var}')
 
-                # caso constante simple
-                if es_numero(expresion):
-                    dir_dest = self.obtener_direccion(destino)
-                    codigo_p.append(f'ldc {expresion}')
-                    codigo_p.append(f'sto {dir_dest}')
-                    i += 1
-                    continue
+            elif opcode == ESCRITURA:
+                cargar(arg1, codigo_p)
+                codigo_p.append('wr')
 
-                # operadores soportados
-                operadores = {
-                    '==': 'equ', '!=': 'neq', '<=': 'leq', '>=': 'geq',
-                    '&&': 'and', '||': 'or',
-                    '<': 'les', '>': 'grt',
-                    '+': 'adi', '-': 'sbi', '*': 'mpi', '/': 'dvi', '%': 'mod', '**': 'pot'
-                }
-
-                encontrado = False
-                # buscar operadores de mayor longitud primero
-                for op in sorted(operadores.keys(), key=lambda x: -len(x)):
-                    if f' {op} ' in expresion:
-                        op1, op2 = map(str.strip, expresion.split(op, 1))
-                        # cargar operandos
-                        if es_numero(op1):
-                            codigo_p.append(f'ldc {op1}')
-                        else:
-                            codigo_p.append(f'lod {self.obtener_direccion(op1)}')
-                        if es_numero(op2):
-                            codigo_p.append(f'ldc {op2}')
-                        else:
-                            codigo_p.append(f'lod {self.obtener_direccion(op2)}')
-
-                        nem = operadores[op]
-                        if nem == 'neq':
-                            # Implementar != como equ + ldc 0 + equ (negación)
-                            codigo_p.append('equ')
-                            codigo_p.append('ldc 0')
-                            codigo_p.append('equ')
-                        else:
-                            codigo_p.append(nem)
-
-                        # Solo almacenar si NO es un temporal usado solo en condición
-                        if destino not in temporales_en_condicion:
-                            codigo_p.append(f'sto {self.obtener_direccion(destino)}')
-                        encontrado = True
-                        break
+            # DECLARE var tipo -> reservar dirección (no emite instrucción de máquina)
+            elif opcode == DECLARACION:
+                self.declarar(valores[destino])
 
-                if encontrado:
-                    i += 1
-                    continue
+            # RELEASE var -> la variable local sale de alcance y su dirección se puede reutilizar.
+            # Se pone en 0 para que la próxima variable que la ocupe (o la misma, en la siguiente
+            # vuelta de un ciclo) lea sin inicializar lo mismo que en una dirección nueva
+            elif opcode == LIBERACION:
+                if valores[destino] in self.variables:
+                    codigo_p.append('ldc 0')
+                    codigo_p.append(f'sto {self.variables[valores[destino]]}')
+                self.liberar(valores[destino])
 
-                # Asignación simple var = var
-                codigo_p.append(f'lod {self.obtener_direccion(expresion)}')
-                codigo_p.append(f'sto {self.obtener_direccion(destino)}')
-                i += 1
-                continue
-            
-            # Incrementar contador si no hubo continue
-            i += 1
+            # Comentarios
+            else:
+                codigo_p.append(f"; {textos[arg1]}")
 
         # finalizar programa
         codigo_p.append('hlt')
         return codigo_p
 
 
+# Clases de los resúmenes de expresiones compartidas (ver AnalizadorSemantico._resumir)
+_SIN_EFECTO, _CONSTANTE, _VARIABLE, _NO_DECLARADA, _BINARIA, _NEGACION, _INCREMENTO, _NEGACION_LOGICA, _PRIMER_HIJO = range(9)
+
+# Resultado de una subexpresión que es un temporal nuevo en cada aparición
+_TEMPORAL = object()
+
+# Diagnósticos cuyos dos primeros argumentos son la línea y la columna
+_CON_POSICION = frozenset({"SEM001", "SEM002", "SEM003", "SEM006", "SEM101", "SEM102"})
+
 class AnalizadorSemantico:
     """Analizador semántico que recorre el AST y verifica reglas semánticas"""
-    def __init__(self, ast):
+    # 'expresiones' es la TablaExpresiones del analizador sintáctico cuando el AST se construyó
+    # con compartir_expresiones: cada subexpresión distinta se verifica una sola vez. Las
+    # anotaciones de un nodo compartido (tipo_semantico, valor_calculado) quedan puestas aunque
+    # alguna de sus apariciones no se visite.
+
+    # Método de visitar_expresion para cada tipo de nodo; los demás se recorren por sus hijos
+    _METODOS_EXPRESION = {
+        "NUMERO_ENTERO": "_expresion_entero",
+        "NUMERO_REAL": "_expresion_real",
+        "bool": "_expresion_bool",
+        "id": "_expresion_id",
+        "IDENTIFICADOR": "_expresion_id",
+        "suma_op": "visitar_operacion_binaria",
+        "mult_op": "visitar_operacion_binaria",
+        "pot_op": "visitar_operacion_binaria",
+        "op": "visitar_operacion_binaria",
+        "unario_op": "visitar_operacion_unaria",
+        "unario": "visitar_operacion_unaria",
+        "op_logico": "visitar_operacion_logica",
+    }
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._construir_despacho()
+
+    @classmethod
+    def _construir_despacho(cls):
+        """Resuelve una vez por clase la función de cada tipo de nodo: en _visitas la de visitar
+        (visitar_<tipo>) y en _expresiones la de visitar_expresion (_METODOS_EXPRESION)"""
+        prefijo = "visitar_"
+        cls._visitas = {nombre[len(prefijo):]: getattr(cls, nombre) for nombre in dir(cls) if nombre.startswith(prefijo)}
+        cls._expresiones = {tipo: getattr(cls, nombre) for tipo, nombre in cls._METODOS_EXPRESION.items()}
+
+    def __init__(self, ast, errores=None, advertencias=None, expresiones=None, fuente=None):
         self.ast = ast
+        self.expresiones = expresiones
+        self.fuente = fuente  # ArchivoFuente opcional para guardar el desplazamiento de los diagnósticos
+        self._resumenes = {}  # Nodo compartido -> resumen (ver _resumir)
+        self._tamanos = {}    # Nodo compartido -> cantidad de nodos de su subárbol
+        self._faltantes = False  # Algún resumen depende de una variable no declarada
         self.tabla_simbolos = TablaSimbolos()
-        self.errores = []
-        self.advertencias = []
+        # Listas de Diagnostico; por omisión con los límites configurados para la fase semántica
+        self.errores = lista_para_fase("semantico") if errores is None else errores
+        self.advertencias = lista_para_fase("semantico", detener_en=None) if advertencias is None else advertencias
         self.generador = GeneradorCodigoIntermedio()
         self.tipo_actual = None  # Para tracking del tipo en declaraciones
     
+    def _offset(self, codigo, args, posicion):
+        """Desplazamiento del diagnóstico en la fuente: el de (linea, columna) en los códigos que
+        empiezan con ellos, si no el de 'posicion'; None sin la fuente o sin posición"""
+        if self.fuente is None:
+            return None
+        if codigo in _CON_POSICION:
+            linea, columna = args[0], args[1]
+        elif posicion is not None:
+            linea, columna = posicion
+        else:
+            return None
+        if linea is None or columna is None:
+            return None
+        return self.fuente.offset(linea, columna)
+
+    def registrar_error(self, codigo, *args, posicion=None):
+        """Agrega un Diagnostico; 'posicion' es (linea, columna) de los códigos sin ellas en el mensaje"""
+        self.errores.append(Diagnostico(codigo, ERROR, self._offset(codigo, args, posicion), args))
+
+    def registrar_advertencia(self, codigo, *args, posicion=None):
+        self.advertencias.append(Diagnostico(codigo, ADVERTENCIA, self._offset(codigo, args, posicion), args))
+
     def analizar(self):
         """Ejecuta el análisis semántico completo"""
         try:
@@ -389,10 +591,7 @@ class AnalizadorSemantico:
              # Verificar variables no usadas
             for simbolo in self.tabla_simbolos.obtener_simbolos():
                 if not simbolo.usado:
-                    self.advertencias.append(
-                        f"Advertencia en L{simbolo.linea} C{simbolo.columna}: "
-                        f"Variable '{simbolo.nombre}' declarada pero no usada"
-                    )
+                    self.registrar_advertencia("SEM101", simbolo.linea, simbolo.columna, simbolo.nombre)
             # Recolectar información semántica detallada
             semantico_detalle = []
             self.recolectar_info_semantica(self.ast, semantico_detalle)
@@ -401,12 +600,19 @@ class AnalizadorSemantico:
             codigo_p = self.generador.generar_codigo_p()
             
             return self.tabla_simbolos, self.errores, self.advertencias, self.generador.obtener_codigo(), semantico_detalle, codigo_p
+        except FaseDetenida:
+            # Modo de detención temprana: se alcanzó el límite de errores
+            return self.tabla_simbolos, self.errores, self.advertencias, [], [], []
         except Exception as e:
-            self.errores.append(f"Error crítico en análisis semántico: {str(e)}")
+            try:
+                self.registrar_error("SEM008", str(e))
+            except FaseDetenida:
+                pass
             return self.tabla_simbolos, self.errores, self.advertencias, [], [], []
 
-    def recolectar_info_semantica(self, nodo, resultado):
-        """Recorre el AST y recolecta información semántica por nodo"""
+    def recolectar_info_semantica(self, nodo, resultado, indices=None):
+        """Recorre el AST y recolecta información semántica por nodo. 'indices' da, en una
+        expresión compartida, el índice de la posición de cada nodo en el recorrido"""
         if nodo is None:
             return
         
@@ -429,7 +635,7 @@ class AnalizadorSemantico:
             valor = nodo.valor
         
         # Si el nodo tiene un valor calculado de una operación, mostrarlo
-        if hasattr(nodo, 'valor_calculado'):
+        if getattr(nodo, 'valor_calculado', None) is not None:
             valor_calc = nodo.valor_calculado
             # Formatear el valor calculado
             if isinstance(valor_calc, bool):
@@ -444,54 +650,61 @@ class AnalizadorSemantico:
                 valor_calc_str = str(valor_calc)
             valor = f"{valor} ({valor_calc_str})"
         
+        if indices is None:
+            linea, columna = getattr(nodo, 'linea', ''), getattr(nodo, 'columna', '')
+        else:
+            linea, columna = self.expresiones.posicion(next(indices))
         resultado.append({
             'nodo': nodo.tipo,
             'valor': valor,
             'tipo_semantico': tipo_sem,
-            'linea': getattr(nodo, 'linea', ''),
-            'columna': getattr(nodo, 'columna', '')
+            'linea': linea,
+            'columna': columna
         })
-        for hijo in getattr(nodo, 'hijos', []):
-            self.recolectar_info_semantica(hijo, resultado)
+        # Si el nodo es una sentencia con una expresión compartida: (índice del hijo, posición)
+        ocurrencia = None
+        if indices is None and self.expresiones is not None:
+            ocurrencia = self.expresiones.ocurrencias.get(nodo)
+        for i, hijo in enumerate(getattr(nodo, 'hijos', [])):
+            if ocurrencia is not None and i == ocurrencia[0]:
+                self.recolectar_info_semantica(hijo, resultado, count(ocurrencia[1]))
+            else:
+                self.recolectar_info_semantica(hijo, resultado, indices)
     
     def visitar(self, nodo):
         """Visita un nodo del AST según su tipo"""
         if nodo is None:
             return None
         
-        # Si es una tupla (resultado de visitar_expresion), no procesarla
-        if isinstance(nodo, tuple):
-            return None
-        
-        # Verificar que tenga atributo tipo
-        if not hasattr(nodo, 'tipo'):
+        # Las tuplas (resultado de visitar_expresion) y lo que no tenga tipo no se procesan
+        try:
+            tipo = nodo.tipo
+        except AttributeError:
             return None
         
-        metodo_nombre = f"visitar_{nodo.tipo}"
-        metodo = getattr(self, metodo_nombre, self.visitar_generico)
-        return metodo(nodo)
+        funcion = self._visitas.get(tipo)
+        if funcion is None:
+            return self.visitar_generico(nodo)
+        return funcion(self, nodo)
     
     def visitar_generico(self, nodo):
         """Visita genérica para nodos sin método específico"""
         for hijo in nodo.hijos:
-            if not isinstance(hijo, tuple) and hasattr(hijo, 'tipo'):
-                self.visitar(hijo)
+            self.visitar(hijo)
         return None
     
     def visitar_programa(self, nodo):
         """Visita el nodo programa"""
-        self.generador.agregar("# Inicio del programa")
+        self.generador.agregar_comentario("Inicio del programa")
         for hijo in nodo.hijos:
-            if not isinstance(hijo, tuple) and hasattr(hijo, 'tipo'):
-                self.visitar(hijo)
-        self.generador.agregar("# Fin del programa")
+            self.visitar(hijo)
+        self.generador.agregar_comentario("Fin del programa")
         return None
     
     def visitar_lista_declaracion(self, nodo):
         """Visita lista de declaraciones"""
         for hijo in nodo.hijos:
-            if not isinstance(hijo, tuple) and hasattr(hijo, 'tipo'):
-                self.visitar(hijo)
+            self.visitar(hijo)
         return None
     
     def visitar_declaracion_variable(self, nodo):
@@ -514,14 +727,18 @@ class AnalizadorSemantico:
                             inicializado=False
                         )
                         if not exito:
-                            self.errores.append(error)
+                            self.registrar_error(error.codigo, *error.args)
                         else:
-                            # Agregar línea de declaración
                             simbolo = self.tabla_simbolos.buscar(id_nodo.valor)
-                            if simbolo:
-                                simbolo.lineas_uso.append(id_nodo.linea)
+                            # Los resúmenes con variables no declaradas, o con la que esta
+                            # declaración oculta, dejan de valer
+                            if self._faltantes or simbolo.sombreado is not None:
+                                self._resumenes.clear()
+                                self._faltantes = False
+                            # Agregar línea de declaración
+                            self.tabla_simbolos.referencias.agregar(simbolo.numero, id_nodo.linea, id_nodo.columna)
                             # Generar código intermedio para declaración
-                            self.generador.agregar(f"DECLARE {id_nodo.valor} {self.tipo_actual}")
+                            self.generador.agregar_declaracion(id_nodo.valor, self.tipo_actual)
         
         return None
     
@@ -540,7 +757,7 @@ class AnalizadorSemantico:
         
         # Segundo hijo es la expresión (evaluar antes de verificar el símbolo)
         expr_nodo = nodo.hijos[1]
-        tipo_expr, temp_expr = self.visitar_expresion(expr_nodo)
+        tipo_expr, temp_expr = self.visitar_expresion(expr_nodo, nodo)
         
         # Si temp_expr es un valor numérico calculado, almacenarlo para visualización
         valor_asignado = None
@@ -555,26 +772,20 @@ class AnalizadorSemantico:
             nodo.valor_calculado = valor_asignado
         
         if simbolo is None:
-            self.errores.append(
-                f"Error semántico en L{id_nodo.linea} C{id_nodo.columna}: "
-                f"Variable '{nombre_var}' no declarada"
-            )
+            self.registrar_error("SEM002", id_nodo.linea, id_nodo.columna, nombre_var)
             # Establecer un tipo genérico para visualización
             nodo.tipo_semantico = "int" if isinstance(valor_asignado, int) else "float" if isinstance(valor_asignado, float) else "unknown"
             return None
         
         # Marcar como usada e inicializada
-        self.tabla_simbolos.marcar_usado(nombre_var, id_nodo.linea)
+        self.tabla_simbolos.marcar_usado(nombre_var, id_nodo.linea, id_nodo.columna)
         
         if tipo_expr is None:
             return None
         
         # Verificar compatibilidad de tipos
         if not self.tipos_compatibles(simbolo.tipo, tipo_expr):
-            self.errores.append(
-                f"Error semántico en L{id_nodo.linea} C{id_nodo.columna}: "
-                f"Incompatibilidad de tipos: no se puede asignar '{tipo_expr}' a '{simbolo.tipo}'"
-            )
+            self.registrar_error("SEM003", id_nodo.linea, id_nodo.columna, tipo_expr, simbolo.tipo)
         
         self.tabla_simbolos.marcar_inicializado(nombre_var, valor_asignado)
         
@@ -583,80 +794,258 @@ class AnalizadorSemantico:
         
         # Generar código intermedio
         if temp_expr is not None:
-            self.generador.agregar(f"{nombre_var} = {temp_expr}")
+            self.generador.agregar_copia(nombre_var, temp_expr)
         
         return simbolo.tipo
     
-    def visitar_expresion(self, nodo):
-        """Visita una expresión y retorna su tipo"""
+    def visitar_expresion(self, nodo, padre=None):
+        """Visita una expresión y retorna su tipo. 'padre' es la sentencia que la contiene"""
         if nodo is None:
             return None, None
+        if self.expresiones is not None and padre is not None:
+            inicio = self.expresiones.ubicacion(padre, nodo)
+            if inicio is not None:
+                return self.visitar_expresion_compartida(nodo, inicio)
         
-        # Casos base: literales
-        if nodo.tipo == "NUMERO_ENTERO":
-            nodo.tipo_semantico = "int"
-            try:
-                return "int", int(nodo.valor)
-            except:
-                return "int", nodo.valor
-        elif nodo.tipo == "NUMERO_REAL":
-            nodo.tipo_semantico = "float"
-            try:
-                return "float", float(nodo.valor)
-            except:
-                return "float", nodo.valor
-        elif nodo.tipo == "bool":
-            nodo.tipo_semantico = "bool"
-            # Convertir el string "true"/"false" a booleano de Python
-            valor_bool = nodo.valor.lower() == "true" if isinstance(nodo.valor, str) else bool(nodo.valor)
-            return "bool", valor_bool
+        funcion = self._expresiones.get(nodo.tipo)
+        if funcion is not None:
+            return funcion(self, nodo)
+        
+        # Recursivo para otros nodos
+        for hijo in nodo.hijos:
+            resultado = self.visitar_expresion(hijo, nodo)
+            if resultado[0] is not None:
+                return resultado
+        
+        return None, None
+    
+    # Casos base de visitar_expresion: literales e identificadores
+    def _expresion_entero(self, nodo):
+        nodo.tipo_semantico = "int"
+        try:
+            return "int", int(nodo.valor)
+        except:
+            return "int", nodo.valor
+
+    def _expresion_real(self, nodo):
+        nodo.tipo_semantico = "float"
+        try:
+            return "float", float(nodo.valor)
+        except:
+            return "float", nodo.valor
+
+    def _expresion_bool(self, nodo):
+        nodo.tipo_semantico = "bool"
+        # Convertir el string "true"/"false" a booleano de Python
+        valor_bool = nodo.valor.lower() == "true" if isinstance(nodo.valor, str) else bool(nodo.valor)
+        return "bool", valor_bool
+
+    def _expresion_id(self, nodo):
+        # Verificar que la variable exista
+        simbolo = self.tabla_simbolos.buscar(nodo.valor)
+        if simbolo is None:
+            self.registrar_error("SEM002", nodo.linea, nodo.columna, nodo.valor)
+            return None, None
+        
+        # Verificar que esté inicializada
+        if not simbolo.inicializado:
+            self.registrar_advertencia("SEM102", nodo.linea, nodo.columna, nodo.valor)
+        
+        self.tabla_simbolos.marcar_usado(nodo.valor, nodo.linea, nodo.columna)
+        
+        # Almacenar el tipo semántico en el nodo
+        nodo.tipo_semantico = simbolo.tipo
+        
+        # Siempre retornar el nombre de la variable para el código intermedio
+        # (no optimizar sustituyendo por el valor, ya que la variable puede cambiar)
+        return simbolo.tipo, nodo.valor
+    
+    def visitar_expresion_compartida(self, nodo, inicio):
+        """visitar_expresion para una expresión compartida (TablaExpresiones) cuyas posiciones
+        empiezan en 'inicio'.
+
+        Lo que no depende de dónde aparece la expresión (tipos, valores constantes, anotaciones
+        del nodo) se calcula una vez por subexpresión distinta en _resumir. En cada aparición
+        solo se hace lo que sí depende de ella, igual que en visitar_expresion y en el mismo
+        orden: marcar el uso de las variables, las advertencias por variables sin inicializar,
+        los errores con su posición y el código intermedio con temporales nuevos.
+        """
+        tipo, resultado, _ = self._emitir(nodo, inicio)
+        return tipo, resultado
+
+    def _resumen(self, nodo):
+        resumen = self._resumenes.get(nodo)
+        if resumen is None:
+            resumen = self._resumenes[nodo] = self._resumir(nodo)
+        return resumen
+
+    def _tamano(self, nodo):
+        tamano = self._tamanos.get(nodo)
+        if tamano is None:
+            tamano = self._tamanos[nodo] = 1 + sum(self._tamano(hijo) for hijo in nodo.hijos)
+        return tamano
+
+    def _resumir(self, nodo):
+        """(clase, tipo, resultado, dato) de una expresión compartida, según las variables
+        declaradas hasta ahora. 'resultado' es el valor que devolvería visitar_expresion, o
+        _TEMPORAL si es un temporal nuevo. Solo se resumen (y anotan) los hijos que
+        visitar_expresion visitaría."""
+        hijos = nodo.hijos
+
+        if nodo.tipo in ("NUMERO_ENTERO", "NUMERO_REAL", "bool"):
+            # Misma conversión que visitar_expresion
+            tipo, valor = self.visitar_expresion(nodo)
+            return _CONSTANTE, tipo, valor, None
         elif nodo.tipo == "id" or nodo.tipo == "IDENTIFICADOR":
-            # Verificar que la variable exista
             simbolo = self.tabla_simbolos.buscar(nodo.valor)
             if simbolo is None:
-                self.errores.append(
-                    f"Error semántico en L{nodo.linea} C{nodo.columna}: "
-                    f"Variable '{nodo.valor}' no declarada"
-                )
-                return None, None
-            
-            # Verificar que esté inicializada
-            if not simbolo.inicializado:
-                self.advertencias.append(
-                    f"Advertencia en L{nodo.linea} C{nodo.columna}: "
-                    f"Variable '{nodo.valor}' puede no estar inicializada"
-                )
-            
-            self.tabla_simbolos.marcar_usado(nodo.valor, nodo.linea)
-            
-            # Almacenar el tipo semántico en el nodo
+                self._faltantes = True
+                return _NO_DECLARADA, None, None, None
             nodo.tipo_semantico = simbolo.tipo
-            
-            # Siempre retornar el nombre de la variable para el código intermedio
-            # (no optimizar sustituyendo por el valor, ya que la variable puede cambiar)
-            return simbolo.tipo, nodo.valor
-        
-        # Operadores binarios
+            return _VARIABLE, simbolo.tipo, nodo.valor, None
+
         elif nodo.tipo in ["suma_op", "mult_op", "pot_op", "op"]:
-            return self.visitar_operacion_binaria(nodo)
-        
-        # Operador unario
+            if len(hijos) < 2:
+                return _SIN_EFECTO, None, None, None
+            _, tipo_izq, temp_izq, _ = self._resumen(hijos[0])
+            _, tipo_der, temp_der, _ = self._resumen(hijos[1])
+            if tipo_izq is None or tipo_der is None:
+                return _BINARIA, None, None, None
+            tipo, valor = self.calcular_operacion_binaria(nodo, tipo_izq, temp_izq, tipo_der, temp_der)
+            if tipo is None:
+                return _BINARIA, None, None, (nodo.valor, tipo_izq, tipo_der)
+            return _BINARIA, tipo, _TEMPORAL if valor is None else valor, None
+
         elif nodo.tipo in ["unario_op", "unario"]:
-            return self.visitar_operacion_unaria(nodo)
-        
-        # Operador lógico
+            if not hijos:
+                return _SIN_EFECTO, None, None, None
+            if nodo.valor == "-":
+                _, tipo, valor, _ = self._resumen(hijos[0])
+                if tipo not in ["int", "float"]:
+                    return _NEGACION, None, None, tipo
+                nodo.tipo_semantico = tipo
+                if isinstance(valor, (int, float)):
+                    nodo.valor_calculado = -valor
+                    return _NEGACION, tipo, -valor, None
+                return _NEGACION, tipo, _TEMPORAL, None
+            id_nodo = hijos[0]
+            if id_nodo.tipo != "id":
+                return _SIN_EFECTO, None, None, None
+            simbolo = self.tabla_simbolos.buscar(id_nodo.valor)
+            if simbolo is None:
+                self._faltantes = True
+            tipo = simbolo.tipo if simbolo is not None and simbolo.tipo in ["int", "float"] else None
+            return _INCREMENTO, tipo, id_nodo.valor, simbolo
+
         elif nodo.tipo == "op_logico":
-            return self.visitar_operacion_logica(nodo)
-        
-        # Recursivo para otros nodos
-        else:
-            for hijo in nodo.hijos:
-                resultado = self.visitar_expresion(hijo)
-                if resultado[0] is not None:
-                    return resultado
-        
-        return None, None
-    
+            if nodo.valor != "!" or not hijos:
+                return _SIN_EFECTO, None, None, None
+            _, tipo, valor, _ = self._resumen(hijos[0])
+            if tipo != "bool":
+                return _NEGACION_LOGICA, None, None, tipo
+            nodo.tipo_semantico = "bool"
+            if isinstance(valor, bool):
+                nodo.valor_calculado = not valor
+                return _NEGACION_LOGICA, "bool", not valor, None
+            return _NEGACION_LOGICA, "bool", _TEMPORAL, None
+
+        # Otros nodos: el resultado es el del primer hijo con tipo
+        for i, hijo in enumerate(hijos):
+            _, tipo, valor, _ = self._resumen(hijo)
+            if tipo is not None:
+                return _PRIMER_HIJO, tipo, valor, i
+        return _PRIMER_HIJO, None, None, len(hijos)
+
+    def _emitir(self, nodo, indice):
+        """Efectos de una aparición de la expresión compartida 'nodo' cuyo primer nodo tiene la
+        posición 'indice'. Devuelve (tipo, resultado) como visitar_expresion y la posición que
+        sigue a la del último nodo de 'nodo'."""
+        resumen = self._resumenes.get(nodo)
+        if resumen is None:
+            resumen = self._resumenes[nodo] = self._resumir(nodo)
+        clase, tipo, resultado, dato = resumen
+        if clase == _CONSTANTE:
+            return tipo, resultado, indice + 1
+        elif clase == _VARIABLE:
+            # Los identificadores siempre tienen posición
+            linea = self.expresiones.posiciones[2 * indice] - 1
+            columna = self.expresiones.posiciones[2 * indice + 1] - 1
+            if not self.tabla_simbolos.buscar(resultado).inicializado:
+                self.registrar_advertencia("SEM102", linea, columna, resultado)
+            self.tabla_simbolos.marcar_usado(resultado, linea, columna)
+            return tipo, resultado, indice + 1
+
+        elif clase == _BINARIA:
+            izquierdo, derecho = nodo.hijos[:2]
+            _, temp_izq, siguiente = self._emitir(izquierdo, indice + 1)
+            _, temp_der, siguiente = self._emitir(derecho, siguiente)
+            if len(nodo.hijos) > 2:
+                siguiente = indice + self._tamano(nodo)
+            if tipo is None:
+                if dato is not None:
+                    self.registrar_error("SEM004", *dato, posicion=self.expresiones.posicion(indice))
+                return None, None, siguiente
+            temp = self.generador.nuevo_temporal()
+            self.generador.agregar_binaria(temp, temp_izq, nodo.valor, temp_der)
+            return tipo, temp if resultado is _TEMPORAL else resultado, siguiente
+
+        elif clase == _NO_DECLARADA:
+            linea, columna = self.expresiones.posicion(indice)
+            self.registrar_error("SEM002", linea, columna, nodo.valor)
+            return None, None, indice + 1
+        elif clase == _SIN_EFECTO:
+            return None, None, indice + self._tamano(nodo)
+
+        elif clase == _NEGACION:
+            _, temp_operando, siguiente = self._emitir(nodo.hijos[0], indice + 1)
+            if len(nodo.hijos) > 1:
+                siguiente = indice + self._tamano(nodo)
+            if tipo is None:
+                self.registrar_error("SEM005", dato, posicion=self.expresiones.posicion(indice))
+                return None, None, siguiente
+            if resultado is not _TEMPORAL:
+                return tipo, resultado, siguiente
+            temp = self.generador.nuevo_temporal()
+            self.generador.agregar_binaria(temp, 0, "-", temp_operando)
+            return tipo, temp, siguiente
+
+        elif clase == _INCREMENTO:
+            siguiente = indice + self._tamano(nodo)
+            linea, columna = self.expresiones.posicion(indice + 1)
+            if dato is None:
+                self.registrar_error("SEM002", linea, columna, resultado)
+                return None, None, siguiente
+            if tipo is None:
+                self.registrar_error("SEM006", linea, columna, dato.tipo)
+                return None, None, siguiente
+            self.tabla_simbolos.marcar_usado(resultado, linea, columna)
+            temp = self.generador.nuevo_temporal()
+            self.generador.agregar_binaria(temp, resultado, "+", 1 if nodo.valor == 1 else -1)
+            self.generador.agregar_copia(resultado, temp)
+            return tipo, resultado, siguiente
+
+        elif clase == _NEGACION_LOGICA:
+            _, temp, siguiente = self._emitir(nodo.hijos[0], indice + 1)
+            if len(nodo.hijos) > 1:
+                siguiente = indice + self._tamano(nodo)
+            if tipo is None:
+                self.registrar_error("SEM007", dato, posicion=self.expresiones.posicion(indice))
+                return None, None, siguiente
+            temp_resultado = self.generador.nuevo_temporal()
+            self.generador.agregar_negacion_logica(temp_resultado, temp)
+            return tipo, temp_resultado if resultado is _TEMPORAL else resultado, siguiente
+
+        # _PRIMER_HIJO: se visitan los hijos hasta el que da el resultado
+        siguiente = indice + 1
+        for hijo in nodo.hijos[:dato + 1]:
+            visitado = self._emitir(hijo, siguiente)
+            siguiente = visitado[2]
+        if dato + 1 < len(nodo.hijos):
+            siguiente = indice + self._tamano(nodo)
+        if tipo is None:
+            return None, None, siguiente
+        return visitado[0], visitado[1], siguiente
+
     def visitar_operacion_binaria(self, nodo):
         """Visita operación binaria y calcula el valor si es posible"""
         if len(nodo.hijos) < 2:
@@ -668,6 +1057,24 @@ class AnalizadorSemantico:
         if tipo_izq is None or tipo_der is None:
             return None, None
         
+        tipo_resultado, valor_calculado = self.calcular_operacion_binaria(nodo, tipo_izq, temp_izq, tipo_der, temp_der)
+        if tipo_resultado is None:
+            self.registrar_error("SEM004", nodo.valor, tipo_izq, tipo_der, posicion=(nodo.linea, nodo.columna))
+            return None, None
+        
+        # Generar código intermedio
+        temp = self.generador.nuevo_temporal()
+        self.generador.agregar_binaria(temp, temp_izq, nodo.valor, temp_der)
+        
+        # Si calculamos un valor, usarlo en lugar del temporal
+        if valor_calculado is not None:
+            return tipo_resultado, valor_calculado
+        
+        return tipo_resultado, temp
+    
+    def calcular_operacion_binaria(self, nodo, tipo_izq, temp_izq, tipo_der, temp_der):
+        """Tipo resultante de la operación binaria 'nodo' y su valor si los operandos son constantes;
+        el tipo es None si los tipos son incompatibles. Anota el nodo para visualización."""
         operador = nodo.valor
         
         # Intentar evaluar el valor si ambos operandos son literales
@@ -751,23 +1158,11 @@ class AnalizadorSemantico:
             else:
                 tipo_resultado = "int"
         else:
-            self.errores.append(
-                f"Error semántico: Operación '{operador}' con tipos incompatibles '{tipo_izq}' y '{tipo_der}'"
-            )
-            return None, None
+            return None, valor_calculado
         
         # Almacenar el tipo en el nodo para visualización en el árbol
         nodo.tipo_semantico = tipo_resultado
-        
-        # Generar código intermedio
-        temp = self.generador.nuevo_temporal()
-        self.generador.agregar(f"{temp} = {temp_izq} {operador} {temp_der}")
-        
-        # Si calculamos un valor, usarlo en lugar del temporal
-        if valor_calculado is not None:
-            return tipo_resultado, valor_calculado
-        
-        return tipo_resultado, temp
+        return tipo_resultado, valor_calculado
     
     def visitar_unario(self, nodo):
         """Visita sentencia unaria como y++ o y-- (cuando aparece como sentencia completa)"""
@@ -776,7 +1171,7 @@ class AnalizadorSemantico:
     def visitar_expresion_sentencia(self, nodo):
         """Visita una expresión suelta como sentencia (ej: y + 2;)"""
         if nodo.hijos:
-            self.visitar_expresion(nodo.hijos[0])
+            self.visitar_expresion(nodo.hijos[0], nodo)
         return None
     
     def visitar_operacion_unaria(self, nodo):
@@ -789,9 +1184,7 @@ class AnalizadorSemantico:
             tipo_operando, temp_operando = self.visitar_expresion(nodo.hijos[0])
             
             if tipo_operando not in ["int", "float"]:
-                self.errores.append(
-                    f"Error semántico: Operador unario '-' requiere tipo numérico, se recibió '{tipo_operando}'"
-                )
+                self.registrar_error("SEM005", tipo_operando, posicion=(nodo.linea, nodo.columna))
                 return None, None
             
             # Si el operando es un número literal, retornar el valor negado directamente
@@ -803,7 +1196,7 @@ class AnalizadorSemantico:
             
             # Si es una variable, generar código intermedio
             temp = self.generador.nuevo_temporal()
-            self.generador.agregar(f"{temp} = 0 - {temp_operando}")
+            self.generador.agregar_binaria(temp, 0, "-", temp_operando)
             nodo.tipo_semantico = tipo_operando
             return tipo_operando, temp
         
@@ -815,30 +1208,22 @@ class AnalizadorSemantico:
         
         simbolo = self.tabla_simbolos.buscar(id_nodo.valor)
         if simbolo is None:
-            self.errores.append(
-                f"Error semántico en L{id_nodo.linea} C{id_nodo.columna}: "
-                f"Variable '{id_nodo.valor}' no declarada"
-            )
+            self.registrar_error("SEM002", id_nodo.linea, id_nodo.columna, id_nodo.valor)
             return None, None
         
         if simbolo.tipo not in ["int", "float"]:
-            self.errores.append(
-                f"Error semántico en L{id_nodo.linea} C{id_nodo.columna}: "
-                f"Operador unario solo aplica a tipos numéricos, no a '{simbolo.tipo}'"
-            )
+            self.registrar_error("SEM006", id_nodo.linea, id_nodo.columna, simbolo.tipo)
             return None, None
         
-        # Marcar como usada DOS VECES: una para leer el valor y otra para escribir
-        # Esto simula x = x + 1 o x = x - 1
-        self.tabla_simbolos.marcar_usado(id_nodo.valor, id_nodo.linea)  # Primera vez: lectura
-        self.tabla_simbolos.marcar_usado(id_nodo.valor, id_nodo.linea)  # Segunda vez: escritura
+        # x++ lee y escribe x, pero es una sola referencia
+        self.tabla_simbolos.marcar_usado(id_nodo.valor, id_nodo.linea, id_nodo.columna)
         
         # Generar código intermedio
         operador = "++" if nodo.valor == 1 or len(nodo.hijos) > 1 and nodo.hijos[1].valor == 1 else "--"
         valor_cambio = 1 if nodo.valor == 1 else -1
         temp = self.generador.nuevo_temporal()
-        self.generador.agregar(f"{temp} = {id_nodo.valor} + {valor_cambio}")
-        self.generador.agregar(f"{id_nodo.valor} = {temp}")
+        self.generador.agregar_binaria(temp, id_nodo.valor, "+", valor_cambio)
+        self.generador.agregar_copia(id_nodo.valor, temp)
         
         return simbolo.tipo, id_nodo.valor
     
@@ -848,9 +1233,7 @@ class AnalizadorSemantico:
             # Operador NOT unario
             tipo, temp = self.visitar_expresion(nodo.hijos[0])
             if tipo != "bool":
-                self.errores.append(
-                    f"Error semántico: Operador '!' requiere tipo 'bool', se recibió '{tipo}'"
-                )
+                self.registrar_error("SEM007", tipo, posicion=(nodo.linea, nodo.columna))
                 return None, None
             
             # Intentar calcular el valor si es posible
@@ -863,7 +1246,7 @@ class AnalizadorSemantico:
             nodo.tipo_semantico = "bool"
             
             temp_resultado = self.generador.nuevo_temporal()
-            self.generador.agregar(f"{temp_resultado} = !{temp}")
+            self.generador.agregar_negacion_logica(temp_resultado, temp)
             
             # Si calculamos un valor, retornarlo
             if valor_calculado is not None:
@@ -879,12 +1262,11 @@ class AnalizadorSemantico:
         condicion_idx = 1 if nodo.hijos and not isinstance(nodo.hijos[0], tuple) and hasattr(nodo.hijos[0], 'tipo') and nodo.hijos[0].tipo == "RESERVADA" else 0
         
         if len(nodo.hijos) > condicion_idx:
-            tipo_cond, temp_cond = self.visitar_expresion(nodo.hijos[condicion_idx])
+            tipo_cond, temp_cond = self.visitar_expresion(nodo.hijos[condicion_idx], nodo)
             
             if tipo_cond and tipo_cond != "bool":
-                self.advertencias.append(
-                    f"Advertencia: La condición del 'if' debería ser de tipo 'bool', se recibió '{tipo_cond}'"
-                )
+                posicion = (nodo.hijos[0].linea, nodo.hijos[0].columna) if condicion_idx else None
+                self.registrar_advertencia("SEM103", "if", tipo_cond, posicion=posicion)
             
             # Verificar si hay bloque else
             tiene_else = False
@@ -901,14 +1283,14 @@ class AnalizadorSemantico:
                 label_else = self.generador.nueva_etiqueta()
                 label_fin = self.generador.nueva_etiqueta()
                 
-                self.generador.agregar(f"if not {temp_cond} goto {label_else}")
+                self.generador.agregar_salto_si_no(temp_cond, label_else)
                 
                 # Bloque then
                 if len(nodo.hijos) > condicion_idx + 1:
                     self.visitar(nodo.hijos[condicion_idx + 1])
                 
-                self.generador.agregar(f"goto {label_fin}")
-                self.generador.agregar(f"{label_else}:")
+                self.generador.agregar_salto(label_fin)
+                self.generador.agregar_etiqueta(label_else)
                 
                 # Bloque else
                 else_idx = condicion_idx + 2
@@ -916,18 +1298,18 @@ class AnalizadorSemantico:
                     else_idx += 1
                 self.visitar(nodo.hijos[else_idx])
                 
-                self.generador.agregar(f"{label_fin}:")
+                self.generador.agregar_etiqueta(label_fin)
             else:
                 # If sin else: solo necesita label_fin
                 label_fin = self.generador.nueva_etiqueta()
                 
-                self.generador.agregar(f"if not {temp_cond} goto {label_fin}")
+                self.generador.agregar_salto_si_no(temp_cond, label_fin)
                 
                 # Bloque then
                 if len(nodo.hijos) > condicion_idx + 1:
                     self.visitar(nodo.hijos[condicion_idx + 1])
                 
-                self.generador.agregar(f"{label_fin}:")
+                self.generador.agregar_etiqueta(label_fin)
         
         return None
     
@@ -936,25 +1318,23 @@ class AnalizadorSemantico:
         label_inicio = self.generador.nueva_etiqueta()
         label_fin = self.generador.nueva_etiqueta()
         
-        self.generador.agregar(f"{label_inicio}:")
+        self.generador.agregar_etiqueta(label_inicio)
         
         # Condición
         if len(nodo.hijos) > 0:
-            tipo_cond, temp_cond = self.visitar_expresion(nodo.hijos[0])
+            tipo_cond, temp_cond = self.visitar_expresion(nodo.hijos[0], nodo)
             
             if tipo_cond and tipo_cond != "bool":
-                self.advertencias.append(
-                    f"Advertencia: La condición del 'while' debería ser de tipo 'bool', se recibió '{tipo_cond}'"
-                )
+                self.registrar_advertencia("SEM103", "while", tipo_cond)
             
-            self.generador.agregar(f"if not {temp_cond} goto {label_fin}")
+            self.generador.agregar_salto_si_no(temp_cond, label_fin)
         
         # Cuerpo
         if len(nodo.hijos) > 1:
             self.visitar(nodo.hijos[1])
         
-        self.generador.agregar(f"goto {label_inicio}")
-        self.generador.agregar(f"{label_fin}:")
+        self.generador.agregar_salto(label_inicio)
+        self.generador.agregar_etiqueta(label_fin)
         
         return None
     
@@ -962,7 +1342,7 @@ class AnalizadorSemantico:
         """Visita estructura do-while"""
         label_inicio = self.generador.nueva_etiqueta()
         
-        self.generador.agregar(f"{label_inicio}:")
+        self.generador.agregar_etiqueta(label_inicio)
         
         # Cuerpo
         if len(nodo.hijos) > 0:
@@ -970,14 +1350,12 @@ class AnalizadorSemantico:
         
         # Condición
         if len(nodo.hijos) > 1:
-            tipo_cond, temp_cond = self.visitar_expresion(nodo.hijos[1])
+            tipo_cond, temp_cond = self.visitar_expresion(nodo.hijos[1], nodo)
             
             if tipo_cond and tipo_cond != "bool":
-                self.advertencias.append(
-                    f"Advertencia: La condición del 'do-while' debería ser de tipo 'bool', se recibió '{tipo_cond}'"
-                )
+                self.registrar_advertencia("SEM103", "do-while", tipo_cond)
             
-            self.generador.agregar(f"if {temp_cond} goto {label_inicio}")
+            self.generador.agregar_salto_si(temp_cond, label_inicio)
         
         return None
     
@@ -988,14 +1366,11 @@ class AnalizadorSemantico:
             if not isinstance(hijo, tuple) and hasattr(hijo, 'tipo') and hijo.tipo == "id":
                 simbolo = self.tabla_simbolos.buscar(hijo.valor)
                 if simbolo is None:
-                    self.errores.append(
-                        f"Error semántico en L{hijo.linea} C{hijo.columna}: "
-                        f"Variable '{hijo.valor}' no declarada"
-                    )
+                    self.registrar_error("SEM002", hijo.linea, hijo.columna, hijo.valor)
                 else:
-                    self.tabla_simbolos.marcar_usado(hijo.valor, hijo.linea)
+                    self.tabla_simbolos.marcar_usado(hijo.valor, hijo.linea, hijo.columna)
                     self.tabla_simbolos.marcar_inicializado(hijo.valor, "<input>")
-                    self.generador.agregar(f"READ {hijo.valor}")
+                    self.generador.agregar_lectura(hijo.valor)
         
         return None
     
@@ -1014,34 +1389,35 @@ class AnalizadorSemantico:
                 # Verificar si el valor empieza con comilla (cadena literal tokenizada como id)
                 if hasattr(hijo, 'valor') and isinstance(hijo.valor, str) and hijo.valor.startswith('"'):
                     # Es una cadena literal
-                    self.generador.agregar(f"WRITE {hijo.valor}")
+                    self.generador.agregar_escritura(hijo.valor, constante=True)
                 else:
                     # Es un identificador de variable
                     simbolo = self.tabla_simbolos.buscar(hijo.valor)
                     if simbolo is None:
-                        self.errores.append(
-                            f"Error semántico en L{hijo.linea} C{hijo.columna}: "
-                            f"Variable '{hijo.valor}' no declarada"
-                        )
+                        self.registrar_error("SEM002", hijo.linea, hijo.columna, hijo.valor)
                     else:
                         if not simbolo.inicializado:
-                            self.advertencias.append(
-                                f"Advertencia en L{hijo.linea} C{hijo.columna}: "
-                                f"Variable '{hijo.valor}' puede no estar inicializada"
-                            )
-                        self.tabla_simbolos.marcar_usado(hijo.valor, hijo.linea)
-                        self.generador.agregar(f"WRITE {hijo.valor}")
+                            self.registrar_advertencia("SEM102", hijo.linea, hijo.columna, hijo.valor)
+                        self.tabla_simbolos.marcar_usado(hijo.valor, hijo.linea, hijo.columna)
+                        self.generador.agregar_escritura(hijo.valor)
             elif hijo.tipo in ["NUMERO_ENTERO", "NUMERO_REAL", "CADENA"]:
                 # Generar WRITE con el valor
-                self.generador.agregar(f"WRITE {hijo.valor}")
+                self.generador.agregar_escritura(hijo.valor, constante=True)
         
         return None
     
     def visitar_bloque(self, nodo):
-        """Visita un bloque de sentencias"""
+        """Visita un bloque de sentencias, que es un ámbito: sus declaraciones son locales"""
+        self.tabla_simbolos.abrir_ambito()
         for hijo in nodo.hijos:
-            if not isinstance(hijo, tuple) and hasattr(hijo, 'tipo'):
-                self.visitar(hijo)
+            self.visitar(hijo)
+        locales = self.tabla_simbolos.cerrar_ambito()
+        if locales:
+            # Los resúmenes de expresiones compartidas pueden referirse a las locales
+            self._resumenes.clear()
+            self._faltantes = False
+            for simbolo in reversed(locales):
+                self.generador.agregar_liberacion(simbolo.nombre)
         return None
     
     def evaluar_valor_simple(self, nodo):
@@ -1073,3 +1449,5 @@ class AnalizadorSemantico:
         if tipo1 == "float" and tipo2 == "int":
             return True
         return False
+
+AnalizadorSemantico._construir_despacho()
@@ -1,138 +1,394 @@
-class Token:
-    def __init__(self, tipo, lexema, linea, columna):
-        self.tipo = tipo
-        self.lexema = lexema
-        self.linea = linea
-        self.columna = columna
-
-    def __str__(self):
-        return f"{self.tipo}('{self.lexema}') en L{self.linea} C{self.columna}"
+from array import array
+from bisect import bisect_left, bisect_right
+
+from analisis_lexico import (AnalizadorLexicoIncremental, CLASES, NOMBRES_CLASE, OPERADORES, TIPO_CLASE, TIPOS_TOKEN,
+                             Token, VentanaTokens, diferencia,  # Token se define junto al analizador léxico
+                             iter_tokens)
+from diagnosticos import Diagnostico, ERROR, FaseDetenida, ListaDiagnosticos, lista_para_fase
+
+# Niveles de precedencia de los operadores binarios, de menor a mayor
+NIVEL_LOGICO, NIVEL_RELACIONAL, NIVEL_ADITIVO, NIVEL_MULTIPLICATIVO, NIVEL_POTENCIA = range(1, 6)
+
+# (tipo de token, lexema) -> (nivel, tipo del nodo, código de error si falta el operando derecho).
+# Todos los operadores lógicos comparten un nivel, igual que todos los relacionales (incluidos
+# '<<' y '>>'); ++ y -- se aplican al operando de la izquierda en el nivel aditivo.
+OPERADORES_INFIJOS = {
+    **{(tipo, lexema): (NIVEL_LOGICO, "op", "SIN009")
+       for lexema, tipo in OPERADORES.items() if tipo == "OPERADOR_LOG"},
+    **{(tipo, lexema): (NIVEL_RELACIONAL, "op", "SIN009")
+       for lexema, tipo in OPERADORES.items() if tipo == "OPERADOR_REL"},
+    ("OPERADOR_ARIT", "+"): (NIVEL_ADITIVO, "suma_op", "SIN024"),
+    ("OPERADOR_ARIT", "-"): (NIVEL_ADITIVO, "suma_op", "SIN024"),
+    ("OPERADOR_ARIT", "++"): (NIVEL_ADITIVO, "unario_op", None),
+    ("OPERADOR_ARIT", "--"): (NIVEL_ADITIVO, "unario_op", None),
+    ("OPERADOR_ARIT", "*"): (NIVEL_MULTIPLICATIVO, "mult_op", "SIN024"),
+    ("OPERADOR_ARIT", "/"): (NIVEL_MULTIPLICATIVO, "mult_op", "SIN024"),
+    ("OPERADOR_ARIT", "%"): (NIVEL_MULTIPLICATIVO, "mult_op", "SIN024"),
+    ("OPERADOR_ARIT", "^"): (NIVEL_POTENCIA, "pot_op", "SIN025"),
+}
+
+# Clases de token (ver CLASES en analisis_lexico) que distingue el parser
+IDENTIFICADOR, RESERVADA, OPERADOR_ARIT, ASIGNACION = (
+    CLASES[tipo] for tipo in ("IDENTIFICADOR", "RESERVADA", "OPERADOR_ARIT", "ASIGNACION"))
+MAIN, IF, ELSE, DO, WHILE, CIN, COUT = (CLASES[palabra] for palabra in ("main", "if", "else", "do", "while", "cin", "cout"))
+LLAVE_ABRE, LLAVE_CIERRA, PAREN_ABRE, PAREN_CIERRA, PUNTO_Y_COMA, COMA = (CLASES[simbolo] for simbolo in "{}();,")
+MENOS, INCREMENTO, DECREMENTO, NEGACION, SALIDA, ENTRADA = (CLASES[op] for op in ("-", "++", "--", "!", "<<", ">>"))
+TIPOS_DATO = frozenset(CLASES[tipo] for tipo in ("int", "float", "bool"))
+LITERALES = frozenset(CLASES[tipo] for tipo in ("NUMERO_ENTERO", "NUMERO_REAL", "IDENTIFICADOR", "CADENA"))
+BOOLEANOS = frozenset((CLASES["true"], CLASES["false"]))
+INICIO_SENTENCIA = frozenset((IDENTIFICADOR, IF, WHILE, DO, CIN, COUT))
+
+# Conjuntos de sincronización de la recuperación de errores. Un tramo de tokens que no pueden
+# empezar una declaración ni una sentencia se descarta entero, hasta SINC_ELEMENTO, con un solo
+# diagnóstico como en AnalizadorLL1.
+SINC_MAIN = frozenset((MAIN,))
+SINC_LLAVE_ABRE = frozenset((LLAVE_ABRE,))
+SINC_LLAVE_CIERRA = frozenset((LLAVE_CIERRA,))
+SINC_SENTENCIA = frozenset(CLASES[lexema] for lexema in (";", "if", "while", "do", "cin", "cout", "}", "else"))
+SINC_ELEMENTO = TIPOS_DATO | INICIO_SENTENCIA | SINC_LLAVE_CIERRA
+
+# OPERADORES_INFIJOS indexado por la clase del token (None si la clase no es un operador binario)
+INFIJOS_POR_CLASE = tuple(OPERADORES_INFIJOS.get((TIPOS_TOKEN[TIPO_CLASE[clase]], nombre))
+                          for clase, nombre in enumerate(NOMBRES_CLASE))
 
 class ASTNode:
+    """Nodo del AST con campos fijos (__slots__, sin diccionario por instancia).
+
+    Las anotaciones del análisis semántico también son campos declarados y valen None mientras
+    no se calculan. Los nodos sin hijos comparten una tupla vacía; la lista se crea con el primero.
+    """
+    __slots__ = ("tipo", "valor", "linea", "columna", "hijos",
+                 "tipo_semantico", "valor_calculado", "valor_semantico")
+
     def __init__(self, tipo, valor=None, linea=None, columna=None):
         self.tipo = tipo
         self.valor = valor
         self.linea = linea
         self.columna = columna
-        self.hijos = []
+        self.hijos = ()
+        self.tipo_semantico = None   # Tipo deducido por AnalizadorSemantico
+        self.valor_calculado = None  # Valor constante calculado, para visualización
+        self.valor_semantico = None
 
     def agregar_hijo(self, nodo):
-        self.hijos.append(nodo)
+        if self.hijos:
+            self.hijos.append(nodo)
+        else:
+            self.hijos = [nodo]
+
+
+class TablaExpresiones:
+    """Expresiones compartidas (hash-consing): las subexpresiones con la misma estructura son
+    un único nodo, y el árbol pasa a ser un grafo acíclico (DAG) en sus expresiones.
+
+    Los nodos compartidos no tienen posición (linea y columna valen None). Las posiciones van
+    en una tabla aparte: por cada expresión agregada a una sentencia se guardan las de todos sus
+    nodos en preorden, y 'ubicacion(padre, nodo)' da dónde empiezan las de la expresión de
+    'padre' (cada sentencia tiene a lo sumo una).
+    """
+    def __init__(self):
+        self.nodos = {}               # (tipo, valor, *hijos) -> nodo compartido
+        self.posiciones = array("I")  # linea + 1 y columna + 1 de cada nodo (0 = None)
+        self.ocurrencias = {}         # Sentencia -> (índice del hijo, índice de su primer nodo)
+        self.unicos = 0               # Nodos compartidos
+        self.total = 0                # Nodos de expresión analizados (con repeticiones)
+
+    def __len__(self):
+        return self.unicos
+
+    def agregar(self, padre, expresion):
+        """Agrega a 'padre' el nodo compartido equivalente a 'expresion'"""
+        self.ocurrencias[padre] = (len(padre.hijos), len(self.posiciones) // 2)
+        padre.agregar_hijo(self.compartir(expresion))
+
+    def terminar(self):
+        """Libera el índice de formas, que solo hace falta mientras se analiza (ocupa más que lo
+        que se ahorra al compartir). Las expresiones que se agreguen después ya no se comparten
+        con las anteriores."""
+        self.nodos = {}
+
+    def compartir(self, raiz):
+        """Nodo compartido equivalente al árbol 'raiz', guardando las posiciones de sus nodos"""
+        posiciones, nodos = self.posiciones, self.nodos
+        pendientes = [(raiz, False)]
+        resultados = []
+        while pendientes:
+            nodo, visto = pendientes.pop()
+            if not visto:
+                # Primera vez que se ve: preorden
+                posiciones.append(0 if nodo.linea is None else nodo.linea + 1)
+                posiciones.append(0 if nodo.columna is None else nodo.columna + 1)
+                pendientes.append((nodo, True))
+                pendientes.extend((hijo, False) for hijo in reversed(nodo.hijos))
+                continue
+            self.total += 1
+            cantidad = len(nodo.hijos)
+            if cantidad:
+                hijos = resultados[-cantidad:]
+                del resultados[-cantidad:]
+            else:
+                hijos = ()
+            clave = (nodo.tipo, nodo.valor, *hijos)
+            compartido = nodos.get(clave)
+            if compartido is None:
+                # El primer nodo con esta forma pasa a ser el compartido
+                compartido = nodos[clave] = nodo
+                self.unicos += 1
+                nodo.hijos = hijos
+                nodo.linea = nodo.columna = None
+            resultados.append(compartido)
+        return resultados[0]
+
+    def ubicacion(self, padre, nodo):
+        """Índice de la posición del primer nodo de 'nodo' si es la expresión de la sentencia
+        'padre' (None si no)"""
+        ocurrencia = self.ocurrencias.get(padre)
+        if ocurrencia is None or padre.hijos[ocurrencia[0]] is not nodo:
+            return None
+        return ocurrencia[1]
+
+    def posicion(self, indice):
+        """(linea, columna) del nodo 'indice' de las posiciones guardadas"""
+        linea, columna = self.posiciones[2 * indice], self.posiciones[2 * indice + 1]
+        return (linea - 1 if linea else None), (columna - 1 if columna else None)
 
 
 class AnalizadorSintactico:
-    def __init__(self, tokens):
+    # 'tokens' puede ser una lista de Token o un FlujoTokens de tokenize_flujo.
+    # Con 'pila_explicita' las expresiones se analizan con una pila propia en lugar de recursión,
+    # para programas con miles de paréntesis o signos anidados (las sentencias anidadas ya usan
+    # siempre una pila explícita, ver _ejecutar). Con 'compartir_expresiones' las expresiones
+    # repetidas son un único nodo (ver TablaExpresiones, que queda en 'self.expresiones').
+    def __init__(self, tokens, fuente=None, errores=None, pila_explicita=False, compartir_expresiones=False):
         self.tokens = tokens
+        self.expresiones = TablaExpresiones() if compartir_expresiones else None
         self.index = 0
-        self.errores = []
+        # Diagnostico de la fase; por omisión con los límites configurados para la fase sintáctica
+        self.errores = lista_para_fase("sintactico") if errores is None else errores
+        self.fuente = fuente  # ArchivoFuente opcional para ubicar errores sin token
+        # Objeto opcional con empezar() y terminar(nodo, contenedor, unica=False), que se llaman
+        # alrededor de cada sentencia de una lista o bloque (ver AnalizadorSintacticoIncremental)
+        self.observador = None
+        if pila_explicita:
+            self.parse_expresion = self._parse_expresion_con_pila
+
+    def registrar_error(self, codigo, *args, token=None):
+        """Agrega un Diagnostico; con 'token' y la fuente disponible se guarda su desplazamiento"""
+        offset = None
+        if token is not None and self.fuente is not None:
+            offset = self.fuente.offset(token.linea, token.columna)
+        self.errores.append(Diagnostico(codigo, ERROR, offset, args))
+
+    def agregar_expresion(self, nodo, expresion):
+        """Agrega la expresión de una sentencia, compartida si se pidió compartir_expresiones"""
+        if self.expresiones is None:
+            nodo.agregar_hijo(expresion)
+        else:
+            self.expresiones.agregar(nodo, expresion)
 
     def obtener_token(self):
         return self.tokens[self.index] if self.index < len(self.tokens) else None
 
-    def coincidir(self, tipo, valor_esperado=None):
-        token = self.obtener_token()
-        if token and token.tipo == tipo and (valor_esperado is None or token.lexema == valor_esperado):
-            self.index += 1
+    def clase_actual(self):
+        """Clase del token actual, o None si no quedan tokens"""
+        tokens, i = self.tokens, self.index
+        return tokens[i].clase if i < len(tokens) else None
+
+    def coincidir(self, clase):
+        """Consume el token actual si es de la clase indicada (o, si es la clase de un tipo, de
+        ese tipo) y lo devuelve; si no, registra el error y devuelve None"""
+        tokens, i = self.tokens, self.index
+        token = tokens[i] if i < len(tokens) else None
+        if token is not None and (token.clase == clase or TIPO_CLASE[token.clase] == clase):
+            self.index = i + 1
             return token
         
         # Generar error más descriptivo solo si no se encuentra el token
+        esperado = NOMBRES_CLASE[clase]
         if token:
-            esperado = valor_esperado if valor_esperado else tipo
             recibido = token.lexema
             linea = token.linea
             columna = token.columna
-            self.errores.append(f"Error sintáctico en L{linea} C{columna}: se esperaba '{esperado}', pero se obtuvo '{recibido}'")
+            self.registrar_error("SIN001", linea, columna, esperado, recibido, token=token)
         else:
-            esperado = valor_esperado if valor_esperado else tipo
-            self.errores.append(f"Error sintáctico: se esperaba '{esperado}', pero se llegó al final del archivo")
+            if self.fuente is not None:
+                linea, columna = self.fuente.linea_columna(len(self.fuente.texto))
+                self.errores.append(Diagnostico("SIN002", ERROR, len(self.fuente.texto), (linea, columna, esperado)))
+            else:
+                self.registrar_error("SIN003", esperado)
         return None
 
-    def coincidir_opcional(self, tipo, valor_esperado=None):
+    def coincidir_opcional(self, clase):
         """Versión que no genera error si no encuentra el token"""
-        token = self.obtener_token()
-        if token and token.tipo == tipo and (valor_esperado is None or token.lexema == valor_esperado):
-            self.index += 1
+        tokens, i = self.tokens, self.index
+        token = tokens[i] if i < len(tokens) else None
+        if token is not None and (token.clase == clase or TIPO_CLASE[token.clase] == clase):
+            self.index = i + 1
             return token
         return None
 
-    def sincronizar(self, tokens_sincronizacion):
-        """Avanza hasta encontrar un token de sincronización"""
-        while self.index < len(self.tokens):
-            token_actual = self.obtener_token()
-            if token_actual and (token_actual.lexema in tokens_sincronizacion or token_actual.tipo in tokens_sincronizacion):
-                break
-            self.index += 1
+    def sincronizar(self, conjunto):
+        """Avanza hasta el primer token cuya clase está en 'conjunto' (o hasta el final)"""
+        self.index = self.buscar(conjunto, self.index)
+
+    def buscar(self, conjunto, i):
+        """Índice del primer token desde 'i' cuya clase está en 'conjunto' (o len(tokens))"""
+        tokens = self.tokens
+        clases = getattr(tokens, "clases", None)
+        if clases is not None:
+            # FlujoTokens: se recorre la columna de clases sin crear los Token
+            for j in range(i, len(clases)):
+                if clases[j] in conjunto:
+                    return j
+            return len(clases)
+        while i < len(tokens) and tokens[i].clase not in conjunto:
+            i += 1
+        return i
 
     def parse(self):
-        return self.parse_programa()
+        try:
+            return self.parse_programa()
+        except FaseDetenida:
+            # Modo de detención temprana: se alcanzó el límite de errores y el árbol no se completa
+            return ASTNode("programa")
+        finally:
+            if self.expresiones is not None:
+                self.expresiones.terminar()
+
+    def iter_sentencias(self, conservar=True):
+        """Analiza el programa igual que parse(), pero produce cada declaración o sentencia de la
+        lista principal apenas se termina de analizar, para que las fases siguientes empiecen
+        antes de que termine el archivo. Al terminar, 'self.ast' tiene el árbol completo; con
+        'conservar' en False las sentencias no se guardan en él y la memoria no crece con el archivo."""
+        self.ast = ASTNode("programa")
+        try:
+            for sentencia in self._iter_programa(self.ast):
+                yield sentencia
+                if not conservar:
+                    self.ast.hijos[0].hijos.clear()
+        except FaseDetenida:
+            self.ast = ASTNode("programa")
 
     def parse_programa(self):
         nodo = ASTNode("programa")
-        token_main = self.coincidir("RESERVADA", "main")
+        for _ in self._iter_programa(nodo):
+            pass
+        return nodo
+
+    def _iter_programa(self, nodo):
+        token_main = self.coincidir(MAIN)
         
         if not token_main:
             # Intentar recuperarse buscando 'main'
-            self.sincronizar(["main"])
-            if self.obtener_token() and self.obtener_token().lexema == "main":
-                token_main = self.coincidir("RESERVADA", "main")
+            self.sincronizar(SINC_MAIN)
+            if self.clase_actual() == MAIN:
+                token_main = self.coincidir(MAIN)
         
-        brace_open = self.coincidir("SIMBOLO", "{")
+        brace_open = self.coincidir(LLAVE_ABRE)
         if not brace_open:
             # Intentar recuperarse buscando '{'
-            self.sincronizar(["{"])
-            if self.obtener_token() and self.obtener_token().lexema == "{":
-                brace_open = self.coincidir("SIMBOLO", "{")
+            self.sincronizar(SINC_LLAVE_ABRE)
+            if self.clase_actual() == LLAVE_ABRE:
+                brace_open = self.coincidir(LLAVE_ABRE)
 
         # Continuar parseando el contenido aunque falte main o {
-        lista_decl = self.parse_lista_declaracion()
-        if lista_decl:
-            nodo.agregar_hijo(lista_decl)
+        lista_decl = ASTNode("lista_declaracion")
+        nodo.agregar_hijo(lista_decl)
+        yield from self._iter_lista_declaracion(lista_decl)
         
         # Intentar encontrar el cierre
-        brace_close = self.coincidir_opcional("SIMBOLO", "}")
+        brace_close = self.coincidir_opcional(LLAVE_CIERRA)
         if not brace_close and token_main:  # Solo reportar error si teníamos main
             pass  # No reportar error de } faltante para ser más permisivo
-        
-        return nodo
-    
+
     def parse_lista_declaracion(self):
         nodo = ASTNode("lista_declaracion")
-        
+        for _ in self._iter_lista_declaracion(nodo):
+            pass
+        return nodo
+
+    def _iter_lista_declaracion(self, nodo):
         while self.index < len(self.tokens):
             token_actual = self.obtener_token()
             
             # Salir si encontramos el cierre del bloque principal
-            if token_actual and token_actual.lexema == "}":
+            if token_actual and token_actual.clase == LLAVE_CIERRA:
                 break
                 
-            decl = self.parse_declaracion()
+            decl = self.parse_elemento_lista(nodo)
             if decl:
-                nodo.agregar_hijo(decl)
-            else:
-                # Si no se pudo parsear, avanzar un token para evitar bucle infinito
-                if self.index < len(self.tokens):
-                    token_actual = self.obtener_token()
-                    if token_actual:
-                        # Solo reportar error si no es un token de cierre
-                        if token_actual.lexema != "}":
-                            self.errores.append(f"Error sintáctico en L{token_actual.linea} C{token_actual.columna}: token inesperado '{token_actual.lexema}'")
+                yield decl
+
+    def parse_elemento_lista(self, nodo):
+        """Un paso de parse_lista_declaracion: agrega a 'nodo' la declaración o sentencia que empieza
+        en el token actual y la devuelve o, si no hay ninguna, informa el token y lo salta junto con
+        los que le siguen hasta uno de SINC_ELEMENTO"""
+        observador = self.observador
+        if observador is not None:
+            observador.empezar()
+        decl = self.parse_declaracion()
+        if decl:
+            nodo.agregar_hijo(decl)
+        else:
+            # Si no se pudo parsear, avanzar al menos un token para evitar bucle infinito
+            if self.index < len(self.tokens):
+                token_actual = self.obtener_token()
+                # Solo reportar error si no es un token de cierre
+                if token_actual.clase == LLAVE_CIERRA:
                     self.index += 1
-        
-        return nodo
+                else:
+                    self.registrar_error("SIN004", token_actual.linea, token_actual.columna, token_actual.lexema, token=token_actual)
+                    # Los tokens que siguen y tampoco pueden empezar nada irían saltando de a uno
+                    # con un diagnóstico cada uno: se descartan juntos, cubiertos por este
+                    self.index = self.buscar(SINC_ELEMENTO, self.index + 1)
+        if observador is not None:
+            observador.terminar(decl, nodo)
+        return decl
 
     def parse_declaracion(self):
         actual = self.obtener_token()
         if not actual:
             return None
             
-        if actual.lexema in ["int", "float", "bool"]:
+        if actual.clase in TIPOS_DATO:
             return self.parse_declaracion_variable()
-        elif actual.lexema in ["if", "while", "do", "cin", "cout"] or actual.tipo == "IDENTIFICADOR":
+        elif actual.clase in INICIO_SENTENCIA:
             return self.parse_sentencia()
         
         return None
 
     def parse_sentencia(self):
+        return self._ejecutar(self._pasos_sentencia())
+
+    # Las sentencias que contienen bloques (if, while, do-while) se escriben como generadores: en
+    # lugar de llamar al parseo de un bloque o de una sentencia anidada, entregan con 'yield' el
+    # generador correspondiente y reciben su resultado. _ejecutar los corre con una pila explícita,
+    # así que el anidamiento de bloques no está limitado por la pila de Python.
+    def _ejecutar(self, pasos):
+        """Corre un generador de parseo y todos los que entregue; devuelve su resultado.
+        Si un generador lanza una excepción, se lanza en el que lo entregó, igual que en una
+        llamada recursiva."""
+        pila = []
+        actual, reanudar, valor = pasos, pasos.send, None
+        while True:
+            try:
+                subparseo = reanudar(valor)
+            except StopIteration as fin:
+                if not pila:
+                    return fin.value
+                actual = pila.pop()
+                reanudar, valor = actual.send, fin.value
+                continue
+            except Exception as excepcion:
+                if not pila:
+                    raise
+                actual = pila.pop()
+                reanudar, valor = actual.throw, excepcion
+                continue
+            pila.append(actual)
+            actual, reanudar, valor = subparseo, subparseo.send, None
+
+    def _pasos_sentencia(self):
         actual = self.obtener_token()
         if actual is None:
             return None
@@ -140,44 +396,44 @@ class AnalizadorSintactico:
         # DEBUG: ver qué tipo de token estamos procesando
         # print(f"DEBUG parse_sentencia: actual.lexema='{actual.lexema}', actual.tipo='{actual.tipo}'")
 
+        produccion = self._SENTENCIAS[actual.clase]
+        if produccion is None:
+            return None
         try:
-            if actual.tipo == "IDENTIFICADOR":
-                # Verifica si es un operador unario como sentencia
-                siguiente = self.tokens[self.index + 1] if self.index + 1 < len(self.tokens) else None
-                if siguiente and siguiente.tipo == "OPERADOR_ARIT" and siguiente.lexema in ["++", "--"]:
-                    return self.parse_sentencia_unaria()
-                elif siguiente and (siguiente.tipo == "ASIGNACION" or siguiente.lexema == "="):
-                    return self.parse_asignacion()
-                else:
-                    # Es una expresión suelta (ej: y + 2;)
-                    return self.parse_expresion_sentencia()
-            elif actual.lexema == "cout":
-                return self.parse_sent_out()
-            elif actual.lexema == "cin":
-                return self.parse_sent_in()
-            elif actual.lexema == "if" or actual.tipo == "RESERVADA" and actual.lexema == "if":
-                return self.parse_seleccion()
-            elif actual.lexema == "do":
-                return self.parse_do_while()
-            elif actual.lexema == "while":
-                return self.parse_while()
+            funcion, anidada = produccion
+            if anidada:
+                return (yield funcion(self))
+            return funcion(self)
+        except FaseDetenida:
+            raise
         except Exception as e:
             if actual:
-                self.errores.append(f"Error procesando sentencia en L{actual.linea} C{actual.columna}: {str(e)}")
+                self.registrar_error("SIN005", actual.linea, actual.columna, str(e), token=actual)
             # Recuperación: sincronizar con tokens de inicio de sentencia o fin de bloque
-            self.sincronizar([";", "if", "while", "do", "cin", "cout", "}", "else"])
+            self.sincronizar(SINC_SENTENCIA)
             return None
-        
-        return None
+
+    def _sentencia_identificador(self):
+        """Sentencia que empieza con un identificador: la elige el token siguiente"""
+        siguiente = self.tokens[self.index + 1] if self.index + 1 < len(self.tokens) else None
+        clase = siguiente.clase if siguiente else None
+        # Verifica si es un operador unario como sentencia
+        if clase == INCREMENTO or clase == DECREMENTO:
+            return self.parse_sentencia_unaria()
+        elif clase is not None and TIPO_CLASE[clase] == ASIGNACION:
+            return self.parse_asignacion()
+        else:
+            # Es una expresión suelta (ej: y + 2;)
+            return self.parse_expresion_sentencia()
 
     def parse_sentencia_unaria(self):
         nodo = ASTNode("unario")
-        id_token = self.coincidir("IDENTIFICADOR")
-        op_token = self.coincidir("OPERADOR_ARIT")
+        id_token = self.coincidir(IDENTIFICADOR)
+        op_token = self.coincidir(OPERADOR_ARIT)
         valor_unario = +1 if op_token.lexema == "++" else -1
         nodo.agregar_hijo(ASTNode("id", id_token.lexema, id_token.linea, id_token.columna))
         nodo.agregar_hijo(ASTNode("op", valor_unario, op_token.linea, op_token.columna))
-        self.coincidir_opcional("SIMBOLO", ";")
+        self.coincidir_opcional(PUNTO_Y_COMA)
         return nodo
     
     def parse_expresion_sentencia(self):
@@ -185,87 +441,198 @@ class AnalizadorSintactico:
         nodo = ASTNode("expresion_sentencia")
         expr = self.parse_expresion()
         if expr:
-            nodo.agregar_hijo(expr)
-        self.coincidir_opcional("SIMBOLO", ";")
+            self.agregar_expresion(nodo, expr)
+        self.coincidir_opcional(PUNTO_Y_COMA)
         return nodo
 
     def parse_asignacion(self):
         nodo = ASTNode("asignacion")
-        id_token = self.coincidir("IDENTIFICADOR")
+        id_token = self.coincidir(IDENTIFICADOR)
         if not id_token:
             return None
 
         nodo.agregar_hijo(ASTNode("id", id_token.lexema, id_token.linea, id_token.columna))
 
-        asign_token = self.coincidir_opcional("ASIGNACION")
-        if not asign_token:
-            asign_token = self.coincidir_opcional("SIMBOLO", "=")
+        asign_token = self.coincidir_opcional(ASIGNACION)
         if not asign_token:
-            self.errores.append(f"Error en L{id_token.linea} C{id_token.columna + len(id_token.lexema)}: Se esperaba '=' después del identificador '{id_token.lexema}'")
+            self.registrar_error("SIN006", id_token.linea, id_token.columna + len(id_token.lexema), id_token.lexema, token=id_token)
             return nodo
 
         expr = self.parse_expresion()
         if expr:
-            nodo.agregar_hijo(expr)
+            self.agregar_expresion(nodo, expr)
         else:
-            self.errores.append(f"Error: Expresión no válida en asignación de '{id_token.lexema}'")
+            self.registrar_error("SIN007", id_token.lexema)
 
         # Cambia aquí:
-        if not self.coincidir("SIMBOLO", ";"):
-            self.errores.append("Error: Falta ';' al final de la sentencia")
+        if not self.coincidir(PUNTO_Y_COMA):
+            self.registrar_error("SIN008")
 
         return nodo
 
-    def parse_expresion(self):
-        """Parsea expresión lógica (AND, OR tienen menor precedencia)"""
-        nodo = self.parse_expresion_relacional()
+    def parse_expresion(self, nivel_minimo=NIVEL_LOGICO):
+        """Parsea una expresión por precedencia de operadores (Pratt).
+
+        Toma un componente y después los operadores binarios de OPERADORES_INFIJOS con nivel
+        >= nivel_minimo; el operando derecho de un operador de nivel n es una expresión de nivel
+        n + 1, así que todos asocian a la izquierda. 'tope' es el nivel más alto que todavía se
+        acepta: baja al armar un nodo y cuando falta un operando, igual que cuando en la cadena
+        de funciones por nivel (lógica, relacional, simple, término, factor) cada una terminaba
+        y devolvía el control a la anterior.
+        """
+        nodo = self.parse_componente()
         if not nodo:
             return None
 
-        while True:
-            token = self.obtener_token()
-            # Solo operadores lógicos aquí (&&, ||)
-            if token and token.tipo == "OPERADOR_LOG":
-                operador = self.coincidir("OPERADOR_LOG")
-                derecho = self.parse_expresion_relacional()
-                if not derecho:
-                    self.errores.append(f"Error: Falta expresión después de operador '{operador.lexema}'")
-                    break
-                nuevo = ASTNode("op", operador.lexema)
+        tokens = self.tokens
+        tope = NIVEL_POTENCIA
+        while self.index < len(tokens):
+            token = tokens[self.index]
+            operador = INFIJOS_POR_CLASE[token.clase]
+            if operador is None:
+                break
+            nivel, tipo_nodo, codigo_error = operador
+            if nivel < nivel_minimo or nivel > tope:
+                break
+            self.index += 1
+
+            # ++ y -- después de un operando
+            if tipo_nodo == "unario_op":
+                nuevo = ASTNode("unario_op", +1 if token.lexema == "++" else -1)
                 nuevo.agregar_hijo(nodo)
-                nuevo.agregar_hijo(derecho)
                 nodo = nuevo
-            else:
-                break
+                tope = nivel
+                continue
+
+            derecho = self.parse_expresion(nivel + 1)
+            if not derecho:
+                if codigo_error == "SIN025":
+                    self.registrar_error(codigo_error)
+                else:
+                    self.registrar_error(codigo_error, token.lexema)
+                tope = nivel - 1
+                continue
+            nuevo = ASTNode(tipo_nodo, token.lexema)
+            nuevo.agregar_hijo(nodo)
+            nuevo.agregar_hijo(derecho)
+            nodo = nuevo
+            tope = nivel
         return nodo
 
-    def parse_expresion_relacional(self):
-        """Parsea expresión relacional (<, >, <=, >=, ==, !=)"""
-        nodo = self.parse_expresion_simple()
-        if not nodo:
-            return None
+    def _parse_expresion_con_pila(self, nivel_minimo=NIVEL_LOGICO):
+        """Igual que parse_expresion (y parse_componente), pero sin recursión.
 
+        Cada marco de la pila es una expresión a medio armar [nivel mínimo, nodo, tope, operador
+        que espera su operando derecho] o un prefijo que espera su operando: '-' y '!' con su
+        token, '(' que espera la expresión interior y el ')'. Se desciende leyendo componentes
+        hasta llegar a una hoja y se asciende entregando el resultado al marco de arriba.
+        """
+        tokens = self.tokens
+        pila = [[nivel_minimo, None, NIVEL_POTENCIA, None]]
         while True:
-            token = self.obtener_token()
-            # Solo operadores relacionales aquí (<, >, <=, >=, ==, !=)
-            if token and token.tipo == "OPERADOR_REL":
-                operador = self.coincidir("OPERADOR_REL")
-                derecho = self.parse_expresion_simple()
-                if not derecho:
-                    self.errores.append(f"Error: Falta expresión después de operador '{operador.lexema}'")
-                    break
-                nuevo = ASTNode("op", operador.lexema)
-                nuevo.agregar_hijo(nodo)
-                nuevo.agregar_hijo(derecho)
-                nodo = nuevo
+            # Descenso: un componente, apilando los prefijos hasta llegar a una hoja
+            token = tokens[self.index] if self.index < len(tokens) else None
+            clase = token.clase if token is not None else None
+            if token is None:
+                resultado = None
+            elif clase == MENOS:
+                self.index += 1
+                pila.append(("-", token))
+                continue
+            elif clase == PAREN_ABRE:
+                self.coincidir(PAREN_ABRE)
+                pila.append(("(", None))
+                pila.append([NIVEL_LOGICO, None, NIVEL_POTENCIA, None])
+                continue
+            elif clase in LITERALES:
+                self.index += 1
+                resultado = ASTNode(token.tipo, token.lexema, token.linea, token.columna)
+            elif clase in BOOLEANOS:
+                self.index += 1
+                resultado = ASTNode("bool", token.lexema, token.linea, token.columna)
+            elif clase == NEGACION:
+                pila.append(("!", self.coincidir(NEGACION)))
+                continue
             else:
-                break
-        return nodo
+                resultado = None
+
+            # Ascenso: se entrega 'resultado' hasta que una expresión necesite otro operando
+            while True:
+                marco = pila[-1]
+                if marco.__class__ is tuple:
+                    pila.pop()
+                    prefijo, token = marco
+                    if prefijo == "(":
+                        if not self.coincidir_opcional(PAREN_CIERRA):
+                            self.registrar_error("SIN027")
+                    elif not resultado:
+                        self.registrar_error("SIN026" if prefijo == "-" else "SIN028")
+                        resultado = None
+                    else:
+                        nodo = ASTNode("unario_op" if prefijo == "-" else "op_logico", prefijo,
+                                       token.linea, token.columna)
+                        nodo.agregar_hijo(resultado)
+                        resultado = nodo
+                    continue
+
+                minimo, nodo, tope, pendiente = marco
+                if pendiente is not None:
+                    # 'resultado' es el operando derecho de 'pendiente'
+                    token, nivel, tipo_nodo, codigo_error = pendiente
+                    if not resultado:
+                        if codigo_error == "SIN025":
+                            self.registrar_error(codigo_error)
+                        else:
+                            self.registrar_error(codigo_error, token.lexema)
+                        tope = nivel - 1
+                    else:
+                        nuevo = ASTNode(tipo_nodo, token.lexema)
+                        nuevo.agregar_hijo(nodo)
+                        nuevo.agregar_hijo(resultado)
+                        nodo = nuevo
+                        tope = nivel
+                elif not resultado:
+                    # Falta el primer componente de la expresión
+                    pila.pop()
+                    if not pila:
+                        return None
+                    continue
+                else:
+                    nodo = resultado
+
+                # Operadores binarios, como en parse_expresion
+                pendiente = None
+                while self.index < len(tokens):
+                    token = tokens[self.index]
+                    operador = INFIJOS_POR_CLASE[token.clase]
+                    if operador is None:
+                        break
+                    nivel, tipo_nodo, codigo_error = operador
+                    if nivel < minimo or nivel > tope:
+                        break
+                    self.index += 1
+                    if tipo_nodo == "unario_op":
+                        nuevo = ASTNode("unario_op", +1 if token.lexema == "++" else -1)
+                        nuevo.agregar_hijo(nodo)
+                        nodo = nuevo
+                        tope = nivel
+                        continue
+                    pendiente = (token, nivel, tipo_nodo, codigo_error)
+                    break
+
+                if pendiente is not None:
+                    marco[1], marco[2], marco[3] = nodo, tope, pendiente
+                    pila.append([nivel + 1, None, NIVEL_POTENCIA, None])
+                    break
+                pila.pop()
+                if not pila:
+                    return nodo
+                resultado = nodo
 
     def parse_sent_out(self):
         nodo = ASTNode("sent_out")
         
-        cout_token = self.coincidir("RESERVADA", "cout")
+        cout_token = self.coincidir(COUT)
         if not cout_token:
             return None
 
@@ -273,33 +640,27 @@ class AnalizadorSintactico:
         nodo.agregar_hijo(ASTNode("RESERVADA", cout_token.lexema, cout_token.linea, cout_token.columna))
         
         while True:
-            operador = self.coincidir_opcional("OPERADOR_REL", "<<")
-            if not operador:
-                operador = self.coincidir_opcional("SIMBOLO", "<<")
-            if not operador:
+            if not self.coincidir_opcional(SALIDA):
                 break
 
             valor = self.obtener_token()
-            if valor and valor.tipo in ["CADENA", "IDENTIFICADOR", "NUMERO_ENTERO", "NUMERO_REAL"]:
+            if valor and valor.clase in LITERALES:
                 self.index += 1
                 nodo.agregar_hijo(ASTNode("id", valor.lexema, valor.linea, valor.columna))
             else:
-                self.errores.append("Error: Valor no válido en cout después de '<<'")
+                self.registrar_error("SIN010")
                 break
 
             siguiente = self.obtener_token()
-            if not (siguiente and (
-                (siguiente.tipo == "OPERADOR_REL" and siguiente.lexema == "<<") or
-                (siguiente.tipo == "SIMBOLO" and siguiente.lexema == "<<")
-            )):
+            if not (siguiente and siguiente.clase == SALIDA):
                 break
 
-        semicolon = self.coincidir_opcional("SIMBOLO", ";")
+        semicolon = self.coincidir_opcional(PUNTO_Y_COMA)
         return nodo
 
     def parse_sent_in(self):
         nodo = ASTNode("sent_in")
-        cin_token = self.coincidir("RESERVADA", "cin")
+        cin_token = self.coincidir(CIN)
         
         if not cin_token:
             return None
@@ -307,27 +668,27 @@ class AnalizadorSintactico:
         # Agregar nodo para la palabra reservada 'cin'
         nodo.agregar_hijo(ASTNode("RESERVADA", cin_token.lexema, cin_token.linea, cin_token.columna))
         
-        operador = self.coincidir_opcional("OPERADOR_REL", ">>")
-        if not operador:
-            operador = self.coincidir_opcional("SIMBOLO", ">>")
-            
+        operador = self.coincidir_opcional(ENTRADA)
         if not operador:
-            self.errores.append("Error: Se esperaba '>>' después de 'cin'")
+            self.registrar_error("SIN011")
             return nodo
         
-        id_token = self.coincidir("IDENTIFICADOR")
+        id_token = self.coincidir(IDENTIFICADOR)
         if id_token:
             nodo.agregar_hijo(ASTNode("id", id_token.lexema, id_token.linea, id_token.columna))
         else:
-            self.errores.append("Error: Se esperaba un identificador después de 'cin >>'")
+            self.registrar_error("SIN012")
         
-        semicolon = self.coincidir_opcional("SIMBOLO", ";")
+        semicolon = self.coincidir_opcional(PUNTO_Y_COMA)
         
         return nodo
 
     def parse_seleccion(self):
+        return self._ejecutar(self._pasos_seleccion())
+
+    def _pasos_seleccion(self):
         nodo = ASTNode("seleccion")
-        if_token = self.coincidir("RESERVADA", "if")
+        if_token = self.coincidir(IF)
         if not if_token:
             return None
 
@@ -335,114 +696,120 @@ class AnalizadorSintactico:
         nodo.agregar_hijo(ASTNode("RESERVADA", if_token.lexema, if_token.linea, if_token.columna))
 
         # Forzar uso de paréntesis
-        if not self.coincidir("SIMBOLO", "("):
-            self.errores.append("Error: Se esperaba '(' después de 'if'")
+        if not self.coincidir(PAREN_ABRE):
+            self.registrar_error("SIN013", "if")
             # Puedes intentar recuperarte aquí si quieres
             return None
 
         nodo_cond = self.parse_expresion()
         if not nodo_cond:
-            self.errores.append("Error: Condición no válida en 'if'")
+            self.registrar_error("SIN014", "if")
             return None
 
-        if not self.coincidir("SIMBOLO", ")"):
-            self.errores.append("Error: Se esperaba ')' después de la condición del 'if'")
+        if not self.coincidir(PAREN_CIERRA):
+            self.registrar_error("SIN015", "if")
             return None
 
-        if not self.obtener_token() or self.obtener_token().lexema != "{":
-            self.errores.append("Error: Se esperaba '{' después de la condición del 'if'")
+        if self.clase_actual() != LLAVE_ABRE:
+            self.registrar_error("SIN016")
             return None
 
-        nodo.agregar_hijo(nodo_cond)
+        self.agregar_expresion(nodo, nodo_cond)
 
-        sent_then = self.parse_bloque_sentencias()
+        sent_then = yield self._pasos_bloque_sentencias()
         if sent_then and sent_then.hijos:
             nodo.agregar_hijo(sent_then)
         else:
-            self.errores.append("Error: Se esperaba un bloque '{...}' después del 'if'")
+            self.registrar_error("SIN017", "if")
 
         # Manejar ELSE opcional con llave
-        if self.obtener_token() and self.obtener_token().lexema == "else":
-            else_token = self.coincidir("RESERVADA", "else")
+        if self.clase_actual() == ELSE:
+            else_token = self.coincidir(ELSE)
             nodo.agregar_hijo(ASTNode("RESERVADA", else_token.lexema, else_token.linea, else_token.columna))
 
-            if not self.obtener_token() or self.obtener_token().lexema != "{":
-                self.errores.append("Error: Se esperaba '{' después de 'else'")
+            if self.clase_actual() != LLAVE_ABRE:
+                self.registrar_error("SIN018")
                 return nodo
 
-            sent_else = self.parse_bloque_sentencias()
+            sent_else = yield self._pasos_bloque_sentencias()
             if sent_else and sent_else.hijos:
                 nodo.agregar_hijo(sent_else)
             else:
-                self.errores.append("Error: Se esperaba un bloque '{...}' después del 'else'")
+                self.registrar_error("SIN017", "else")
 
         return nodo
 
     def parse_while(self):
+        return self._ejecutar(self._pasos_while())
+
+    def _pasos_while(self):
         nodo = ASTNode("while")
-        while_token = self.coincidir("RESERVADA", "while")
+        while_token = self.coincidir(WHILE)
         if not while_token:
             return None
 
-        paren_open = self.coincidir_opcional("SIMBOLO", "(")
+        paren_open = self.coincidir_opcional(PAREN_ABRE)
         if not paren_open:
-            self.errores.append("Error: Se esperaba '(' después de 'while'")
+            self.registrar_error("SIN013", "while")
             return None
 
         cond = self.parse_expresion()
         if cond: 
-            nodo.agregar_hijo(cond)
+            self.agregar_expresion(nodo, cond)
         else:
-            self.errores.append("Error: Condición no válida en 'while'")
+            self.registrar_error("SIN014", "while")
 
-        paren_close = self.coincidir_opcional("SIMBOLO", ")")
+        paren_close = self.coincidir_opcional(PAREN_CIERRA)
         if not paren_close:
-            self.errores.append("Error: Se esperaba ')' después de la condición del 'while'")
+            self.registrar_error("SIN015", "while")
 
-        sent = self.parse_bloque_sentencias()
+        sent = yield self._pasos_bloque_sentencias()
         if sent:
             nodo.agregar_hijo(sent)
 
         return nodo
     
     def parse_do_while(self):
+        return self._ejecutar(self._pasos_do_while())
+
+    def _pasos_do_while(self):
         nodo = ASTNode("do_while")
-        do_token = self.coincidir("RESERVADA", "do")
+        do_token = self.coincidir(DO)
         if not do_token:
             return None
 
-        bloque = self.parse_bloque_sentencias()
+        bloque = yield self._pasos_bloque_sentencias()
         if bloque:
             nodo.agregar_hijo(bloque)
         else:
-            self.errores.append("Error: Se esperaba un bloque '{...}' después de 'do'")
+            self.registrar_error("SIN019")
             return nodo
 
-        if not self.coincidir("RESERVADA", "while"):
-            self.errores.append("Error: Se esperaba 'while' después del bloque 'do'")
+        if not self.coincidir(WHILE):
+            self.registrar_error("SIN020")
             return nodo
 
-        if not self.coincidir("SIMBOLO", "("):
-            self.errores.append("Error: Se esperaba '(' después de 'while'")
+        if not self.coincidir(PAREN_ABRE):
+            self.registrar_error("SIN013", "while")
             return nodo
 
         cond = self.parse_expresion()
         if cond:
-            nodo.agregar_hijo(cond)
+            self.agregar_expresion(nodo, cond)
         else:
-            self.errores.append("Error: Condición no válida en 'do-while'")
+            self.registrar_error("SIN014", "do-while")
 
-        if not self.coincidir("SIMBOLO", ")"):
-            self.errores.append("Error: Se esperaba ')' después de la condición del 'while'")
+        if not self.coincidir(PAREN_CIERRA):
+            self.registrar_error("SIN015", "while")
 
-        if not self.coincidir("SIMBOLO", ";"):
-            self.errores.append("Error: Se esperaba ';' al final de 'do-while'")
+        if not self.coincidir(PUNTO_Y_COMA):
+            self.registrar_error("SIN021")
 
         return nodo
 
     def parse_declaracion_variable(self):
         nodo = ASTNode("declaracion_variable")
-        tipo = self.coincidir("RESERVADA")
+        tipo = self.coincidir(RESERVADA)
         if not tipo:
             return None
 
@@ -451,137 +818,67 @@ class AnalizadorSintactico:
 
         # Lista de identificadores
         nodo_ids = ASTNode("identificadores")
-        id_token = self.coincidir("IDENTIFICADOR")
+        id_token = self.coincidir(IDENTIFICADOR)
         if id_token:
             nodo_ids.agregar_hijo(ASTNode("id", id_token.lexema, id_token.linea, id_token.columna))
             while True:
-                coma = self.coincidir_opcional("SIMBOLO", ",")
+                coma = self.coincidir_opcional(COMA)
                 if coma:
-                    siguiente_id = self.coincidir("IDENTIFICADOR")
+                    siguiente_id = self.coincidir(IDENTIFICADOR)
                     if siguiente_id:
                         nodo_ids.agregar_hijo(ASTNode("id", siguiente_id.lexema, siguiente_id.linea, siguiente_id.columna))
                     else:
-                        self.errores.append("Error: Se esperaba un identificador después de ','")
+                        self.registrar_error("SIN022", ",")
                         break
                 else:
                     break
             nodo.agregar_hijo(nodo_ids)
         else:
-            self.errores.append(f"Error: Se esperaba un identificador después de '{tipo.lexema}'")
+            self.registrar_error("SIN022", tipo.lexema)
 
         # Punto y coma obligatorio
-        if not self.coincidir("SIMBOLO", ";"):
-            self.errores.append("Error: Falta ';' al final de la declaración de variable")
+        if not self.coincidir(PUNTO_Y_COMA):
+            self.registrar_error("SIN023")
         return nodo  # <-- asegúrate que este return esté dentro de la función, no fuera
 
-    def parse_expresion_simple(self):
-        nodo = self.parse_termino()
-        if not nodo:
-            return None
-
-        while True:
-            token = self.obtener_token()
-            if token and token.tipo == "OPERADOR_ARIT" and token.lexema in ["+", "-"]:
-                operador = self.coincidir("OPERADOR_ARIT")
-                derecho = self.parse_termino()
-                if not derecho:
-                    self.errores.append(f"Error: Operador '{operador.lexema}' sin operando derecho")
-                    break
-                nuevo = ASTNode("suma_op", operador.lexema)
-                nuevo.agregar_hijo(nodo)
-                nuevo.agregar_hijo(derecho)
-                nodo = nuevo
-            # Manejar operadores unarios ++ y --
-            elif token and token.tipo == "OPERADOR_ARIT" and token.lexema in ["++", "--"]:
-                operador = self.coincidir("OPERADOR_ARIT")
-                valor_unario = +1 if operador.lexema == "++" else -1
-                nuevo = ASTNode("unario_op", valor_unario)
-                nuevo.agregar_hijo(nodo)
-                nodo = nuevo
-            else:
-                break
-        return nodo
-
-    def parse_termino(self):
-        nodo = self.parse_factor()
-        if not nodo:
-            return None
-
-        while True:
-            token = self.obtener_token()
-            if token and token.tipo == "OPERADOR_ARIT" and token.lexema in ["*", "/", "%"]:
-                operador = self.coincidir("OPERADOR_ARIT")
-                derecho = self.parse_factor()
-                if not derecho:
-                    self.errores.append(f"Error: Operador '{operador.lexema}' sin operando derecho")
-                    break
-                
-                nuevo = ASTNode("mult_op", operador.lexema)
-                nuevo.agregar_hijo(nodo)
-                nuevo.agregar_hijo(derecho)
-                nodo = nuevo
-            else:
-                break
-        return nodo
-
-    def parse_factor(self):
-        nodo = self.parse_componente()
-        if not nodo:
-            return None
-
-        while True:
-            token = self.obtener_token()
-            if token and token.tipo == "OPERADOR_ARIT" and token.lexema == "^":
-                operador = self.coincidir("OPERADOR_ARIT")
-                derecho = self.parse_componente()
-                if not derecho:
-                    self.errores.append("Error: Se esperaba el exponente después de '^'")
-                    break
-                nuevo = ASTNode("pot_op", operador.lexema)
-                nuevo.agregar_hijo(nodo)
-                nuevo.agregar_hijo(derecho)
-                nodo = nuevo
-            else:
-                break
-        return nodo
-
     def parse_componente(self):
         token = self.obtener_token()
         if not token:
             return None
 
+        clase = token.clase
         # Manejar signo negativo unario
-        if token.tipo == "OPERADOR_ARIT" and token.lexema == "-":
+        if clase == MENOS:
             self.index += 1
             operando = self.parse_componente()
             if not operando:
-                self.errores.append("Error: Falta operando después de '-' unario")
+                self.registrar_error("SIN026")
                 return None
             # Crear nodo para negación unaria
             nodo = ASTNode("unario_op", "-", token.linea, token.columna)
             nodo.agregar_hijo(operando)
             return nodo
 
-        if token.lexema == "(":
-            self.coincidir("SIMBOLO", "(")
+        if clase == PAREN_ABRE:
+            self.coincidir(PAREN_ABRE)
             nodo = self.parse_expresion()
-            if not self.coincidir_opcional("SIMBOLO", ")"):
-                self.errores.append("Error: Falta ')' después de la expresión")
+            if not self.coincidir_opcional(PAREN_CIERRA):
+                self.registrar_error("SIN027")
             return nodo
 
-        elif token.tipo in ["NUMERO_ENTERO", "NUMERO_REAL", "IDENTIFICADOR", "CADENA"]:
+        elif clase in LITERALES:
             self.index += 1
             return ASTNode(token.tipo, token.lexema, token.linea, token.columna)
 
-        elif token.tipo == "RESERVADA" and token.lexema in ["true", "false"]:
+        elif clase in BOOLEANOS:
             self.index += 1
             return ASTNode("bool", token.lexema, token.linea, token.columna)
 
-        elif token.tipo == "OPERADOR_LOG" and token.lexema == "!":
-            operador = self.coincidir("OPERADOR_LOG", "!")
+        elif clase == NEGACION:
+            operador = self.coincidir(NEGACION)
             derecho = self.parse_componente()
             if not derecho:
-                self.errores.append("Error: Falta operando después de '!'")
+                self.registrar_error("SIN028")
                 return None
             nodo = ASTNode("op_logico", "!", operador.linea, operador.columna)
             nodo.agregar_hijo(derecho)
@@ -590,35 +887,505 @@ class AnalizadorSintactico:
         return None
 
     def parse_bloque_sentencias(self):
+        return self._ejecutar(self._pasos_bloque_sentencias())
+
+    def _pasos_bloque_sentencias(self):
         # Verificar si es un bloque con { } o una sola sentencia
-        if self.obtener_token() and self.obtener_token().lexema == "{":
-            self.coincidir("SIMBOLO", "{")
+        if self.clase_actual() == LLAVE_ABRE:
+            self.coincidir(LLAVE_ABRE)
             nodo_bloque = ASTNode("bloque")
             
-            while self.obtener_token() and self.obtener_token().lexema != "}":
-                sent = self.parse_sentencia()
-                if sent:
-                    nodo_bloque.agregar_hijo(sent)
-                else:
-                    # Evitar bucle infinito
-                    if self.index < len(self.tokens):
-                        self.index += 1
+            while self.clase_actual() not in (None, LLAVE_CIERRA):
+                yield self._pasos_elemento_bloque(nodo_bloque)
             
             # Aquí: reporta error si no hay }
-            if not self.coincidir_opcional("SIMBOLO", "}"):
-                self.errores.append("Error: Falta '}' al final del bloque")
-                self.sincronizar(["}"])
+            if not self.coincidir_opcional(LLAVE_CIERRA):
+                self.registrar_error("SIN029")
+                self.sincronizar(SINC_LLAVE_CIERRA)
             
             return nodo_bloque
         else:
             # Bloque de una sola sentencia
-            sent = self.parse_sentencia()
+            observador = self.observador
+            if observador is not None:
+                observador.empezar()
+            sent = yield self._pasos_sentencia()
+            nodo_bloque = None
             if sent:
                 nodo_bloque = ASTNode("bloque")
                 nodo_bloque.agregar_hijo(sent)
-                return nodo_bloque
+            if observador is not None:
+                observador.terminar(sent, nodo_bloque, unica=True)
+            return nodo_bloque
+
+    def _pasos_elemento_bloque(self, nodo_bloque):
+        """Un paso del ciclo de un bloque con llaves: agrega la declaración (local al bloque) o la
+        sentencia, o salta el token"""
+        observador = self.observador
+        if observador is not None:
+            observador.empezar()
+        if self.clase_actual() in TIPOS_DATO:
+            sent = self.parse_declaracion_variable()
+        else:
+            sent = yield self._pasos_sentencia()
+        if sent:
+            nodo_bloque.agregar_hijo(sent)
+        else:
+            # Evitar bucle infinito, descartando también los tokens que siguen si no pueden
+            # empezar una declaración ni una sentencia
+            if self.index < len(self.tokens):
+                self.index = self.buscar(SINC_ELEMENTO, self.index + 1)
+        if observador is not None:
+            observador.terminar(sent, nodo_bloque)
+
+    # Producción de cada clase de INICIO_SENTENCIA, en una tupla indexada por la clase:
+    # (función, anidada); las anidadas son generadores de pasos que _pasos_sentencia entrega
+    _SENTENCIAS = [None] * len(NOMBRES_CLASE)
+    _SENTENCIAS[IDENTIFICADOR] = (_sentencia_identificador, False)
+    _SENTENCIAS[COUT] = (parse_sent_out, False)
+    _SENTENCIAS[CIN] = (parse_sent_in, False)
+    _SENTENCIAS[IF] = (_pasos_seleccion, True)
+    _SENTENCIAS[DO] = (_pasos_do_while, True)
+    _SENTENCIAS[WHILE] = (_pasos_while, True)
+    _SENTENCIAS = tuple(_SENTENCIAS)
+
+def analizador_en_flujo(source, errores_lexicos=None, errores=None):
+    """AnalizadorSintactico que lee 'source' (ruta, archivo o mmap, como iter_tokens) y lo analiza
+    léxica y sintácticamente en una sola pasada, sin la lista completa de tokens; recorrer su
+    iter_sentencias() produce cada sentencia apenas se analiza. Sin el texto completo, los errores
+    sintácticos no llevan desplazamiento y el final del archivo se informa con SIN003."""
+    return AnalizadorSintactico(VentanaTokens(iter_tokens(source, errores_lexicos)), errores=errores)
+
+# Diagnósticos cuyos dos primeros argumentos son la línea y la columna
+_CODIGOS_CON_POSICION = frozenset(("SIN001", "SIN002", "SIN004", "SIN005", "SIN006"))
+
+class _Tramo:
+    """Sentencia de la lista principal o de un bloque: ocupa los tokens [inicio, fin) y sus
+    diagnósticos son [e_inicio, e_fin) en la lista 'errores' de la sentencia principal que la
+    contiene (las de nivel 0 guardan esa lista, con desplazamientos relativos a su inicio)"""
+    __slots__ = ("inicio", "fin", "nivel", "e_inicio", "e_fin", "nodo", "contenedor", "unica", "errores")
+
+class _Registrador:
+    """Observador de AnalizadorSintactico que anota un _Tramo por sentencia, en preorden"""
+    def __init__(self, analizador, nivel=0):
+        self.analizador = analizador
+        self.nivel = nivel
+        self.tramos = []
+        self.abiertos = []
+
+    def empezar(self):
+        tramo = _Tramo()
+        tramo.inicio = self.analizador.index
+        tramo.e_inicio = self.analizador.errores.total
+        tramo.nivel = self.nivel + len(self.abiertos)
+        self.abiertos.append(len(self.tramos))
+        self.tramos.append(tramo)
+
+    def terminar(self, nodo, contenedor, unica=False):
+        posicion = self.abiertos.pop()
+        if not nodo:
+            # La sentencia no quedó en el árbol, tampoco las que tuviera adentro
+            del self.tramos[posicion:]
+            return
+        tramo = self.tramos[posicion]
+        tramo.fin = self.analizador.index
+        tramo.e_fin = self.analizador.errores.total
+        tramo.nodo = nodo
+        tramo.contenedor = contenedor
+        tramo.unica = unica
+        tramo.errores = None
+
+class _VistaIncremental:
+    """Tokens de un AnalizadorLexicoIncremental con línea y columna. Hace de lista de tokens y de
+    fuente para AnalizadorSintactico; las líneas se cuentan desde el último token pedido, empezando
+    por 'ancla', un (desplazamiento, línea) conocido."""
+    def __init__(self, lexico, ancla=(0, 1)):
+        self.lexico = lexico
+        self.texto = lexico.texto
+        self._cache = {}
+        self._contado, self._linea = ancla
+        self._inicio_linea = self.texto.rfind('\n', 0, self._contado) + 1
+        self._inicios_linea = {self._linea: self._inicio_linea}
+
+    @property
+    def ancla(self):
+        return self._contado, self._linea
+
+    def __len__(self):
+        return len(self.lexico)
+
+    def __getitem__(self, i):
+        token = self._cache.get(i)
+        if token is None:
+            if len(self._cache) >= 8:
+                self._cache.clear()
+            tipo, lexema, inicio = self.lexico.token(i)
+            token = self._cache[i] = Token(tipo, lexema, *self._ubicar(inicio))
+        return token
+
+    def _ubicar(self, pos):
+        texto = self.texto
+        if pos < self._inicio_linea:
+            self._linea -= texto.count('\n', pos, self._inicio_linea)
+            self._inicio_linea = texto.rfind('\n', 0, pos) + 1
+            self._inicios_linea[self._linea] = self._inicio_linea
+        elif pos > self._contado:
+            saltos = texto.count('\n', self._contado, pos)
+            if saltos:
+                self._linea += saltos
+                self._inicio_linea = texto.rfind('\n', self._contado, pos) + 1
+                self._inicios_linea[self._linea] = self._inicio_linea
+        self._contado = max(pos, self._inicio_linea)
+        return self._linea, pos - self._inicio_linea + 1
+
+    def offset(self, linea, columna):
+        inicio = self._inicios_linea.get(linea)
+        if inicio is None:
+            inicio = 0
+            for _ in range(linea - 1):
+                inicio = self.texto.index('\n', inicio) + 1
+        return inicio + columna - 1
+
+    def linea_columna(self, offset):
+        return self.lexico.linea_columna(offset)
+
+class AnalizadorSintacticoIncremental:
+    """Mantiene el AST de un texto que se edita, volviendo a analizar solo las sentencias afectadas.
+
+    Cada sentencia de la lista principal y de los bloques se guarda como un _Tramo, en preorden;
+    igual que en AnalizadorLexicoIncremental, los tramos a partir de '_hueco' tienen posiciones de
+    token sin actualizar, a las que falta sumar '_delta'. Una edición vuelve a analizar la sentencia
+    más interna que contiene los tokens cambiados (con la anterior, si el cambio empieza en su
+    primer token) y las siguientes del mismo bloque hasta que el análisis vuelve a caer en el inicio
+    de una sentencia vieja; si llega al cierre del bloque, sube a la sentencia que lo contiene. El
+    resto de los nodos se conserva. Si cambia la cantidad de líneas, la línea de los nodos
+    posteriores se corrige recorriéndolos (costo lineal, pero sin volver a analizar).
+    """
+    def __init__(self, texto):
+        self.lexico = AnalizadorLexicoIncremental(texto)
+        self._analizar_todo()
+
+    def _analizar_todo(self):
+        vista = _VistaIncremental(self.lexico)
+        analizador = AnalizadorSintactico(vista, vista, ListaDiagnosticos())
+        registrador = analizador.observador = _Registrador(analizador)
+        self.ast = analizador.parse()
+        self._ancla = vista.ancla
+        self._tramos = registrador.tramos
+        self._hueco = len(self._tramos)
+        self._delta = 0
+        errores = analizador.errores
+        principales = [tramo for tramo in self._tramos if tramo.nivel == 0]
+        self._errores_raiz = list(errores[:principales[0].e_inicio if principales else len(errores)])
+        self._repartir_errores(self._tramos, errores, len(errores))
+
+    def _repartir_errores(self, tramos, errores, fin):
+        """Pasa los diagnósticos 'errores' (índices globales en los tramos recién analizados) a la
+        lista de cada sentencia principal; los de nivel 0 llegan hasta la siguiente o hasta 'fin'"""
+        principal = None
+        for tramo in tramos:
+            if tramo.nivel == 0:
+                if principal is not None:
+                    self._asignar(principal, errores[principal.e_inicio:tramo.e_inicio])
+                principal, base = tramo, tramo.e_inicio
+            else:
+                tramo.e_inicio -= base
+                tramo.e_fin -= base
+        if principal is not None:
+            self._asignar(principal, errores[principal.e_inicio:fin])
+
+    def _asignar(self, principal, errores):
+        base = self.lexico.token(principal.inicio)[2]
+        principal.errores = [self._relativo(error, base) for error in errores]
+        principal.e_fin -= principal.e_inicio
+        principal.e_inicio = 0
+
+    @staticmethod
+    def _relativo(error, base):
+        if error.offset is None:
+            return error
+        return Diagnostico(error.codigo, error.severidad, error.offset - base, error.args)
+
+    @property
+    def errores(self):
+        """Diagnósticos del texto actual, en el mismo orden que los daría un análisis completo"""
+        partes = [(0, self._errores_raiz)]
+        partes.extend((self.lexico.token(self._inicio(k))[2], tramo.errores)
+                      for k, tramo in enumerate(self._tramos) if not tramo.nivel and tramo.errores)
+        lista = lista_para_fase("sintactico", detener_en=None)  # Ya se analizó: no hay nada que detener
+        fin_texto = len(self.lexico.texto)
+        for base, errores in partes:
+            for error in errores:
+                if error.codigo == "SIN002":
+                    # La posición del final del archivo cambia con cualquier edición
+                    linea, columna = self.lexico.linea_columna(fin_texto)
+                    error = Diagnostico("SIN002", error.severidad, fin_texto, (linea, columna) + error.args[2:])
+                elif error.offset is not None and base:
+                    error = Diagnostico(error.codigo, error.severidad, error.offset + base, error.args)
+                lista.append(error)
+        return lista
+
+    def _inicio(self, k):
+        inicio = self._tramos[k].inicio
+        return inicio + self._delta if k >= self._hueco else inicio
+
+    def _fin(self, k):
+        fin = self._tramos[k].fin
+        return fin + self._delta if k >= self._hueco else fin
+
+    def _mover_hueco(self, destino):
+        tramos, delta = self._tramos, self._delta
+        if delta:
+            for k in range(self._hueco, destino):
+                tramos[k].inicio += delta
+                tramos[k].fin += delta
+            for k in range(destino, self._hueco):
+                tramos[k].inicio -= delta
+                tramos[k].fin -= delta
+        self._hueco = destino
+        if destino == len(tramos):
+            self._delta = 0
+
+    def editar_texto(self, nuevo):
+        """Deduce la edición comparando el texto actual con 'nuevo' y la aplica; devuelve lo mismo
+        que editar ([] si el texto no cambió)"""
+        edicion = diferencia(self.lexico.texto, nuevo)
+        return [] if edicion is None else self.editar(*edicion)
+
+    def editar(self, offset, borrados, insertado):
+        """Aplica una edición (borra 'borrados' caracteres en 'offset' e inserta 'insertado') y
+        actualiza el AST. Devuelve los nodos que cambiaron: el contenedor cuya lista de hijos se
+        modificó seguido de las sentencias nuevas (con subárboles también nuevos), o [self.ast] si
+        hubo que analizar todo de nuevo. Los demás nodos son los mismos objetos que antes."""
+        lexico = self.lexico
+        anterior = lexico.texto
+        fin_borrado = offset + borrados
+        lineas = insertado.count('\n') - anterior.count('\n', offset, fin_borrado)
+        limite = anterior.count('\n', 0, fin_borrado) + 1 if lineas else None  # Última línea vieja tocada
+        cambio = len(insertado) - borrados
+        posicion, linea = self._ancla
+        if offset < posicion:
+            self._ancla = (posicion + cambio, linea + lineas) if fin_borrado <= posicion else (0, 1)
+        cantidad = len(lexico)
+        reinicio, _, nuevos = lexico.editar(offset, borrados, insertado)
+        d = len(lexico) - cantidad
+        edicion = (offset, fin_borrado, cambio, limite, lineas)
+
+        # Tokens cambiados [c0, c1) del texto nuevo: los que se volvieron a analizar y los que
+        # siguen a la edición en su misma línea (cambió su columna)
+        texto = lexico.texto
+        fin_insertado = offset + len(insertado)
+        fin_linea = texto.find('\n', fin_insertado)
+        c0 = min(lexico.contar_antes(reinicio), lexico.contar_antes(fin_insertado))
+        c1 = max(lexico.contar_antes(reinicio) + len(nuevos),
+                 lexico.contar_antes(len(texto) if fin_linea < 0 else fin_linea))
+
+        tramos = self._tramos
+        if c0 == c1 and not d:
+            # Ningún token cambió: solo se corren posiciones y líneas desde la última sentencia
+            # principal que empieza antes de la edición
+            k = bisect_left(range(len(tramos)), c0, key=self._inicio) - 1
+            while k > 0 and tramos[k].nivel:
+                k -= 1
+            if k >= 0:
+                self._correr_errores(k, edicion)
+            else:
+                self._errores_raiz = [self._con_linea(self._corregido(error, 0, edicion), edicion)
+                                      for error in self._errores_raiz]
+            self._correr_lineas(max(k, 0), len(tramos), edicion)
+            return []
+        k = bisect_right(range(len(tramos)), c0, key=self._inicio) - 1
+        if k < 0:
+            # Cambió el encabezado 'main {' o lo que hay antes de la primera sentencia
+            self._analizar_todo()
+            return [self.ast]
+
+        # Sentencia más interna que contiene los tokens cambiados (en posiciones viejas). Las que
+        # son el cuerpo sin llaves de un if/while/do se analizan junto con él.
+        c1_viejo = c1 - d
+        while tramos[k].nivel and c1_viejo > self._fin(k):
+            k = self._padre(k)
+        while tramos[k].unica:
+            k = self._padre(k)
+        while True:
+            cambiados = self._reanalizar(k, c0, c1_viejo, d, edicion)
+            if cambiados is not None:
+                return cambiados
+            # El bloque terminó antes de reencontrar una sentencia vieja
+            k = self._padre(k)
+            while tramos[k].unica:
+                k = self._padre(k)
+
+    def _padre(self, k):
+        tramos = self._tramos
+        nivel = tramos[k].nivel
+        k -= 1
+        while tramos[k].nivel >= nivel:
+            k -= 1
+        return k
+
+    def _reanalizar(self, k, c0, c1_viejo, d, edicion):
+        """Vuelve a analizar, en el contenedor del tramo k, desde k (o la sentencia anterior, si el
+        cambio empieza en el primer token de k) hasta reencontrar el inicio de una sentencia vieja
+        posterior a los cambios. Devuelve los nodos cambiados, o None si antes se llega al cierre de
+        un bloque."""
+        tramos = self._tramos
+        nivel = tramos[k].nivel
+        contenedor = tramos[k].contenedor
+
+        def hermano(j):
+            """Posición del tramo que sigue a j en el mismo contenedor (None si no hay)"""
+            j += 1
+            while j < len(tramos) and tramos[j].nivel > nivel:
+                j += 1
+            if j < len(tramos) and tramos[j].nivel == nivel and tramos[j].contenedor is contenedor:
+                return j
             return None
 
+        p0 = k
+        if c0 <= self._inicio(k):
+            # La sentencia anterior miró el primer token de k para saber dónde terminaba, igual
+            # que los tokens descartados que pueda haber entre las dos
+            j = k - 1
+            while j >= 0 and tramos[j].nivel > nivel:
+                j -= 1
+            if j >= 0 and tramos[j].nivel == nivel and tramos[j].contenedor is contenedor:
+                p0 = j
+            elif nivel:
+                # k es la primera sentencia del bloque: se vuelve a analizar la que lo contiene
+                return None
+            elif self._errores_raiz:
+                # Tokens descartados antes de la primera sentencia principal
+                self._analizar_todo()
+                return [self.ast]
+
+        vista = _VistaIncremental(self.lexico, self._ancla)
+        analizador = AnalizadorSintactico(vista, vista, ListaDiagnosticos())
+        registrador = analizador.observador = _Registrador(analizador, nivel)
+        analizador.index = self._inicio(p0)
+        provisorio = ASTNode(contenedor.tipo)
+        siguiente = hermano(p0)
+        while True:
+            token = analizador.obtener_token()
+            if token is None or token.clase == LLAVE_CIERRA:
+                if nivel:
+                    return None
+                p1 = len(tramos)
+                break
+            if nivel:
+                analizador._ejecutar(analizador._pasos_elemento_bloque(provisorio))
+            else:
+                analizador.parse_elemento_lista(provisorio)
+            while siguiente is not None and (self._inicio(siguiente) < c1_viejo or
+                                             self._inicio(siguiente) + d < analizador.index):
+                siguiente = hermano(siguiente)
+            if siguiente is not None and self._inicio(siguiente) + d == analizador.index:
+                p1 = siguiente
+                break
+        self._ancla = vista.ancla
+
+        # Reemplazar los tramos [p0, p1) por los nuevos
+        viejos = [tramos[x].nodo for x in range(p0, p1) if tramos[x].nivel == nivel]
+        self._mover_hueco(p0)
+        nuevos, errores = registrador.tramos, analizador.errores
+        if nivel:
+            # Dentro de una sentencia principal: sus diagnósticos se reemplazan por tramo de índices
+            ancestros = [self._padre(p0)]
+            while tramos[ancestros[-1]].nivel:
+                ancestros.append(self._padre(ancestros[-1]))
+            principal = tramos[ancestros[-1]]
+            self._correr_errores(ancestros[-1], edicion)
+            self._correr_lineas(ancestros[-1], ancestros[-1] + 1, edicion)
+            self._correr_lineas(p1, len(tramos), edicion)
+            s0, s1 = tramos[p0].e_inicio, tramos[p1].e_inicio
+            base = self.lexico.token(principal.inicio)[2]
+            principal.errores[s0:s1] = [self._relativo(error, base) for error in errores]
+            cambio_errores = len(errores) - (s1 - s0)
+            for a in ancestros:
+                tramos[a].fin += d
+                tramos[a].e_fin += cambio_errores
+            x = p1
+            while x < len(tramos) and tramos[x].nivel:
+                tramos[x].e_inicio += cambio_errores
+                tramos[x].e_fin += cambio_errores
+                x += 1
+            for tramo in nuevos:
+                tramo.e_inicio += s0
+                tramo.e_fin += s0
+        else:
+            self._correr_lineas(p1, len(tramos), edicion)
+            primero = nuevos[0].e_inicio if nuevos else len(errores)
+            if primero:
+                # Tokens sueltos antes de la primera sentencia nueva: van con la principal anterior
+                previo = p0 - 1
+                while previo >= 0 and tramos[previo].nivel:
+                    previo -= 1
+                if previo >= 0:
+                    base = self.lexico.token(tramos[previo].inicio)[2]
+                    tramos[previo].errores.extend(self._relativo(error, base) for error in errores[:primero])
+                else:
+                    self._errores_raiz.extend(errores[:primero])
+            self._repartir_errores(nuevos, errores, len(errores))
+
+        self._delta += d
+        tramos[p0:p1] = nuevos
+        self._hueco = p0 + len(nuevos)
+        if self._hueco == len(tramos):
+            self._delta = 0
+        hijos = provisorio.hijos
+        for tramo in nuevos:
+            if tramo.nivel == nivel:
+                tramo.contenedor = contenedor
+        a = contenedor.hijos.index(viejos[0])
+        contenedor.hijos[a:a + len(viejos)] = hijos
+        if not contenedor.hijos:
+            contenedor.hijos = ()
+        return [contenedor, *hijos]
+
+    def _correr_errores(self, k, edicion):
+        """Corrige el desplazamiento relativo de los diagnósticos de la sentencia principal k que
+        quedan después de la edición (k empieza antes de ella)"""
+        tramo = self._tramos[k]
+        if tramo.errores:
+            base = self.lexico.token(self._inicio(k))[2]
+            tramo.errores = [self._corregido(error, base, edicion) for error in tramo.errores]
+
+    @staticmethod
+    def _corregido(error, base, edicion):
+        """'error' (desplazamiento relativo a 'base') con el desplazamiento que tiene después de la edición"""
+        offset, fin_borrado, cambio, limite, lineas = edicion
+        if error.offset is None or error.offset + base < fin_borrado:
+            return error
+        return Diagnostico(error.codigo, error.severidad, error.offset + cambio, error.args)
+
+    @staticmethod
+    def _con_linea(error, edicion):
+        """'error' con la línea que tiene después de la edición"""
+        offset, fin_borrado, cambio, limite, lineas = edicion
+        if not lineas or error.codigo not in _CODIGOS_CON_POSICION or error.args[0] <= limite:
+            return error
+        return Diagnostico(error.codigo, error.severidad, error.offset, (error.args[0] + lineas,) + error.args[1:])
+
+    def _correr_lineas(self, desde, hasta, edicion):
+        """Suma a la línea de los nodos y diagnósticos de las sentencias principales [desde, hasta)
+        las líneas que agregó o quitó la edición, si están después de ella"""
+        offset, fin_borrado, cambio, limite, lineas = edicion
+        if not lineas:
+            return
+        tramos = self._tramos
+        for x in range(desde, hasta):
+            tramo = tramos[x]
+            if tramo.nivel:
+                continue
+            pendientes = [tramo.nodo]
+            while pendientes:
+                nodo = pendientes.pop()
+                if nodo.linea is not None and nodo.linea > limite:
+                    nodo.linea += lineas
+                pendientes.extend(nodo.hijos)
+            if tramo.errores:
+                tramo.errores = [self._con_linea(error, edicion) for error in tramo.errores]
+
 def insertar_nodo(parent, nodo):
     item_id = tree.insert(
         parent,
@@ -0,0 +1,618 @@
+import os
+import pickle
+import hashlib
+from array import array
+from itertools import product
+
+from analisis_lexico import TOKEN_REGEX, TOKENS_IGNORADOS, ArchivoFuente
+from diagnosticos import Diagnostico, ERROR, FaseDetenida, lista_para_fase
+
+# Analizador léxico dirigido por un autómata finito determinista (AFD) generado a partir de
+# TOKEN_REGEX. Cada regla se traduce a un autómata no determinista (Thompson) y el conjunto se
+# determiniza por construcción de subconjuntos; las tablas se guardan en disco y se reutilizan
+# mientras las reglas no cambien. Produce exactamente los mismos tokens y errores que tokenize.
+
+# Acciones al reconocer una regla
+TOKEN, IGNORAR, DESCONOCIDO, DOBLE, ENTERO_CON_PUNTO, REAL_CON_PUNTO = range(6)
+
+# Se incrementa cuando cambia el formato de las tablas o la forma de construirlas
+VERSION_TABLAS = 1
+
+ARCHIVO_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__pycache__", "automata_lexico.pickle")
+
+# Cada cuántos caracteres se anota el estado de un recorrido que llegó al final sin aceptar
+_PASO_MARCAS = 64
+
+def reglas_automata(reglas=TOKEN_REGEX):
+    """Reglas del autómata en orden de prioridad: (tipo, expresión, banderas, acción).
+
+    A las reglas de TOKEN_REGEX se agregan la regla de ++/-- con espacios intermedios y las
+    validaciones de números que tokenize hace a mano, escritas como reglas con su acción.
+    La validación de un real seguido de una letra no se incluye: la frontera \\b del final
+    de NUMERO_REAL ya impide que lo siga una letra.
+    """
+    extendidas = [("OPERADOR_ARIT", r"\+[ \t\n]*\+|-[ \t\n]*-", 0, DOBLE)]
+    for tipo, regex, *banderas in reglas:
+        bandera = banderas[0] if banderas else 0
+        if tipo == "NUMERO_REAL":
+            # Real seguido de otro punto: se acepta el real y el punto es un error
+            extendidas.append((tipo, r"\b[+-]?\d+\.\d+\.", 0, REAL_CON_PUNTO))
+        elif tipo == "NUMERO_ENTERO":
+            # Entero seguido de un punto sin dígito después: el entero se descarta con un error
+            extendidas.append((tipo, r"\b[+-]?\d+\.(?!\p{isdigit})", 0, ENTERO_CON_PUNTO))
+        if tipo in TOKENS_IGNORADOS:
+            accion = IGNORAR
+        elif tipo == "DESCONOCIDO":
+            accion = DESCONOCIDO
+        else:
+            accion = TOKEN
+        extendidas.append((tipo, regex, bandera, accion))
+    return extendidas
+
+# ---------------------------------------------------------------------------------------------
+# Expresiones regulares: el subconjunto de la sintaxis de 're' que usan las reglas.
+# Alternancia, grupos, * + ? (también perezosos), clases [...], '.', \d \w \s y sus negaciones,
+# fronteras \b \B y una búsqueda hacia adelante de un solo carácter (?=x) (?!x). Además
+# \p{metodo} representa los caracteres c con c.metodo() verdadero (por ejemplo \p{isdigit}).
+
+# Propiedades Unicode de las que dependen \d, \w y \s (las mismas que usa 're')
+_PROPIEDADES = {
+    "d": str.isdecimal,
+    "w": lambda c: c.isalnum() or c == "_",
+    "s": str.isspace,
+}
+
+_ESCAPES_LITERALES = {"n": "\n", "t": "\t", "r": "\r", "f": "\f", "v": "\v", "a": "\a"}
+
+def _propiedad(nombre):
+    if nombre in _PROPIEDADES:
+        return _PROPIEDADES[nombre]
+    return getattr(str, nombre[2:])  # "p:isdigit" -> str.isdigit
+
+class _LectorRegex:
+    """Convierte una expresión en un árbol de tuplas. Los conjuntos de caracteres se registran
+    en 'conjuntos' (compartido entre reglas) y los nodos los referencian por índice."""
+    def __init__(self, patron, dotall, conjuntos):
+        self.patron = patron
+        self.i = 0
+        self.dotall = dotall
+        self.conjuntos = conjuntos
+        self.perezosa = False
+
+    def error(self, mensaje):
+        return ValueError(f"{mensaje} en la posición {self.i} de {self.patron!r}")
+
+    def ver(self):
+        return self.patron[self.i] if self.i < len(self.patron) else None
+
+    def tomar(self):
+        c = self.patron[self.i]
+        self.i += 1
+        return c
+
+    def conjunto(self, negado, elementos):
+        for elemento in elementos:
+            if elemento[0] != "p" and any(ord(c) > 127 for c in elemento[1:]):
+                raise self.error("solo se admiten caracteres ASCII literales")
+        clave = (negado, tuple(elementos))
+        if clave not in self.conjuntos:
+            self.conjuntos.append(clave)
+        return ("conjunto", self.conjuntos.index(clave))
+
+    def leer(self):
+        nodo = self.alternativa()
+        if self.i < len(self.patron):
+            raise self.error("paréntesis sin abrir")
+        return nodo
+
+    def alternativa(self):
+        opciones = [self.secuencia()]
+        while self.ver() == "|":
+            self.tomar()
+            opciones.append(self.secuencia())
+        return opciones[0] if len(opciones) == 1 else ("alt", opciones)
+
+    def secuencia(self):
+        partes = []
+        while self.ver() not in (None, "|", ")"):
+            partes.append(self.repeticion())
+        return ("sec", partes)
+
+    def repeticion(self):
+        nodo = self.atomo()
+        while self.ver() in ("*", "+", "?", "{"):
+            simbolo = self.tomar()
+            if simbolo == "{":
+                raise self.error("no se admiten repeticiones {m,n}")
+            if nodo[0] == "aserto":
+                raise self.error("no se puede repetir una aserción")
+            if self.ver() == "?":
+                self.tomar()
+                self.perezosa = True
+            nodo = ("rep", nodo, simbolo)
+        return nodo
+
+    def atomo(self):
+        c = self.tomar()
+        if c == "(":
+            return self.grupo()
+        if c == "[":
+            return self.clase()
+        if c == ".":
+            return self.conjunto(True, [] if self.dotall else [("c", "\n")])
+        if c == "\\":
+            return self.escape(en_clase=False)
+        if c in "^$":
+            raise self.error(f"no se admite '{c}'")
+        if c in "*+?)":
+            raise self.error(f"'{c}' inesperado")
+        return self.conjunto(False, [("c", c)])
+
+    def grupo(self):
+        aserto = None
+        if self.ver() == "?":
+            self.tomar()
+            tipo = self.tomar() if self.i < len(self.patron) else None
+            if tipo in ("=", "!"):
+                aserto = tipo
+            elif tipo != ":":
+                raise self.error("tipo de grupo no soportado")
+        nodo = self.alternativa()
+        if self.ver() != ")":
+            raise self.error("falta ')'")
+        self.tomar()
+        if aserto is None:
+            return nodo
+        # Búsqueda hacia adelante: solo un carácter, que se evalúa con la clase del siguiente
+        if nodo[0] != "sec" or len(nodo[1]) != 1 or nodo[1][0][0] != "conjunto":
+            raise self.error("la búsqueda hacia adelante debe ser de un solo carácter")
+        return ("aserto", ("siguiente", nodo[1][0][1], aserto == "!"))
+
+    def clase(self):
+        negado = self.ver() == "^"
+        if negado:
+            self.tomar()
+        elementos = []
+        primero = True
+        while True:
+            if self.i >= len(self.patron):
+                raise self.error("falta ']'")
+            c = self.tomar()
+            if c == "]" and not primero:
+                break
+            primero = False
+            if c == "\\":
+                elemento = self.escape(en_clase=True)
+                if elemento[0] == "p":
+                    elementos.append(elemento)
+                    continue
+                c = elemento[1]
+            if self.ver() == "-" and self.i + 1 < len(self.patron) and self.patron[self.i + 1] != "]":
+                self.tomar()
+                fin = self.tomar()
+                if fin == "\\":
+                    fin = self.escape(en_clase=True)
+                    if fin[0] == "p":
+                        raise self.error("rango inválido")
+                    fin = fin[1]
+                elementos.append(("r", c, fin))
+            else:
+                elementos.append(("c", c))
+        return self.conjunto(negado, elementos)
+
+    def escape(self, en_clase):
+        """Dentro de una clase devuelve un elemento ('c', car) o ('p', propiedad, negada);
+        fuera de ella devuelve un nodo."""
+        c = self.tomar()
+        elemento = None
+        if c in "dwsDWS":
+            elemento = ("p", c.lower(), c.isupper())
+        elif c == "p":
+            if self.ver() != "{" or "}" not in self.patron[self.i:]:
+                raise self.error("se esperaba \\p{metodo}")
+            cierre = self.patron.index("}", self.i)
+            metodo = self.patron[self.i + 1:cierre]
+            if not (metodo.startswith("is") and hasattr(str, metodo)):
+                raise self.error(f"str.{metodo} no existe")
+            self.i = cierre + 1
+            elemento = ("p", "p:" + metodo, False)
+        elif c in "bB" and not en_clase:
+            return ("aserto", ("frontera", c == "b"))
+        elif c in _ESCAPES_LITERALES:
+            elemento = ("c", _ESCAPES_LITERALES[c])
+        elif c.isalnum():
+            raise self.error(f"escape '\\{c}' no soportado")
+        else:
+            elemento = ("c", c)
+        if en_clase:
+            return elemento
+        return self.conjunto(False, [elemento])
+
+def _pertenece(conjunto, c):
+    negado, elementos = conjunto
+    for elemento in elementos:
+        if elemento[0] == "c":
+            dentro = c == elemento[1]
+        elif elemento[0] == "r":
+            dentro = elemento[1] <= c <= elemento[2]
+        else:
+            dentro = _propiedad(elemento[1])(c) != elemento[2]
+        if dentro:
+            return not negado
+    return negado
+
+def _pertenece_combinacion(conjunto, valores):
+    """Pertenencia de un carácter no ASCII dadas solo sus propiedades Unicode ('valores')"""
+    negado, elementos = conjunto
+    for elemento in elementos:
+        if elemento[0] == "p" and valores[elemento[1]] != elemento[2]:
+            return not negado
+    return negado
+
+# ---------------------------------------------------------------------------------------------
+# Construcción de las tablas
+
+class _AFN:
+    """Autómata no determinista de Thompson: transiciones vacías (con aserción opcional) y a
+    lo sumo una transición por conjunto de caracteres por estado."""
+    def __init__(self):
+        self.vacias = []     # lista de (destino, aserción o None) por estado
+        self.consumo = []    # (índice de conjunto, destino) o None
+        self.acepta = []     # índice de regla o -1
+        self.regla = []      # regla a la que pertenece el estado
+
+    def estado(self, regla):
+        self.vacias.append([])
+        self.consumo.append(None)
+        self.acepta.append(-1)
+        self.regla.append(regla)
+        return len(self.acepta) - 1
+
+    def construir(self, nodo, regla):
+        """Devuelve (inicio, fin) del fragmento que reconoce 'nodo'"""
+        inicio = self.estado(regla)
+        tipo = nodo[0]
+        if tipo == "conjunto":
+            fin = self.estado(regla)
+            self.consumo[inicio] = (nodo[1], fin)
+        elif tipo == "aserto":
+            fin = self.estado(regla)
+            self.vacias[inicio].append((fin, nodo[1]))
+        elif tipo == "sec":
+            fin = inicio
+            for parte in nodo[1]:
+                a, b = self.construir(parte, regla)
+                self.vacias[fin].append((a, None))
+                fin = b
+        elif tipo == "alt":
+            fin = self.estado(regla)
+            for opcion in nodo[1]:
+                a, b = self.construir(opcion, regla)
+                self.vacias[inicio].append((a, None))
+                self.vacias[b].append((fin, None))
+        else:  # "rep"
+            _, interno, simbolo = nodo
+            fin = self.estado(regla)
+            a, b = self.construir(interno, regla)
+            self.vacias[inicio].append((a, None))
+            self.vacias[b].append((fin, None))
+            if simbolo in "*?":
+                self.vacias[inicio].append((fin, None))
+            if simbolo in "*+":
+                self.vacias[b].append((a, None))
+        return inicio, fin
+
+def construir_tablas(reglas):
+    """Genera las tablas del AFD para 'reglas' (ver reglas_automata).
+
+    Gana la primera regla que reconoce algo, con su coincidencia más larga (la más corta si
+    usa un cuantificador perezoso), igual que la alternancia de la expresión maestra. Las
+    aserciones se resuelven con la clase del carácter anterior (guardada en el estado) y la
+    del siguiente, de modo que aceptar depende del estado y de la clase que sigue.
+    """
+    conjuntos = []
+    afn = _AFN()
+    inicio_afn = afn.estado(-1)
+    perezosas = []
+    for indice, (tipo, regex, bandera, accion) in enumerate(reglas):
+        if bandera & ~16:  # solo re.DOTALL
+            raise ValueError(f"bandera no soportada en la regla {tipo}")
+        lector = _LectorRegex(regex, bool(bandera), conjuntos)
+        arbol = lector.leer()
+        a, b = afn.construir(arbol, indice)
+        afn.vacias[inicio_afn].append((a, None))
+        afn.acepta[b] = indice
+        perezosas.append(lector.perezosa)
+
+    # Clases de caracteres: caracteres que ningún conjunto distingue comparten clase
+    propiedades = sorted({"w"} | {e[1] for _, elementos in conjuntos for e in elementos if e[0] == "p"})
+    firmas = {}
+    def clase(firma):
+        return firmas.setdefault(firma, len(firmas))
+    clases_ascii = [clase((tuple(_pertenece(cj, chr(o)) for cj in conjuntos), _propiedad("w")(chr(o))))
+                    for o in range(128)]
+    clase_combinacion = {}
+    for combinacion in product((False, True), repeat=len(propiedades)):
+        valores = dict(zip(propiedades, combinacion))
+        firma = (tuple(_pertenece_combinacion(cj, valores) for cj in conjuntos), valores["w"])
+        clase_combinacion[combinacion] = clase(firma)
+    fin_texto = clase(None)  # clase reservada para el final del texto
+    num_clases = len(firmas)
+    miembros = [None] * num_clases
+    palabra = [False] * num_clases
+    for firma, k in firmas.items():
+        if firma is not None:
+            miembros[k], palabra[k] = firma
+
+    # Estados del AFN desde los que se llega a una frontera \b o \B: solo ahí importa si el
+    # carácter anterior era de palabra
+    usa_frontera = [False] * len(afn.acepta)
+    for s in range(len(afn.acepta)):
+        pila, vistos = [s], {s}
+        while pila and not usa_frontera[s]:
+            for destino, aserto in afn.vacias[pila.pop()]:
+                if aserto is not None and aserto[0] == "frontera":
+                    usa_frontera[s] = True
+                if destino not in vistos:
+                    vistos.add(destino)
+                    pila.append(destino)
+
+    def cerradura(estados, anterior_palabra=None, siguiente=None):
+        """Cierre por transiciones vacías; las que tienen aserción solo si se conoce la
+        clase del siguiente carácter y la aserción se cumple."""
+        pila = list(estados)
+        resultado = set(estados)
+        while pila:
+            for destino, aserto in afn.vacias[pila.pop()]:
+                if destino in resultado:
+                    continue
+                if aserto is not None:
+                    if siguiente is None:
+                        continue
+                    if aserto[0] == "frontera":
+                        siguiente_palabra = siguiente != fin_texto and palabra[siguiente]
+                        if (anterior_palabra != siguiente_palabra) != aserto[1]:
+                            continue
+                    else:
+                        _, conjunto, negada = aserto
+                        dentro = siguiente != fin_texto and miembros[siguiente][conjunto]
+                        if dentro == negada:
+                            continue
+                resultado.add(destino)
+                pila.append(destino)
+        return resultado
+
+    indices = {}
+    pendientes = []
+    def estado_afd(estados, anterior_palabra):
+        if not estados:
+            return 0
+        if not any(usa_frontera[s] for s in estados):
+            anterior_palabra = False
+        clave = (frozenset(estados), anterior_palabra)
+        if clave not in indices:
+            indices[clave] = len(indices) + 1
+            pendientes.append(clave)
+        return indices[clave]
+
+    cerrado = cerradura({inicio_afn})
+    inicios = (estado_afd(cerrado, False), estado_afd(cerrado, True))
+    transiciones = [[0] * num_clases]  # el estado 0 es el estado muerto
+    aceptacion = [[-1] * num_clases]
+    while pendientes:
+        estados, anterior_palabra = pendientes.pop(0)
+        fila_t, fila_a = [0] * num_clases, [-1] * num_clases
+        for c in range(num_clases):
+            alcanzados = cerradura(estados, anterior_palabra, c)
+            regla = min((afn.acepta[s] for s in alcanzados if afn.acepta[s] >= 0), default=-1)
+            fila_a[c] = regla
+            if c == fin_texto:
+                continue
+            siguientes = set()
+            for s in alcanzados:
+                if afn.consumo[s] is not None and miembros[c][afn.consumo[s][0]]:
+                    destino = afn.consumo[s][1]
+                    # Si ya aceptó una regla, las de menor prioridad no pueden ganar; una regla
+                    # perezosa termina en su primera coincidencia
+                    r = afn.regla[destino]
+                    if regla < 0 or r < regla or (r == regla and not perezosas[regla]):
+                        siguientes.add(destino)
+            fila_t[c] = estado_afd(cerradura(siguientes), palabra[c])
+        transiciones.append(fila_t)
+        aceptacion.append(fila_a)
+
+    # Tablas planas: el estado k se representa por su desplazamiento k * num_clases
+    return {
+        "version": VERSION_TABLAS,
+        "firma": firma_reglas(reglas),
+        "num_clases": num_clases,
+        "fin_texto": fin_texto,
+        "clases_ascii": clases_ascii,
+        "propiedades": propiedades,
+        "clase_combinacion": clase_combinacion,
+        "palabra": palabra,
+        "inicios": tuple(q * num_clases for q in inicios),
+        "transiciones": [q * num_clases for fila in transiciones for q in fila],
+        "aceptacion": [r for fila in aceptacion for r in fila],
+        "tipos": [regla[0] for regla in reglas],
+        "acciones": [regla[3] for regla in reglas],
+    }
+
+def firma_reglas(reglas):
+    texto = repr((VERSION_TABLAS, [regla[:3] for regla in reglas], [regla[3] for regla in reglas]))
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+def cargar_tablas(reglas=None, archivo=ARCHIVO_CACHE):
+    """Lee las tablas del archivo de caché o las construye y las guarda.
+    Si el archivo no se puede escribir las tablas se usan igual desde memoria."""
+    reglas = reglas_automata() if reglas is None else reglas
+    firma = firma_reglas(reglas)
+    try:
+        with open(archivo, "rb") as f:
+            tablas = pickle.load(f)
+        if tablas.get("version") == VERSION_TABLAS and tablas.get("firma") == firma:
+            return tablas
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+        pass
+    tablas = construir_tablas(reglas)
+    try:
+        os.makedirs(os.path.dirname(archivo), exist_ok=True)
+        temporal = f"{archivo}.{os.getpid()}"
+        with open(temporal, "wb") as f:
+            pickle.dump(tablas, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, archivo)
+    except OSError:
+        pass
+    return tablas
+
+# ---------------------------------------------------------------------------------------------
+# Recorrido
+
+class _MapaClases(dict):
+    """Tabla para str.translate: código de carácter -> clase. Los caracteres no ASCII se
+    clasifican la primera vez que aparecen según sus propiedades Unicode."""
+    def __init__(self, tablas):
+        super().__init__((o, chr(k)) for o, k in enumerate(tablas["clases_ascii"]))
+        self.funciones = [_propiedad(p) for p in tablas["propiedades"]]
+        self.clase_combinacion = tablas["clase_combinacion"]
+
+    def __missing__(self, codigo):
+        c = chr(codigo)
+        clase = chr(self.clase_combinacion[tuple(f(c) for f in self.funciones)])
+        self[codigo] = clase
+        return clase
+
+class AutomataLexico:
+    """Tablas del AFD listas para recorrer un texto"""
+    def __init__(self, tablas):
+        self.tablas = tablas
+        self.transiciones = tablas["transiciones"]
+        self.aceptacion = tablas["aceptacion"]
+        self.inicios = tablas["inicios"]
+        self.palabra = tablas["palabra"]
+        self.fin_texto = tablas["fin_texto"]
+        self.tipos = tablas["tipos"]
+        self.acciones = tablas["acciones"]
+        self.mapa = _MapaClases(tablas)
+
+    @property
+    def num_estados(self):
+        return len(self.transiciones) // self.tablas["num_clases"]
+
+    def clases(self, texto):
+        """Clase de cada carácter del texto, más la clase de fin de texto al final"""
+        return texto.translate(self.mapa).encode("latin-1") + bytes((self.fin_texto,))
+
+    def recorrer_marcado(self, clases, q, i, marcas):
+        """Igual que el ciclo de tokenize_dfa pero se detiene al llegar a un par (posición,
+        estado) anotado en 'marcas', desde el que ya se sabe que no se acepta nada más.
+        Si llega al final del texto sin aceptar, anota su propio recorrido.
+        Devuelve (regla, fin, posición donde se detuvo)."""
+        T, A = self.transiciones, self.aceptacion
+        inicio, q_inicio = i, q
+        regla, fin = -1, i
+        while True:
+            if not i % _PASO_MARCAS and marcas[i // _PASO_MARCAS] == q and i > inicio:
+                return regla, fin, i
+            k = q + clases[i]
+            if A[k] >= 0:
+                regla, fin = A[k], i
+            q = T[k]
+            if not q:
+                break
+            i += 1
+        if i == len(clases) - 1 and fin < i:
+            self.marcar(clases, q_inicio, inicio, fin, marcas)
+        return regla, fin, i
+
+    def marcar(self, clases, q, i, fin, marcas):
+        """Repite un recorrido que llegó al final del texto sin aceptar después de 'fin' y anota
+        sus estados en las posiciones múltiplo de _PASO_MARCAS posteriores a 'fin'"""
+        T = self.transiciones
+        while q:
+            if i > fin and not i % _PASO_MARCAS:
+                marcas[i // _PASO_MARCAS] = q
+            q = T[q + clases[i]]
+            i += 1
+
+_AUTOMATA = None
+
+def automata():
+    """Autómata del analizador (se carga una sola vez por proceso)"""
+    global _AUTOMATA
+    if _AUTOMATA is None:
+        _AUTOMATA = AutomataLexico(cargar_tablas())
+    return _AUTOMATA
+
+def tokenize_dfa(text, errores=None):
+    """Versión de tokenize dirigida por el AFD; devuelve los mismos (tokens, errores).
+
+    Cada carácter se examina un número acotado de veces: el recorrido solo retrocede hasta la
+    última aceptación, y cuando un comentario o una cadena sin cerrar llega al final del texto
+    su recorrido se anota para que los intentos posteriores se detengan al alcanzarlo.
+    """
+    fuente = text if isinstance(text, ArchivoFuente) else ArchivoFuente(text)
+    tokens = []
+    errors = lista_para_fase("lexico") if errores is None else errores
+    try:
+        _analizar(fuente, tokens, errors)
+    except FaseDetenida:
+        pass
+    return tokens, errors
+
+def _analizar(fuente, tokens, errors):
+    texto = fuente.texto
+    ubicar = fuente.linea_columna
+    afd = automata()
+    T, A, palabra = afd.transiciones, afd.aceptacion, afd.palabra
+    inicio, inicio_palabra = afd.inicios
+    tipos, acciones = afd.tipos, afd.acciones
+    clases = afd.clases(texto)
+    n = len(texto)
+    marcas = None
+
+    pos = 0
+    while pos < n:
+        q = inicio_palabra if pos and palabra[clases[pos - 1]] else inicio
+        if marcas is None:
+            regla, fin, i, q_inicio = -1, pos, pos, q
+            while True:
+                k = q + clases[i]
+                if A[k] >= 0:
+                    regla, fin = A[k], i
+                q = T[k]
+                if not q:
+                    break
+                i += 1
+            if i == n and fin < n:
+                # Comentario o cadena sin cerrar: a partir de aquí se usan las marcas
+                marcas = array("I", bytes(4 * (n // _PASO_MARCAS + 1)))
+                afd.marcar(clases, q_inicio, pos, fin, marcas)
+        else:
+            regla, fin, i = afd.recorrer_marcado(clases, q, pos, marcas)
+
+        if regla < 0:
+            linea, columna = ubicar(pos)
+            errors.append(Diagnostico("LEX001", ERROR, pos, (linea, columna)))
+            pos += 1
+            continue
+
+        accion = acciones[regla]
+        if accion == TOKEN:
+            linea, columna = ubicar(pos)
+            tokens.append((tipos[regla], texto[pos:fin], linea, columna))
+        elif accion == DESCONOCIDO:
+            linea, columna = ubicar(pos)
+            errors.append(Diagnostico("LEX005", ERROR, pos, (linea, columna, texto[pos:fin])))
+        elif accion == DOBLE:
+            linea, columna = ubicar(pos)
+            tokens.append(("OPERADOR_ARIT", texto[pos] * 2, linea, columna))
+        elif accion == ENTERO_CON_PUNTO:
+            linea, columna = ubicar(fin - 1)
+            errors.append(Diagnostico("LEX002", ERROR, fin - 1, (linea, columna + 1, '.')))
+        elif accion == REAL_CON_PUNTO:
+            linea, columna = ubicar(pos)
+            tokens.append((tipos[regla], texto[pos:fin - 1], linea, columna))
+            linea_punto, columna_punto = ubicar(fin - 1)
+            errors.append(Diagnostico("LEX004", ERROR, fin - 1, (linea_punto, columna_punto + 1)))
+        pos = fin
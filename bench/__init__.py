@@ -0,0 +1 @@
+# Pruebas de rendimiento del compilador (ver bench/rendimiento.py)
@@ -0,0 +1,49 @@
+# Velocidad del analizador léxico por autómata (tokenize_dfa) contra el de expresiones regulares
+# (tokenize) y tiempo de construcción y de carga de las tablas del autómata.
+#
+#   python -m bench.automata [--archivo ejemplo_prueba.txt] [--repeticiones 200]
+#
+# El texto es el archivo repetido 'repeticiones' veces. Se comprueba además que ambos analizadores
+# devuelven los mismos tokens y errores.
+import argparse
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from analisis_lexico import ArchivoFuente, tokenize  # noqa: E402
+from automata_lexico import cargar_tablas, construir_tablas, reglas_automata, tokenize_dfa  # noqa: E402
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Rendimiento de tokenize_dfa frente a tokenize")
+    parser.add_argument("--archivo", default=os.path.join(RAIZ, "ejemplo_prueba.txt"))
+    parser.add_argument("--repeticiones", type=int, default=200)
+    opciones = parser.parse_args(argumentos)
+
+    with open(opciones.archivo, encoding="utf-8") as f:
+        fuente = ArchivoFuente(f.read() * opciones.repeticiones)
+
+    inicio = time.perf_counter()
+    tablas = construir_tablas(reglas_automata())
+    construccion = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    cargar_tablas()
+    carga = time.perf_counter() - inicio
+    print(f"Tablas: {len(tablas['transiciones']) // tablas['num_clases']} estados, {tablas['num_clases']} clases; "
+          f"construcción {construccion * 1000:.0f} ms, carga desde caché {carga * 1000:.1f} ms")
+
+    resultados = {}
+    for nombre, funcion in (("tokenize (regex)", tokenize), ("tokenize_dfa (AFD)", tokenize_dfa)):
+        inicio = time.perf_counter()
+        resultados[nombre] = funcion(fuente)
+        segundos = time.perf_counter() - inicio
+        tokens = len(resultados[nombre][0])
+        print(f"{nombre:20} {len(fuente.texto) / 1e6:.2f} MB  {segundos:.3f} s  "
+              f"{tokens / segundos / 1000:.0f}k tokens/s  {len(fuente.texto) / segundos / 1e6:.2f} MB/s")
+    print("Resultados idénticos:", len({repr(r) for r in resultados.values()}) == 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# Análisis completo (tokenize + parse + dump) contra carga desde la caché binaria del AST.
+#
+#   python -m bench.cache [--archivo ejemplo_prueba.txt]
+#
+# Se usa un directorio de caché temporal: la primera llamada a analizar_con_cache analiza y guarda,
+# la segunda carga lo guardado.
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from cache_ast import analizar_con_cache  # noqa: E402
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Análisis completo frente a carga desde la caché del AST")
+    parser.add_argument("--archivo", default=os.path.join(RAIZ, "ejemplo_prueba.txt"))
+    opciones = parser.parse_args(argumentos)
+
+    with open(opciones.archivo, encoding="utf-8") as f:
+        texto = f.read()
+    with tempfile.TemporaryDirectory() as directorio:
+        inicio = time.perf_counter()
+        analizar_con_cache(texto, directorio)
+        analisis = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        analizar_con_cache(texto, directorio)
+        carga = time.perf_counter() - inicio
+        tamano = sum(os.path.getsize(os.path.join(directorio, nombre)) for nombre in os.listdir(directorio))
+    print(f"{len(texto)} caracteres: tokenize + parse + dump {analisis * 1000:.1f} ms, "
+          f"load {carga * 1000:.1f} ms ({analisis / carga:.1f}x); caché de {tamano} bytes")
+
+if __name__ == "__main__":
+    main()
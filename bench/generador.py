@@ -0,0 +1,188 @@
+# Generador de programas aleatorios para las pruebas de rendimiento.
+# Con la misma semilla produce siempre el mismo texto. Los programas usan toda la gramática que
+# acepta el analizador sintáctico (declaraciones, asignaciones, if/else, while, do-while, cin,
+# cout, ++/-- y expresiones anidadas; con el perfil 'locales', también declaraciones dentro de
+# los bloques) y son correctos: no tienen errores léxicos, sintácticos ni semánticos, así que
+# también sirven para medir las fases siguientes.
+import os
+import random
+
+TAMANO_BLOQUE_ESCRITURA = 1 << 20
+
+# Opciones de GeneradorProgramas por perfil de corpus
+PERFILES = {
+    "general": {},
+    # Casi todo el texto son expresiones: poco anidamiento de bloques y expresiones altas
+    "expresiones": {"profundidad_bloques": 1, "profundidad_expresiones": 10},
+    # La mitad de los bloques declaran variables locales, que solo se usan dentro de ellos
+    "locales": {"locales": True},
+}
+
+class GeneradorProgramas:
+    """Genera las sentencias de un bloque 'main' hasta alcanzar un tamaño dado.
+
+    'profundidad_bloques' limita el anidamiento de if/while/do y 'profundidad_expresiones'
+    la altura de las expresiones. Con 'locales' los bloques pueden empezar declarando variables.
+    """
+    def __init__(self, semilla=0, profundidad_bloques=4, profundidad_expresiones=6, locales=False):
+        self.azar = random.Random(semilla)
+        self.profundidad_bloques = profundidad_bloques
+        self.profundidad_expresiones = profundidad_expresiones
+        self.locales = locales
+        # Variables declaradas por tipo; se agregan más a medida que crece el programa
+        self.variables = {"int": [], "float": [], "bool": []}
+        self.contador = 0
+
+    # --- Declaraciones ---
+
+    def declaracion(self, tipo=None):
+        tipo = tipo or self.azar.choice(("int", "int", "float", "bool"))
+        nombres = []
+        for _ in range(self.azar.randint(1, 4)):
+            self.contador += 1
+            nombres.append(f"{tipo[0]}{self.contador}")
+        self.variables[tipo].extend(nombres)
+        return f"{tipo} {', '.join(nombres)};"
+
+    def variable(self, tipo):
+        return self.azar.choice(self.variables[tipo])
+
+    # --- Expresiones ---
+
+    def aritmetica(self, tipo, altura):
+        """Expresión de tipo 'int' o 'float' (una expresión float puede mezclar enteros)"""
+        azar = self.azar
+        if altura <= 0 or azar.random() < 0.25:
+            eleccion = azar.random()
+            if eleccion < 0.55:
+                return self.variable("int" if tipo == "int" or eleccion < 0.3 else "float")
+            if tipo == "float" and eleccion < 0.8:
+                return f"{azar.randint(0, 999)}.{azar.randint(0, 99)}"
+            return str(azar.randint(0, 9999))
+        eleccion = azar.random()
+        if eleccion < 0.15:
+            return f"({self.aritmetica(tipo, altura - 1)})"
+        if eleccion < 0.2:
+            # Entre paréntesis: "a - -b" se reconocería como el operador "--"
+            return f"(-{self.aritmetica(tipo, altura - 1)})"
+        operador = azar.choice(("+", "-", "*", "/", "+", "-", "*", "^") if tipo == "float"
+                               else ("+", "-", "*", "/", "%", "+", "-", "^"))
+        return f"{self.aritmetica(tipo, altura - 1)} {operador} {self.aritmetica(tipo, altura - 1)}"
+
+    def condicion(self, altura):
+        """Expresión de tipo 'bool'"""
+        azar = self.azar
+        eleccion = azar.random()
+        if altura <= 0 or eleccion < 0.15:
+            if eleccion < 0.1:
+                return self.variable("bool")
+            return azar.choice(("true", "false"))
+        if eleccion < 0.6:
+            tipo = azar.choice(("int", "float"))
+            operador = azar.choice(("<", ">", "<=", ">=", "==", "!="))
+            return f"{self.aritmetica(tipo, altura - 1)} {operador} {self.aritmetica(tipo, altura - 1)}"
+        if eleccion < 0.7:
+            return f"!({self.condicion(altura - 1)})"
+        if eleccion < 0.8:
+            return f"({self.condicion(altura - 1)})"
+        operador = azar.choice(("&&", "||"))
+        return f"{self.condicion(altura - 1)} {operador} {self.condicion(altura - 1)}"
+
+    def expresion(self, tipo):
+        altura = self.azar.randint(1, self.profundidad_expresiones)
+        if tipo == "bool":
+            return self.condicion(altura)
+        return self.aritmetica(tipo, altura)
+
+    # --- Sentencias ---
+
+    def sentencia(self, nivel, sangria):
+        azar = self.azar
+        eleccion = azar.random()
+        if nivel >= self.profundidad_bloques or eleccion < 0.45:
+            return sangria + self.sentencia_simple()
+        if eleccion < 0.65:
+            texto = f"{sangria}if ({self.expresion('bool')}) {self.bloque(nivel + 1, sangria)}"
+            if azar.random() < 0.5:
+                texto += f" else {self.bloque(nivel + 1, sangria)}"
+            return texto
+        if eleccion < 0.85:
+            return f"{sangria}while ({self.expresion('bool')}) {self.bloque(nivel + 1, sangria)}"
+        return f"{sangria}do {self.bloque(nivel + 1, sangria)} while ({self.expresion('bool')});"
+
+    def sentencia_simple(self):
+        azar = self.azar
+        eleccion = azar.random()
+        if eleccion < 0.55:
+            tipo = azar.choice(("int", "int", "float", "bool"))
+            return f"{self.variable(tipo)} = {self.expresion(tipo)};"
+        if eleccion < 0.65:
+            return f"{self.variable('int')}{azar.choice(('++', '--'))};"
+        if eleccion < 0.85:
+            # cout acepta cadenas y variables (un valor por cada '<<')
+            partes = [azar.choice((f'"valor {self.contador}"', self.variable(azar.choice(("int", "float", "bool")))))
+                      for _ in range(azar.randint(1, 3))]
+            return f"cout << {' << '.join(partes)};"
+        return f"cin >> {self.variable(azar.choice(('int', 'float', 'bool')))};"
+
+    def bloque(self, nivel, sangria):
+        interior = sangria + "    "
+        declaraciones = []
+        if self.locales and self.azar.random() < 0.5:
+            tipo = self.azar.choice(("int", "int", "float", "bool"))
+            antes = len(self.variables[tipo])
+            declaraciones.append(interior + self.declaracion(tipo))
+        sentencias = [self.sentencia(nivel, interior) for _ in range(self.azar.randint(1, 4))]
+        if declaraciones:
+            # Fuera del bloque las locales ya no existen
+            del self.variables[tipo][antes:]
+        return "{\n" + "\n".join(declaraciones + sentencias) + f"\n{sangria}}}"
+
+    # --- Programa ---
+
+    def fragmentos(self, tamano):
+        """Produce el programa en fragmentos de texto; el total mide al menos 'tamano' caracteres
+        (lo justo para cerrar el bloque 'main' cuando 'tamano' es muy chico)"""
+        yield "main {\n"
+        escrito = 7
+        for tipo in self.variables:
+            linea = f"    {self.declaracion(tipo)}\n"
+            yield linea
+            escrito += len(linea)
+        while escrito < tamano - 2:
+            if self.azar.random() < 0.05:
+                linea = f"    {self.declaracion()}\n"
+            else:
+                linea = self.sentencia(0, "    ") + "\n"
+            yield linea
+            escrito += len(linea)
+        yield "}\n"
+
+def generar(tamano, semilla=0, **opciones):
+    """Programa aleatorio de alrededor de 'tamano' caracteres"""
+    return "".join(GeneradorProgramas(semilla, **opciones).fragmentos(tamano))
+
+def escribir_corpus(ruta, tamano, semilla=0, **opciones):
+    """Escribe el programa en 'ruta' por bloques, sin armarlo completo en memoria"""
+    temporal = f"{ruta}.{os.getpid()}"
+    pendiente, acumulado = [], 0
+    with open(temporal, "w", encoding="utf-8", newline="\n") as f:
+        for fragmento in GeneradorProgramas(semilla, **opciones).fragmentos(tamano):
+            pendiente.append(fragmento)
+            acumulado += len(fragmento)
+            if acumulado >= TAMANO_BLOQUE_ESCRITURA:
+                f.write("".join(pendiente))
+                pendiente, acumulado = [], 0
+        f.write("".join(pendiente))
+    os.replace(temporal, ruta)
+    return ruta
+
+def corpus(tamano, semilla=0, directorio=None, perfil="general"):
+    """Ruta del corpus de 'tamano' caracteres con 'semilla' y 'perfil'; se genera la primera vez"""
+    directorio = directorio or os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+    os.makedirs(directorio, exist_ok=True)
+    prefijo = "programa" if perfil == "general" else perfil
+    ruta = os.path.join(directorio, f"{prefijo}_{tamano}_{semilla}.txt")
+    if not os.path.exists(ruta):
+        escribir_corpus(ruta, tamano, semilla, **PERFILES[perfil])
+    return ruta
@@ -0,0 +1,62 @@
+# Velocidad del analizador LL(1) generado (AnalizadorLL1) contra el descendente recursivo
+# (AnalizadorSintactico) y tiempo de construcción y de carga de las tablas de la gramática.
+#
+#   python -m bench.gramatica_ll1 [--archivo ejemplo_prueba.txt] [--repeticiones 1]
+#
+# El texto es el archivo repetido 'repeticiones' veces; ambos analizadores reciben el mismo flujo de
+# tokens y se comprueba que arman el mismo AST.
+import argparse
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from analisis_lexico import ArchivoFuente, tokenize_flujo  # noqa: E402
+from analisis_sintactico import AnalizadorSintactico  # noqa: E402
+from gramatica import AnalizadorLL1, cargar_tablas, construir_tablas  # noqa: E402
+
+def forma(nodo):
+    """(tipo, valor, línea, columna, hijos) de cada nodo en preorden, sin recursión"""
+    pendientes, salida = [nodo], []
+    while pendientes:
+        nodo = pendientes.pop()
+        salida.append((nodo.tipo, nodo.valor, nodo.linea, nodo.columna, len(nodo.hijos)))
+        pendientes.extend(reversed(nodo.hijos))
+    return salida
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Rendimiento de AnalizadorLL1 frente a AnalizadorSintactico")
+    parser.add_argument("--archivo", default=os.path.join(RAIZ, "ejemplo_prueba.txt"))
+    parser.add_argument("--repeticiones", type=int, default=1)
+    opciones = parser.parse_args(argumentos)
+
+    inicio = time.perf_counter()
+    tablas = construir_tablas()
+    construccion = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    cargar_tablas()
+    carga = time.perf_counter() - inicio
+    print(f"Gramática: {len(tablas['no_terminales'])} no terminales, {len(tablas['producciones'])} producciones, "
+          f"{tablas['otro'] + 1} clases de token; construcción {construccion * 1000:.0f} ms, "
+          f"carga desde caché {carga * 1000:.1f} ms")
+
+    with open(opciones.archivo, encoding="utf-8") as f:
+        fuente = ArchivoFuente(f.read() * opciones.repeticiones)
+    flujo, _ = tokenize_flujo(fuente)
+
+    resultados = {}
+    for nombre, clase in (("descendente recursivo", AnalizadorSintactico), ("LL(1)", AnalizadorLL1)):
+        analizador = clase(flujo, fuente)
+        inicio = time.perf_counter()
+        ast = analizador.parse()
+        segundos = time.perf_counter() - inicio
+        resultados[nombre] = forma(ast)
+        print(f"{nombre:22} {len(flujo)} tokens  {segundos:.3f} s  {len(flujo) / segundos / 1000:.0f}k tokens/s  "
+              f"{analizador.errores.total} errores")
+    print("AST idénticos:", len({repr(r) for r in resultados.values()}) == 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# Reconocimiento de palabras y operadores en código con muchas palabras reservadas: alternativa
+# RESERVADA de la expresión maestra contra identificador + RESERVADAS, y alternativas de
+# operadores de la expresión maestra contra el trie (reconocer_operador). Mide también tokenize.
+#
+#   python -m bench.reconocimiento [--repeticiones 20000]
+#
+# Cada forma se aplica a las posiciones de todas las palabras (o de todos los operadores) del texto
+# y se comprueba que ambas reconocen lo mismo.
+import argparse
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from analisis_lexico import (OPERADORES, REGEX_ESCANER, REGEX_MAESTRA, RESERVADAS,  # noqa: E402
+                             ArchivoFuente, reconocer_operador, tokenize)
+
+BLOQUE = ("int a, b; float c; bool d;\n"
+          "if (a >= b && !d) { cout << a; } else { while (true) { cin >> b; break; } }\n"
+          "do { a = a + 1; } while (a != b);\n")
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Reconocimiento de palabras reservadas y operadores")
+    parser.add_argument("--repeticiones", type=int, default=20000)
+    opciones = parser.parse_args(argumentos)
+
+    fuente = ArchivoFuente(BLOQUE * opciones.repeticiones)
+    texto = fuente.texto
+    tokens, _ = tokenize(fuente)
+    palabras = [fuente.offset(l, c) for tipo, _, l, c in tokens if tipo in ("RESERVADA", "IDENTIFICADOR")]
+    operadores = [fuente.offset(l, c) for tipo, lexema, l, c in tokens if OPERADORES.get(lexema) == tipo]
+
+    def con_expresion_maestra(posiciones):
+        return [REGEX_MAESTRA.match(texto, pos).lastgroup for pos in posiciones]
+
+    def con_conjunto(posiciones):
+        tipos = []
+        for pos in posiciones:
+            lexema = REGEX_ESCANER.match(texto, pos).group()
+            tipos.append("RESERVADA" if lexema in RESERVADAS else "IDENTIFICADOR")
+        return tipos
+
+    def con_trie(posiciones):
+        return [reconocer_operador(texto, pos)[0] for pos in posiciones]
+
+    for nombre, posiciones, funciones in (("palabras", palabras, (con_expresion_maestra, con_conjunto)),
+                                          ("operadores", operadores, (con_expresion_maestra, con_trie))):
+        resultados = []
+        for funcion in funciones:
+            inicio = time.perf_counter()
+            resultados.append(funcion(posiciones))
+            segundos = time.perf_counter() - inicio
+            print(f"{nombre:11} {funcion.__name__:22} {len(posiciones)} lexemas  {segundos:.3f} s  "
+                  f"{segundos / len(posiciones) * 1e9:.0f} ns/lexema")
+        print(f"{nombre:11} resultados idénticos:", resultados[0] == resultados[1])
+
+    inicio = time.perf_counter()
+    tokenize(fuente)
+    segundos = time.perf_counter() - inicio
+    print(f"tokenize    {len(texto) / 1e6:.2f} MB  {len(tokens) / segundos / 1000:.0f}k tokens/s")
+
+if __name__ == "__main__":
+    main()
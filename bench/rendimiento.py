@@ -0,0 +1,226 @@
+# Pruebas de rendimiento del analizador léxico y del sintáctico sobre programas generados.
+#
+#   python -m bench.rendimiento [--tamanos 1K,10K,100K,1M,10M,100M] [--semilla 0] [--perfil general]
+#                               [--fases lexico,sintactico,arbol,flujo] [--repeticiones 3] [--salida archivo.json]
+#   python -m bench.rendimiento --comparar antes.json despues.json
+#
+# Cada medición corre en un proceso aparte para que el pico de memoria (RSS) sea solo el suyo.
+# 'lexico' mide tokenize; 'sintactico' mide AnalizadorSintactico.parse sobre los tokens de
+# tokenize_flujo, que se obtienen antes de empezar a medir; 'arbol' mide con tracemalloc la memoria
+# que ocupa el AST (bytes por nodo); 'flujo' mide léxico y sintáctico fusionados leyendo el archivo
+# por fragmentos (analizador_en_flujo, sin guardar las sentencias), cuyo RSS no crece con el
+# tamaño. El tiempo es el mejor de las repeticiones. Los resultados se
+# guardan en JSON para compararlos entre commits. Con --perfil expresiones los programas son casi
+# solo expresiones (ver bench/generador.py).
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from bench.generador import PERFILES, corpus  # noqa: E402
+
+TAMANOS = "1K,10K,100K,1M,10M,100M"
+FASES = ("lexico", "sintactico", "arbol", "flujo")
+_SUFIJOS = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+def leer_tamano(texto):
+    """'10K' -> 10240, '100M' -> 104857600, '500' -> 500"""
+    texto = texto.strip().upper()
+    if texto[-1:] in _SUFIJOS:
+        return int(float(texto[:-1]) * _SUFIJOS[texto[-1]])
+    return int(texto)
+
+def rss_pico_kb():
+    """Pico de memoria residente del proceso en KiB (None si la plataforma no lo informa)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico // 1024 if sys.platform == "darwin" else pico  # macOS lo da en bytes
+
+def contar_nodos(ast):
+    """Cantidad de ASTNode del árbol (sin recursión, el árbol puede ser muy profundo)"""
+    total, pendientes = 0, [ast]
+    while pendientes:
+        nodo = pendientes.pop()
+        total += 1
+        pendientes.extend(hijo for hijo in nodo.hijos if hasattr(hijo, "hijos"))
+    return total
+
+def medir(fase, ruta, repeticiones):
+    """Mide una fase sobre el archivo 'ruta' en este proceso y devuelve el registro del resultado"""
+    from analisis_lexico import tokenize, tokenize_flujo
+    from analisis_sintactico import AnalizadorSintactico, analizador_en_flujo
+
+    if fase == "flujo":
+        texto = None  # Se lee por fragmentos durante la medición
+        registro = {"corpus": os.path.basename(ruta), "bytes": os.path.getsize(ruta), "fase": fase}
+    else:
+        with open(ruta, encoding="utf-8") as f:
+            texto = f.read()
+        registro = {"corpus": os.path.basename(ruta), "caracteres": len(texto), "fase": fase}
+
+    if fase == "lexico":
+        registro["rss_base_kb"] = rss_pico_kb()
+        mejor = None
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            tokens, errores = tokenize(texto)
+            segundos = time.perf_counter() - inicio
+            mejor = segundos if mejor is None else min(mejor, segundos)
+            num_tokens, num_errores = len(tokens), errores.total
+            del tokens, errores
+        registro.update(segundos=mejor, tokens=num_tokens, errores=num_errores,
+                        tokens_por_segundo=num_tokens / mejor)
+    elif fase == "sintactico":
+        flujo, _ = tokenize_flujo(texto)
+        registro["rss_base_kb"] = rss_pico_kb()
+        mejor = None
+        for _ in range(repeticiones):
+            analizador = AnalizadorSintactico(flujo)
+            inicio = time.perf_counter()
+            ast = analizador.parse()
+            segundos = time.perf_counter() - inicio
+            mejor = segundos if mejor is None else min(mejor, segundos)
+            num_nodos, num_errores = contar_nodos(ast), analizador.errores.total
+            del ast, analizador
+        registro.update(segundos=mejor, tokens=len(flujo), nodos=num_nodos, errores=num_errores,
+                        tokens_por_segundo=len(flujo) / mejor, nodos_por_segundo=num_nodos / mejor)
+    elif fase == "arbol":
+        flujo, _ = tokenize_flujo(texto)
+        registro["rss_base_kb"] = rss_pico_kb()
+        tracemalloc.start()
+        antes = tracemalloc.get_traced_memory()[0]
+        analizador = AnalizadorSintactico(flujo)
+        ast = analizador.parse()
+        bytes_arbol = tracemalloc.get_traced_memory()[0] - antes
+        tracemalloc.stop()
+        num_nodos = contar_nodos(ast)
+        registro.update(nodos=num_nodos, errores=analizador.errores.total, bytes_arbol=bytes_arbol,
+                        bytes_por_nodo=bytes_arbol / num_nodos)
+    elif fase == "flujo":
+        registro["rss_base_kb"] = rss_pico_kb()
+        mejor = None
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            analizador = analizador_en_flujo(ruta)
+            num_sentencias = sum(1 for _ in analizador.iter_sentencias(conservar=False))
+            segundos = time.perf_counter() - inicio
+            mejor = segundos if mejor is None else min(mejor, segundos)
+            num_tokens, num_errores = len(analizador.tokens), analizador.errores.total
+            del analizador
+        registro.update(segundos=mejor, tokens=num_tokens, sentencias=num_sentencias, errores=num_errores,
+                        tokens_por_segundo=num_tokens / mejor)
+    else:
+        raise ValueError(f"fase desconocida: {fase}")
+
+    registro["rss_pico_kb"] = rss_pico_kb()
+    return registro
+
+def medir_en_proceso(fase, ruta, repeticiones):
+    """Ejecuta medir() en un proceso nuevo y devuelve su registro"""
+    salida = subprocess.run(
+        [sys.executable, "-m", "bench.rendimiento", "--medir", fase, ruta, "--repeticiones", str(repeticiones)],
+        cwd=RAIZ, capture_output=True, text=True,
+    )
+    if salida.returncode != 0:
+        raise RuntimeError(f"la medición de {fase} sobre {ruta} falló:\n{salida.stderr}")
+    return json.loads(salida.stdout)
+
+def commit_actual():
+    try:
+        salida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True)
+    except OSError:
+        return None
+    return salida.stdout.strip() or None
+
+def ejecutar(tamanos, semilla, fases, repeticiones, perfil="general"):
+    resultados = []
+    for tamano in tamanos:
+        ruta = corpus(tamano, semilla, perfil=perfil)
+        for fase in fases:
+            registro = medir_en_proceso(fase, ruta, repeticiones)
+            resultados.append(registro)
+            if fase == "arbol":
+                medida = f"{registro['nodos']:>10} nodos  {registro['bytes_por_nodo']:8.1f} bytes/nodo"
+            else:
+                medida = f"{registro['segundos']:9.3f} s  {registro['tokens_por_segundo'] / 1000:8.0f}k tokens/s"
+                if "nodos_por_segundo" in registro:
+                    medida += f"  {registro['nodos_por_segundo'] / 1000:8.0f}k nodos/s"
+            print(f"{registro['corpus']:28} {fase:10} {medida}  RSS pico {registro['rss_pico_kb'] / 1024:8.1f} MiB",
+                  file=sys.stderr)
+    return {
+        "version": 1,
+        "commit": commit_actual(),
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "semilla": semilla,
+        "perfil": perfil,
+        "repeticiones": repeticiones,
+        "resultados": resultados,
+    }
+
+def comparar(anterior, nuevo):
+    """Muestra la variación de tiempo y memoria de cada medición presente en ambos archivos"""
+    previos = {(r["corpus"], r["fase"]): r for r in anterior["resultados"]}
+    print(f"{anterior.get('commit')} -> {nuevo.get('commit')}")
+    for registro in nuevo["resultados"]:
+        previo = previos.get((registro["corpus"], registro["fase"]))
+        if previo is None:
+            continue
+        memoria = registro["rss_pico_kb"] / previo["rss_pico_kb"] if previo.get("rss_pico_kb") else float("nan")
+        if registro["fase"] == "arbol":
+            medida = f"bytes/nodo x{registro['bytes_por_nodo'] / previo['bytes_por_nodo']:5.2f}"
+        else:
+            medida = f"tiempo x{registro['segundos'] / previo['segundos']:5.2f}"
+        print(f"{registro['corpus']:28} {registro['fase']:10} {medida}  RSS pico x{memoria:5.2f}")
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Rendimiento de tokenize y AnalizadorSintactico.parse")
+    parser.add_argument("--tamanos", default=TAMANOS, help="tamaños de los corpus, p. ej. 1K,10M")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--perfil", default="general", choices=sorted(PERFILES))
+    parser.add_argument("--fases", default=",".join(FASES))
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--salida", help="archivo JSON de resultados (por omisión se escribe en la salida estándar)")
+    parser.add_argument("--comparar", nargs=2, metavar=("ANTES", "DESPUES"))
+    parser.add_argument("--medir", nargs=2, metavar=("FASE", "CORPUS"), help=argparse.SUPPRESS)
+    opciones = parser.parse_args(argumentos)
+
+    if opciones.medir:
+        print(json.dumps(medir(*opciones.medir, opciones.repeticiones)))
+        return
+    if opciones.comparar:
+        archivos = []
+        for ruta in opciones.comparar:
+            with open(ruta, encoding="utf-8") as f:
+                archivos.append(json.load(f))
+        comparar(*archivos)
+        return
+
+    fases = [fase.strip() for fase in opciones.fases.split(",") if fase.strip()]
+    for fase in fases:
+        if fase not in FASES:
+            parser.error(f"fase desconocida: {fase}")
+    tamanos = [leer_tamano(t) for t in opciones.tamanos.split(",") if t.strip()]
+    informe = ejecutar(tamanos, opciones.semilla, fases, opciones.repeticiones, opciones.perfil)
+    texto = json.dumps(informe, indent=2, ensure_ascii=False)
+    if opciones.salida:
+        with open(opciones.salida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    else:
+        print(texto)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# Prueba de rendimiento de TablaSimbolos: insertar y buscar con muchos símbolos.
+#
+#   python -m bench.tabla_simbolos [--simbolos 100000] [--repeticiones 3] [--semilla 0]
+#
+# Los nombres son como los de bench/generador.py (v0, v1, ...; v12 y v21 son anagramas) en orden
+# aleatorio. Se mide insertar todos en una tabla nueva y luego buscar cada uno una vez; el tiempo es
+# el mejor de las repeticiones. También se informa el reparto en cubetas (la más larga).
+import argparse
+import os
+import random
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from analisis_semantico import TablaSimbolos  # noqa: E402
+
+def medir(simbolos, repeticiones, semilla):
+    nombres = [f"v{i}" for i in range(simbolos)]
+    random.Random(semilla).shuffle(nombres)
+    mejor_insertar = mejor_buscar = None
+    for _ in range(repeticiones):
+        tabla = TablaSimbolos()
+        inicio = time.perf_counter()
+        for linea, nombre in enumerate(nombres, 1):
+            tabla.insertar(nombre, "int", linea, 1)
+        segundos = time.perf_counter() - inicio
+        mejor_insertar = segundos if mejor_insertar is None else min(mejor_insertar, segundos)
+
+        inicio = time.perf_counter()
+        for nombre in nombres:
+            tabla.buscar(nombre)
+        segundos = time.perf_counter() - inicio
+        mejor_buscar = segundos if mejor_buscar is None else min(mejor_buscar, segundos)
+    return {
+        "simbolos": simbolos,
+        "insertar_us": mejor_insertar / simbolos * 1e6,
+        "buscar_us": mejor_buscar / simbolos * 1e6,
+        "cubetas": tabla.tamano,
+        "cubeta_mas_larga": max(len(cubeta) for cubeta in tabla.tabla),
+    }
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Rendimiento de TablaSimbolos.insertar y buscar")
+    parser.add_argument("--simbolos", type=int, default=100000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--semilla", type=int, default=0)
+    opciones = parser.parse_args(argumentos)
+
+    r = medir(opciones.simbolos, opciones.repeticiones, opciones.semilla)
+    print(f"{r['simbolos']} símbolos  insertar {r['insertar_us']:.2f} µs  buscar {r['buscar_us']:.2f} µs  "
+          f"{r['cubetas']} cubetas (la más larga: {r['cubeta_mas_larga']})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+import gc
+import hashlib
+import mmap
+import os
+import struct
+import sys
+
+from analisis_lexico import tokenize_flujo
+from analisis_sintactico import AnalizadorSintactico, ASTNode
+from diagnosticos import Diagnostico, lista_para_fase
+
+# Codificación binaria del AST para reutilizarlo entre ejecuciones sin volver a analizar un
+# fuente que no cambió. El archivo tiene:
+#
+#   cabecera   MAGIA, VERSION_FORMATO (2 bytes) y la clave (p. ej. el resumen del fuente)
+#   tipos      tabla de tipos de nodo: cada nodo guarda el índice de su tipo
+#   valores    valores internados (cadenas, enteros, reales, True/False): cada valor repetido
+#              (un identificador, un número, un código de diagnóstico) se guarda una sola vez
+#   nodos      en postorden; por nodo: índice de tipo con banderas, valor, posición y cantidad
+#              de hijos. La línea se guarda como diferencia con la del nodo anterior.
+#   listas     de diagnósticos (p. ej. los léxicos y los sintácticos)
+#
+# Todos los enteros son varint (7 bits por byte, el bit alto indica que sigue otro byte), así
+# que los índices, columnas y diferencias de línea habituales ocupan un byte. Las anotaciones
+# del análisis semántico no se guardan. load() lee el archivo a través de mmap.
+
+MAGIA = b"ASTB"
+# Se incrementa cuando cambia el formato, el AST que produce el analizador sintáctico o los
+# diagnósticos que se guardan con él, para que las cachés anteriores se descarten
+VERSION_FORMATO = 3
+
+DIRECTORIO_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__pycache__", "ast")
+
+# Banderas de la cabecera de cada nodo (los bits restantes son el índice del tipo)
+_CON_VALOR = 1
+_CON_POSICION = 2
+
+# Etiquetas de la reserva de valores
+_CADENA, _ENTERO, _REAL, _FALSO, _VERDADERO = range(5)
+
+_REAL_BINARIO = struct.Struct("<d")
+
+class CacheInvalida(ValueError):
+    """El archivo no es una caché de AST de esta versión o no corresponde a la clave pedida"""
+
+def _varint(salida, valor):
+    while valor >= 0x80:
+        salida.append((valor & 0x7F) | 0x80)
+        valor >>= 7
+    salida.append(valor)
+
+def _leer_varint(datos, i):
+    """(valor, siguiente posición) del varint que empieza en datos[i]"""
+    valor = desplazamiento = 0
+    while True:
+        byte = datos[i]
+        i += 1
+        valor |= (byte & 0x7F) << desplazamiento
+        if byte < 0x80:
+            return valor, i
+        desplazamiento += 7
+
+def _zigzag(valor):
+    return valor << 1 if valor >= 0 else (-valor << 1) - 1
+
+def _de_zigzag(valor):
+    return valor >> 1 if not valor & 1 else -(valor >> 1) - 1
+
+class _Reserva:
+    """Valores internados: índice 0 = None, los demás en orden de aparición"""
+    def __init__(self):
+        self.indices = {}
+        self.valores = []
+
+    def indice(self, valor):
+        if valor is None:
+            return 0
+        clave = (type(valor), valor)  # 1, 1.0 y True son claves distintas
+        indice = self.indices.get(clave)
+        if indice is None:
+            self.valores.append(valor)
+            indice = self.indices[clave] = len(self.valores)
+        return indice
+
+    def codificar(self, salida):
+        _varint(salida, len(self.valores))
+        for valor in self.valores:
+            if valor is True or valor is False:
+                salida.append(_VERDADERO if valor else _FALSO)
+            elif isinstance(valor, str):
+                texto = valor.encode("utf-8")
+                salida.append(_CADENA)
+                _varint(salida, len(texto))
+                salida += texto
+            elif isinstance(valor, int):
+                salida.append(_ENTERO)
+                _varint(salida, _zigzag(valor))
+            elif isinstance(valor, float):
+                salida.append(_REAL)
+                salida += _REAL_BINARIO.pack(valor)
+            else:
+                raise TypeError(f"valor no serializable en el AST: {valor!r}")
+
+def dumps(ast, diagnosticos=(), clave=b""):
+    """Codifica 'ast' (y las listas de Diagnostico de 'diagnosticos') en bytes"""
+    tipos, reserva = {}, _Reserva()
+    nodos = bytearray()
+    linea_anterior = 0
+    cantidad = 0
+    # Postorden sin recursión: (nodo, hijos ya recorridos)
+    pendientes = [(ast, False)]
+    while pendientes:
+        nodo, visto = pendientes.pop()
+        if not visto:
+            pendientes.append((nodo, True))
+            pendientes.extend((hijo, False) for hijo in reversed(nodo.hijos))
+            continue
+        cantidad += 1
+        tipo = tipos.setdefault(nodo.tipo, len(tipos))
+        cabecera = tipo << 2
+        if nodo.valor is not None:
+            cabecera |= _CON_VALOR
+        if nodo.linea is not None:
+            cabecera |= _CON_POSICION
+        _varint(nodos, cabecera)
+        if nodo.valor is not None:
+            _varint(nodos, reserva.indice(nodo.valor))
+        if nodo.linea is not None:
+            _varint(nodos, _zigzag(nodo.linea - linea_anterior))
+            _varint(nodos, nodo.columna)
+            linea_anterior = nodo.linea
+        _varint(nodos, len(nodo.hijos))
+
+    listas = bytearray()
+    _varint(listas, len(diagnosticos))
+    for lista in diagnosticos:
+        _varint(listas, getattr(lista, "total", len(lista)))
+        _varint(listas, len(lista))
+        for diagnostico in lista:
+            _varint(listas, reserva.indice(diagnostico.codigo))
+            _varint(listas, reserva.indice(diagnostico.severidad))
+            _varint(listas, 0 if diagnostico.offset is None else diagnostico.offset + 1)
+            _varint(listas, len(diagnostico.args))
+            for argumento in diagnostico.args:
+                _varint(listas, reserva.indice(argumento))
+
+    salida = bytearray(MAGIA)
+    salida += VERSION_FORMATO.to_bytes(2, "little")
+    _varint(salida, len(clave))
+    salida += clave
+    _varint(salida, len(tipos))
+    for tipo in tipos:
+        texto = tipo.encode("utf-8")
+        _varint(salida, len(texto))
+        salida += texto
+    reserva.codificar(salida)
+    _varint(salida, cantidad)
+    salida += nodos
+    salida += listas
+    return bytes(salida)
+
+def _leer_cabecera(datos, clave):
+    if bytes(datos[:4]) != MAGIA:
+        raise CacheInvalida("no es una caché de AST")
+    version = int.from_bytes(datos[4:6], "little")
+    if version != VERSION_FORMATO:
+        raise CacheInvalida(f"versión de formato {version}, se esperaba {VERSION_FORMATO}")
+    largo, i = _leer_varint(datos, 6)
+    if clave is not None and bytes(datos[i:i + largo]) != clave:
+        raise CacheInvalida("la caché corresponde a otro fuente")
+    return i + largo
+
+def _leer_cadena(datos, i):
+    largo, i = _leer_varint(datos, i)
+    return str(datos[i:i + largo], "utf-8"), i + largo
+
+def _decodificar(datos, clave):
+    """(ast, listas de diagnósticos) de los bytes 'datos' (bytes, memoryview de un mmap, ...).
+
+    El recolector de ciclos se pausa mientras tanto: el árbol no tiene ciclos y, con cientos de
+    miles de nodos nuevos, sus pasadas sobre el montículo que crece triplican el tiempo de carga.
+    """
+    activo = gc.isenabled()
+    gc.disable()
+    try:
+        return _decodificar_sin_gc(datos, clave)
+    except (IndexError, UnicodeDecodeError, struct.error) as error:
+        raise CacheInvalida(f"caché truncada o dañada: {error}") from None
+    finally:
+        if activo:
+            gc.enable()
+
+def _decodificar_sin_gc(datos, clave):
+    i = _leer_cabecera(datos, clave)
+    cantidad, i = _leer_varint(datos, i)
+    tipos = []
+    for _ in range(cantidad):
+        tipo, i = _leer_cadena(datos, i)
+        tipos.append(sys.intern(tipo))
+
+    cantidad, i = _leer_varint(datos, i)
+    valores = [None]
+    for _ in range(cantidad):
+        etiqueta = datos[i]
+        i += 1
+        if etiqueta == _CADENA:
+            valor, i = _leer_cadena(datos, i)
+            valor = sys.intern(valor)
+        elif etiqueta == _ENTERO:
+            valor, i = _leer_varint(datos, i)
+            valor = _de_zigzag(valor)
+        elif etiqueta == _REAL:
+            valor, = _REAL_BINARIO.unpack_from(datos, i)
+            i += 8
+        elif etiqueta in (_FALSO, _VERDADERO):
+            valor = etiqueta == _VERDADERO
+        else:
+            raise CacheInvalida(f"etiqueta de valor desconocida: {etiqueta}")
+        valores.append(valor)
+
+    # Nodos en postorden: los hijos de cada nodo son los últimos de la pila. Los varint de un
+    # byte (casi todos) se leen en línea.
+    cantidad, i = _leer_varint(datos, i)
+    pila = []
+    nuevo = ASTNode.__new__
+    linea = 0
+    for _ in range(cantidad):
+        cabecera = datos[i]
+        i += 1
+        if cabecera >= 0x80:
+            cabecera, i = _leer_varint(datos, i - 1)
+        nodo = nuevo(ASTNode)
+        nodo.tipo = tipos[cabecera >> 2]
+        nodo.tipo_semantico = nodo.valor_calculado = nodo.valor_semantico = None
+        if cabecera & _CON_VALOR:
+            indice = datos[i]
+            i += 1
+            if indice >= 0x80:
+                indice, i = _leer_varint(datos, i - 1)
+            nodo.valor = valores[indice]
+        else:
+            nodo.valor = None
+        if cabecera & _CON_POSICION:
+            diferencia = datos[i]
+            i += 1
+            if diferencia >= 0x80:
+                diferencia, i = _leer_varint(datos, i - 1)
+            linea += diferencia >> 1 if not diferencia & 1 else -(diferencia >> 1) - 1
+            columna = datos[i]
+            i += 1
+            if columna >= 0x80:
+                columna, i = _leer_varint(datos, i - 1)
+            nodo.linea = linea
+            nodo.columna = columna
+        else:
+            nodo.linea = nodo.columna = None
+        hijos = datos[i]
+        i += 1
+        if hijos >= 0x80:
+            hijos, i = _leer_varint(datos, i - 1)
+        if hijos:
+            nodo.hijos = pila[-hijos:]
+            del pila[-hijos:]
+        else:
+            nodo.hijos = ()
+        pila.append(nodo)
+    if len(pila) != 1:
+        raise CacheInvalida("la secuencia de nodos no forma un único árbol")
+
+    cantidad, i = _leer_varint(datos, i)
+    listas = []
+    for _ in range(cantidad):
+        total, i = _leer_varint(datos, i)
+        conservados, i = _leer_varint(datos, i)
+        lista = []
+        for _ in range(conservados):
+            codigo, i = _leer_varint(datos, i)
+            severidad, i = _leer_varint(datos, i)
+            offset, i = _leer_varint(datos, i)
+            numero, i = _leer_varint(datos, i)
+            argumentos = []
+            for _ in range(numero):
+                indice, i = _leer_varint(datos, i)
+                argumentos.append(valores[indice])
+            lista.append(Diagnostico(valores[codigo], valores[severidad], offset - 1 if offset else None,
+                                     tuple(argumentos)))
+        listas.append((total, lista))
+    return pila[0], listas
+
+def loads(datos, clave=None):
+    """AST codificado con dumps. Con 'clave' se exige que coincida con la guardada; lanza
+    CacheInvalida, igual que load, si los datos están truncados o dañados"""
+    return _decodificar(datos, clave)[0]
+
+def dump(ast, archivo, diagnosticos=(), clave=b""):
+    """Guarda 'ast' en el archivo (escribe en un temporal y lo reemplaza, para que otro proceso
+    nunca lea una caché a medio escribir)"""
+    temporal = f"{archivo}.{os.getpid()}"
+    with open(temporal, "wb") as f:
+        f.write(dumps(ast, diagnosticos, clave))
+    os.replace(temporal, archivo)
+
+def _cargar(archivo, clave):
+    with open(archivo, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+        datos = memoryview(mapa)
+        try:
+            return _decodificar(datos, clave)
+        finally:
+            datos.release()
+
+def load(archivo, clave=None):
+    """AST guardado con dump. Lanza CacheInvalida si el archivo es de otra versión del formato,
+    está dañado o (con 'clave') corresponde a otro fuente"""
+    return _cargar(archivo, clave)[0]
+
+def clave_fuente(texto):
+    """Clave de caché de un texto fuente: su resumen SHA-256"""
+    return hashlib.sha256(texto.encode("utf-8")).digest()
+
+def analizar_con_cache(texto, directorio=DIRECTORIO_CACHE):
+    """(ast, errores léxicos, errores sintácticos) de 'texto', leídos de la caché si el mismo
+    fuente ya se analizó con esta versión; si no, se analiza y se guarda el resultado. Si la
+    caché no se puede escribir el resultado se devuelve igual."""
+    clave = clave_fuente(texto)
+    archivo = os.path.join(directorio, f"{clave.hex()}.ast")
+    try:
+        ast, listas = _cargar(archivo, clave)
+    except (OSError, ValueError):
+        pass
+    else:
+        errores = []
+        for fase, (total, lista) in zip(("lexico", "sintactico"), listas):
+            diagnosticos = lista_para_fase(fase)
+            diagnosticos[:] = lista
+            diagnosticos.total = total
+            errores.append(diagnosticos)
+        if len(errores) == 2:
+            return ast, *errores
+
+    tokens, errores_lexicos = tokenize_flujo(texto)
+    analizador = AnalizadorSintactico(tokens, tokens.fuente)
+    ast = analizador.parse()
+    try:
+        os.makedirs(directorio, exist_ok=True)
+        dump(ast, archivo, (errores_lexicos, analizador.errores), clave)
+    except OSError:
+        pass
+    return ast, errores_lexicos, analizador.errores
@@ -0,0 +1,137 @@
+from array import array
+
+# Representación del código de tres direcciones como cuádruplas (código de operación, destino,
+# argumento 1, argumento 2) en lugar de cadenas. CodigoIntermedio guarda:
+#
+#   cuádruplas   en cuatro arrays paralelos: el código de operación (array('B')) y los índices
+#                de sus tres operandos (array('i'), SIN_OPERANDO si no lo tiene)
+#   operandos    internados: cada variable, constante o etiqueta distinta está una sola vez, con
+#                su clase (array('B')), su valor y el texto con que se escribe. Los temporales
+#                no están en la tabla: cada uno se usa en pocas instrucciones y su índice es
+#                negativo, -2 - n para tn
+#
+# texto() escribe cada cuádrupla igual que el código de tres direcciones que se mostraba antes
+# (p. ej. "t3 = x + y", "if not t1 goto L2"); las fases siguientes trabajan sobre la forma
+# estructurada.
+
+# Códigos de operación
+(COMENTARIO, DECLARACION, LIBERACION, LECTURA, ESCRITURA, ETIQUETA, SALTO, SALTO_SI_NO, SALTO_SI,
+ COPIA, NEGACION_LOGICA) = range(11)
+# Cada operador binario tiene su código de operación, a partir de BINARIA
+BINARIA = 16
+OPERADORES_BINARIOS = ("+", "-", "*", "/", "%", "^", "<", ">", "<=", ">=", "==", "!=", "&&", "||",
+                       "<<", ">>", "&", "!")
+CODIGOS_BINARIOS = {operador: codigo for codigo, operador in enumerate(OPERADORES_BINARIOS, BINARIA)}
+
+# Clases de operando
+VARIABLE, TEMPORAL, CONSTANTE, ETIQUETA_OPERANDO = range(4)
+
+SIN_OPERANDO = -1
+
+class Temporal(str):
+    """Nombre de un temporal (t0, t1, ...): se distingue de una variable que se llame igual"""
+    __slots__ = ()
+
+class Cuadrupla:
+    """Una instrucción: su código de operación y los índices de sus operandos en CodigoIntermedio"""
+    __slots__ = ("opcode", "destino", "arg1", "arg2")
+
+    def __init__(self, opcode, destino, arg1, arg2):
+        self.opcode = opcode
+        self.destino = destino
+        self.arg1 = arg1
+        self.arg2 = arg2
+
+    def __repr__(self):
+        return f"Cuadrupla({self.opcode!r}, {self.destino!r}, {self.arg1!r}, {self.arg2!r})"
+
+class CodigoIntermedio:
+    """Cuádruplas del código de tres direcciones y sus operandos internados"""
+    def __init__(self):
+        self.opcodes = array('B')
+        self.destinos = array('i')
+        self.args1 = array('i')
+        self.args2 = array('i')
+        self.clases = array('B')  # Clase de cada operando
+        self.valores = []  # Valor de cada operando: el nombre, o el valor de una constante
+        self.textos = []   # Cómo se escribe cada operando
+        self._indices = [{}, None, {}, {}]  # Por clase: texto -> índice del operando
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def operando(self, clase, valor):
+        """Índice del operando, que se agrega si es nuevo. Las constantes se internan por su texto,
+        así que True, 1 y 1.0 son operandos distintos"""
+        if clase == TEMPORAL:
+            return -2 - int(valor[1:])
+        texto = valor if type(valor) is str else f"{valor}"
+        indices = self._indices[clase]
+        indice = indices.get(texto)
+        if indice is None:
+            indice = indices[texto] = len(self.textos)
+            self.clases.append(clase)
+            self.valores.append(valor)
+            self.textos.append(texto)
+        return indice
+
+    def valor(self, valor):
+        """Operando de un valor del análisis semántico: un Temporal, el nombre de una variable o una
+        constante (número, booleano o cadena literal)"""
+        if type(valor) is Temporal:
+            return -2 - int(valor[1:])
+        if type(valor) is str and not valor.startswith('"'):
+            return self.operando(VARIABLE, valor)
+        return self.operando(CONSTANTE, valor)
+
+    def clase(self, operando):
+        return TEMPORAL if operando < SIN_OPERANDO else self.clases[operando]
+
+    def nombre(self, operando):
+        """Texto del operando: el nombre de la variable, temporal o etiqueta, o la constante escrita"""
+        return f"t{-2 - operando}" if operando < SIN_OPERANDO else self.textos[operando]
+
+    def agregar(self, opcode, destino=SIN_OPERANDO, arg1=SIN_OPERANDO, arg2=SIN_OPERANDO):
+        self.opcodes.append(opcode)
+        self.destinos.append(destino)
+        self.args1.append(arg1)
+        self.args2.append(arg2)
+
+    def cuadrupla(self, i):
+        return Cuadrupla(self.opcodes[i], self.destinos[i], self.args1[i], self.args2[i])
+
+    def __iter__(self):
+        return map(Cuadrupla, self.opcodes, self.destinos, self.args1, self.args2)
+
+    def texto(self, i):
+        """La cuádrupla i como instrucción de tres direcciones"""
+        opcode = self.opcodes[i]
+        nombre = self.nombre
+        destino, arg1 = self.destinos[i], self.args1[i]
+        if opcode >= BINARIA:
+            return f"{nombre(destino)} = {nombre(arg1)} {OPERADORES_BINARIOS[opcode - BINARIA]} {nombre(self.args2[i])}"
+        if opcode == COPIA:
+            return f"{nombre(destino)} = {nombre(arg1)}"
+        if opcode == NEGACION_LOGICA:
+            return f"{nombre(destino)} = !{nombre(arg1)}"
+        if opcode == SALTO_SI_NO:
+            return f"if not {nombre(arg1)} goto {nombre(destino)}"
+        if opcode == SALTO_SI:
+            return f"if {nombre(arg1)} goto {nombre(destino)}"
+        if opcode == SALTO:
+            return f"goto {nombre(destino)}"
+        if opcode == ETIQUETA:
+            return f"{nombre(destino)}:"
+        if opcode == DECLARACION:
+            return f"DECLARE {nombre(destino)} {nombre(arg1)}"
+        if opcode == LIBERACION:
+            return f"RELEASE {nombre(destino)}"
+        if opcode == LECTURA:
+            return f"READ {nombre(destino)}"
+        if opcode == ESCRITURA:
+            return f"WRITE {nombre(arg1)}"
+        return f"# {nombre(arg1)}"
+
+    def imprimir(self):
+        """Lista con el texto de cada cuádrupla, como la muestra el IDE"""
+        return [self.texto(i) for i in range(len(self.opcodes))]
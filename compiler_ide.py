@@ -1,16 +1,24 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk, font
-from analisis_lexico import tokenize 
-from analisis_sintactico import AnalizadorSintactico, ASTNode, Token
+from analisis_lexico import tokenize_flujo, ArchivoFuente, AnalizadorLexicoIncremental
+from automata_lexico import tokenize_dfa
+from analisis_sintactico import AnalizadorSintactico, AnalizadorSintacticoIncremental, ASTNode
+from diagnosticos import lista_para_fase
 from analisis_semantico import AnalizadorSemantico
 from interprete_p import ejecutar_codigo_p
 
 class CompilerIDE:
+    # Errores tras los que se detienen el análisis léxico y el sintáctico: una entrada que no es
+    # un programa (p. ej. un archivo binario) no se recorre entera
+    PRESUPUESTO_ERRORES = 10000
+
     def __init__(self, root):
         self.root = root
         self.root.title("Compilador IDE")
         self.root.geometry("1200x700")
         self.filename = None
+        self.lexer_incremental = None  # Tokens del editor, se actualizan por edición
+        self.parser_incremental = None  # AST del análisis sintáctico, se actualiza por edición
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         
         # Configuración de colores y estilos
@@ -396,6 +404,7 @@ class CompilerIDE:
 
     def lexical_analysis(self):
         code = self.text_area.get("1.0", tk.END)
+        fuente = ArchivoFuente(code)
         self.lexical_tab.winfo_children()[0].delete("1.0", tk.END)
         self.lexical_errors.winfo_children()[0].delete("1.0", tk.END)
         
@@ -403,7 +412,7 @@ class CompilerIDE:
         self.root.update()
         
         try:
-            tokens, errors = tokenize(code)
+            tokens, errors = tokenize_dfa(fuente, lista_para_fase("lexico", detener_en=self.PRESUPUESTO_ERRORES))
 
             for token in tokens:
                 tipo, lexema, linea, columna = token
@@ -417,7 +426,11 @@ class CompilerIDE:
 
             text_widget = self.lexical_errors.winfo_children()[0]
             for error in errors:
-                text_widget.insert(tk.END, error + "\n", "error")
+                text_widget.insert(tk.END, f"{error}\n", "error")
+            if errors.omitidos:
+                text_widget.insert(tk.END, f"... y {errors.omitidos} errores más\n", "error")
+            if errors.detenida:
+                text_widget.insert(tk.END, f"Análisis detenido tras {errors.total} errores: la lista de tokens está incompleta\n", "error")
                 
             if not errors:
                 text_widget.insert(tk.END, "No se encontraron errores léxicos.\n", "success")
@@ -456,7 +469,9 @@ class CompilerIDE:
     def resaltar_sintaxis(self):
         code = self.text_area.get("1.0", tk.END)
         try:
-            tokens, _ = tokenize(code)
+            # Análisis completo: reinicia el analizador incremental del editor
+            self.lexer_incremental = AnalizadorLexicoIncremental(code)
+            tokens = self.lexer_incremental.tokens()
 
             # Limpiar etiquetas anteriores
             for tag in self.text_area.tag_names():
@@ -488,26 +503,51 @@ class CompilerIDE:
                         foreground=self.colors["syntax"]["SIMBOLO"]
                     )
 
-            # Aplicar resaltado
-            for tipo, lexema, linea, columna in tokens:
-                try:
-                    linea = int(linea)
-                    columna = int(columna)
-                except ValueError:
-                    continue
+            self.aplicar_resaltado(tokens)
+        except Exception as e:
+            print(f"Error resaltando sintaxis: {e}")
 
-                # Manejo de PUNTUACION y mapeo a SIMBOLO (para compatibilidad)
-                if tipo == "PUNTUACION":
-                    tipo = "SIMBOLO"
+    def actualizar_resaltado(self):
+        """Vuelve a resaltar sólo la zona del editor que cambió desde el último análisis"""
+        if self.lexer_incremental is None:
+            self.resaltar_sintaxis()
+            return
+        code = self.text_area.get("1.0", tk.END)
+        try:
+            cambio = self.lexer_incremental.editar_texto(code)
+            if cambio is None:
+                return
+            inicio, fin, tokens = cambio
 
-                start = f"{linea}.{columna - 1}"
-                end = f"{linea}.{columna - 1 + len(lexema)}"
+            # Quitar sólo las etiquetas de sintaxis del tramo que se volvió a analizar
+            linea_inicio, columna_inicio = self.lexer_incremental.linea_columna(inicio)
+            linea_fin, columna_fin = self.lexer_incremental.linea_columna(fin)
+            for tipo in self.colors["syntax"]:
+                self.text_area.tag_remove(tipo, f"{linea_inicio}.{columna_inicio - 1}", f"{linea_fin}.{columna_fin - 1}")
 
-                if tipo in self.colors["syntax"] or tipo == "SIMBOLO":
-                    self.text_area.tag_add(tipo, start, end)
+            self.aplicar_resaltado(tokens)
         except Exception as e:
             print(f"Error resaltando sintaxis: {e}")
 
+    def aplicar_resaltado(self, tokens):
+        """Aplica las etiquetas de color a una lista de tokens (tipo, lexema, línea, columna)"""
+        for tipo, lexema, linea, columna in tokens:
+            try:
+                linea = int(linea)
+                columna = int(columna)
+            except ValueError:
+                continue
+
+            # Manejo de PUNTUACION y mapeo a SIMBOLO (para compatibilidad)
+            if tipo == "PUNTUACION":
+                tipo = "SIMBOLO"
+
+            start = f"{linea}.{columna - 1}"
+            end = f"{linea}.{columna - 1 + len(lexema)}"
+
+            if tipo in self.colors["syntax"] or tipo == "SIMBOLO":
+                self.text_area.tag_add(tipo, start, end)
+
     def highlight_current_line(self):
         """Resalta la línea actual"""
         self.text_area.tag_remove("current_line", "1.0", tk.END)
@@ -527,18 +567,14 @@ class CompilerIDE:
         self.root.update()
 
         try:
-            # Obtener tokens del análisis léxico
+            # Entre un análisis y otro solo se vuelven a analizar las sentencias editadas
             code = self.text_area.get("1.0", tk.END)
-            tokens, _ = tokenize(code)
-
-            # Crear lista de objetos Token
-            token_objs = [
-                Token(tipo, lexema, linea, columna) for (tipo, lexema, linea, columna) in tokens
-            ]
-
-            # Ejecutar análisis sintáctico
-            parser = AnalizadorSintactico(token_objs)
-            ast = parser.parse()
+            if self.parser_incremental is None:
+                self.parser_incremental = AnalizadorSintacticoIncremental(code)
+            else:
+                self.parser_incremental.editar_texto(code)
+            ast = self.parser_incremental.ast
+            errores = self.parser_incremental.errores
             
             # Crear frame para el árbol sintáctico
             tree_frame = tk.Frame(self.syntactic_tab)
@@ -624,9 +660,11 @@ class CompilerIDE:
             ttk.Button(btn_frame, text="Contraer Todo", command=contraer_todo).pack(side=tk.LEFT, padx=5)
 
             # Mostrar errores
-            if parser.errores:
-                for error in parser.errores:
-                    self.syntax_errors.winfo_children()[0].insert(tk.END, error + "\n", "error")
+            if errores:
+                for error in errores:
+                    self.syntax_errors.winfo_children()[0].insert(tk.END, f"{error}\n", "error")
+                if errores.omitidos:
+                    self.syntax_errors.winfo_children()[0].insert(tk.END, f"... y {errores.omitidos} errores más\n", "error")
             else:
                 self.syntax_errors.winfo_children()[0].insert(tk.END, "No se encontraron errores sintácticos.\n", "success")
 
@@ -686,19 +724,21 @@ class CompilerIDE:
         try:
             # Obtener tokens del análisis léxico
             code = self.text_area.get("1.0", tk.END)
-            tokens, _ = tokenize(code)
-            
-            # Crear lista de objetos Token
-            token_objs = [
-                Token(tipo, lexema, linea, columna) for (tipo, lexema, linea, columna) in tokens
-            ]
-            
-            # Ejecutar análisis sintáctico
-            parser = AnalizadorSintactico(token_objs)
+            fuente = ArchivoFuente(code)
+            tokens, lex_errors = tokenize_flujo(fuente, lista_para_fase("lexico", detener_en=self.PRESUPUESTO_ERRORES))
+
+            # Ejecutar análisis sintáctico directamente sobre el flujo de tokens
+            parser = AnalizadorSintactico(tokens, fuente, lista_para_fase("sintactico", detener_en=self.PRESUPUESTO_ERRORES))
             ast = parser.parse()
             
+            if lex_errors.detenida or parser.errores.detenida:
+                self.semantic_errors.winfo_children()[0].insert(
+                    tk.END,
+                    "⚠️ Advertencia: El análisis se detuvo por exceso de errores. El programa se analizó solo en parte.\n\n",
+                    "warning"
+                )
             # Verificar si hay errores sintácticos
-            if parser.errores:
+            elif parser.errores:
                 self.semantic_errors.winfo_children()[0].insert(
                     tk.END, 
                     "⚠️ Advertencia: Existen errores sintácticos. El análisis semántico puede ser incompleto.\n\n",
@@ -712,7 +752,7 @@ class CompilerIDE:
             importlib.reload(_sem_mod)
             AnalizadorSemanticoLocal = _sem_mod.AnalizadorSemantico
             
-            analizador = AnalizadorSemanticoLocal(ast)
+            analizador = AnalizadorSemanticoLocal(ast, fuente=fuente)
             tabla_simbolos, errores, advertencias, codigo_intermedio, semantico_detalle, codigo_p = analizador.analizar()
             
             # Eliminar el widget anterior en la pestaña semántica
@@ -744,8 +784,8 @@ class CompilerIDE:
             
             info_text.insert(tk.END, "✓ ANÁLISIS SEMÁNTICO COMPLETADO\n", "title")
             info_text.insert(tk.END, f"📊 Símbolos: {len(tabla_simbolos.obtener_simbolos())} | ", "info")
-            info_text.insert(tk.END, f"❌ Errores: {len(errores)} | ", "error" if errores else "success")
-            info_text.insert(tk.END, f"⚠️ Advertencias: {len(advertencias)} | ", "warning" if advertencias else "success")
+            info_text.insert(tk.END, f"❌ Errores: {errores.total} | ", "error" if errores else "success")
+            info_text.insert(tk.END, f"⚠️ Advertencias: {advertencias.total} | ", "warning" if advertencias else "success")
             info_text.insert(tk.END, f"📝 Instrucciones: {len(codigo_intermedio)}\n", "info")
             
             info_text.tag_configure("title", foreground="#27ae60", font=("Consolas", 10, "bold"))
@@ -810,7 +850,7 @@ class CompilerIDE:
                 # Obtener valor - priorizar valor_calculado si existe
                 valor_mostrar = ""
                 
-                if hasattr(nodo, 'valor_calculado'):
+                if getattr(nodo, 'valor_calculado', None) is not None:
                     valor_calc = nodo.valor_calculado
                     if isinstance(valor_calc, bool):
                         valor_calc_str = str(valor_calc).lower()
@@ -934,7 +974,20 @@ class CompilerIDE:
                     text_tabla.insert(tk.END, fila)
             else:
                 text_tabla.insert(tk.END, "No se encontraron símbolos en el programa.\n", "info")
-            
+
+            # Referencias de las líneas que se ven en el editor, ordenadas por posición
+            desde = int(self.text_area.index("@0,0").split(".")[0])
+            hasta = int(self.text_area.index(f"@0,{self.text_area.winfo_height()}").split(".")[0])
+            referencias = tabla_simbolos.referencias_en_lineas(desde, hasta)
+            text_tabla.insert(tk.END, f"\nREFERENCIAS EN LAS LÍNEAS {desde}-{hasta} DEL EDITOR\n", "header")
+            if referencias:
+                text_tabla.insert(tk.END, f"{'Línea:Columna':<15} {'Identificador':<20} {'Ámbito':<12}\n", "table_header")
+                for simbolo, linea, columna in referencias:
+                    posicion = f"{linea}:{columna}" if columna is not None else str(linea)
+                    text_tabla.insert(tk.END, f"{posicion:<15} {simbolo.nombre:<20} {str(simbolo.ambito):<12}\n")
+            else:
+                text_tabla.insert(tk.END, "No hay referencias a variables en estas líneas.\n", "info")
+
             # Configurar estilos para tabla de símbolos
             text_tabla.tag_configure("header", foreground="#2c3e50", font=("Consolas", 11, "bold"))
             text_tabla.tag_configure("table_header", foreground="#3498db", font=("Consolas", 10, "bold"))
@@ -947,9 +1000,9 @@ class CompilerIDE:
             if codigo_p:
                 # Obtener mapeo de direcciones a nombres de variables
                 mapeo_dir_var = {}
-                if hasattr(analizador.generador, 'variables'):
-                    # Invertir el diccionario: de {var: dir} a {dir: var}
-                    mapeo_dir_var = {str(dir): var for var, dir in analizador.generador.variables.items()}
+                if hasattr(analizador.generador, 'ocupantes'):
+                    # Una dirección liberada por una variable local puede reutilizarla otra
+                    mapeo_dir_var = {str(dir): "/".join(vars) for dir, vars in analizador.generador.ocupantes.items()}
                 
                 # Diccionario de descripciones para cada nemónico
                 descripciones = {
@@ -961,6 +1014,7 @@ class CompilerIDE:
                     'mpi': 'multiplicación',
                     'dvi': 'división',
                     'mod': 'módulo (residuo) de dos valores en pila',
+                    'pot': 'potencia',
                     'leq': 'comparación menor o igual que',
                     'geq': 'comparación mayor o igual que',
                     'les': 'comparación menor que',
@@ -1063,6 +1117,8 @@ class CompilerIDE:
                 text_errores.insert(tk.END, "=" * 80 + "\n\n", "separator")
                 for i, error in enumerate(errores, 1):
                     text_errores.insert(tk.END, f"❌ {i}. {error}\n\n", "error")
+                if errores.omitidos:
+                    text_errores.insert(tk.END, f"... y {errores.omitidos} errores más\n\n", "error")
             else:
                 text_errores.insert(tk.END, "✓ No se encontraron errores semánticos.\n", "success")
             
@@ -1134,19 +1190,23 @@ class CompilerIDE:
             compile_window.update()
             
             code = self.text_area.get("1.0", tk.END)
-            tokens, lex_errors = tokenize(code)
+            fuente = ArchivoFuente(code)
+            # Solo se muestran los primeros 5 diagnósticos de cada fase; el resto solo se cuenta
+            tokens, lex_errors = tokenize_flujo(fuente, lista_para_fase("lexico", maximo=5, detener_en=self.PRESUPUESTO_ERRORES))
             
-            actualizar_estado("Análisis Léxico", len(lex_errors) == 0)
+            actualizar_estado("Análisis Léxico", not lex_errors)
             text_result.insert(tk.END, "\nFASE 1: ANÁLISIS LÉXICO\n\n", "header")
             text_result.insert(tk.END, f"Tokens encontrados: {len(tokens)}\n", "info")
-            text_result.insert(tk.END, f"Errores léxicos: {len(lex_errors)}\n\n", 
+            text_result.insert(tk.END, f"Errores léxicos: {lex_errors.total}\n\n", 
                              "error" if lex_errors else "success")
             
             if lex_errors:
-                for error in lex_errors[:5]:  # Mostrar solo los primeros 5
+                for error in lex_errors:
                     text_result.insert(tk.END, f"  {error}\n", "error")
-                if len(lex_errors) > 5:
-                    text_result.insert(tk.END, f"  ... y {len(lex_errors) - 5} errores más\n", "error")
+                if lex_errors.omitidos:
+                    text_result.insert(tk.END, f"  ... y {lex_errors.omitidos} errores más\n", "error")
+                if lex_errors.detenida:
+                    text_result.insert(tk.END, "  (el análisis léxico se detuvo antes del final del programa)\n", "error")
                 text_result.insert(tk.END, "\nCompilación detenida por errores léxicos.\n", "warning")
                 progress.stop()
                 return
@@ -1155,20 +1215,21 @@ class CompilerIDE:
             status_label.config(text="Fase 2: Análisis Sintáctico...")
             compile_window.update()
             
-            token_objs = [Token(tipo, lexema, linea, columna) for (tipo, lexema, linea, columna) in tokens]
-            parser = AnalizadorSintactico(token_objs)
+            parser = AnalizadorSintactico(tokens, fuente, lista_para_fase("sintactico", maximo=5, detener_en=self.PRESUPUESTO_ERRORES))
             ast = parser.parse()
             
-            actualizar_estado("Análisis Sintáctico", len(parser.errores) == 0)
+            actualizar_estado("Análisis Sintáctico", not parser.errores)
             text_result.insert(tk.END, "\nFASE 2: ANÁLISIS SINTÁCTICO\n\n", "header")
-            text_result.insert(tk.END, f"Errores sintácticos: {len(parser.errores)}\n\n", 
+            text_result.insert(tk.END, f"Errores sintácticos: {parser.errores.total}\n\n", 
                              "error" if parser.errores else "success")
             
             if parser.errores:
-                for error in parser.errores[:5]:
+                for error in parser.errores:
                     text_result.insert(tk.END, f"  {error}\n", "error")
-                if len(parser.errores) > 5:
-                    text_result.insert(tk.END, f"  ... y {len(parser.errores) - 5} errores más\n", "error")
+                if parser.errores.omitidos:
+                    text_result.insert(tk.END, f"  ... y {parser.errores.omitidos} errores más\n", "error")
+                if parser.errores.detenida:
+                    text_result.insert(tk.END, "  (el análisis sintáctico se detuvo antes del final del programa)\n", "error")
                 text_result.insert(tk.END, "\nCompilación detenida por errores sintácticos.\n", "warning")
                 progress.stop()
                 return
@@ -1183,22 +1244,22 @@ class CompilerIDE:
             importlib.reload(_sem_mod)
             AnalizadorSemanticoLocal = _sem_mod.AnalizadorSemantico
             
-            analizador = AnalizadorSemanticoLocal(ast)
+            analizador = AnalizadorSemanticoLocal(ast, lista_para_fase("semantico", maximo=5), fuente=fuente)
             tabla_simbolos, sem_errors, advertencias, codigo_intermedio, semantico_detalle, codigo_p = analizador.analizar()
             
-            actualizar_estado("Análisis Semántico", len(sem_errors) == 0)
+            actualizar_estado("Análisis Semántico", not sem_errors)
             text_result.insert(tk.END, "\nFASE 3: ANÁLISIS SEMÁNTICO\n\n", "header")
             text_result.insert(tk.END, f"Símbolos declarados: {len(tabla_simbolos.obtener_simbolos())}\n", "info")
-            text_result.insert(tk.END, f"Errores semánticos: {len(sem_errors)}\n", 
+            text_result.insert(tk.END, f"Errores semánticos: {sem_errors.total}\n", 
                              "error" if sem_errors else "success")
-            text_result.insert(tk.END, f"Advertencias: {len(advertencias)}\n\n", 
+            text_result.insert(tk.END, f"Advertencias: {advertencias.total}\n\n", 
                              "warning" if advertencias else "success")
             
             if sem_errors:
-                for error in sem_errors[:5]:
+                for error in sem_errors:
                     text_result.insert(tk.END, f"  {error}\n", "error")
-                if len(sem_errors) > 5:
-                    text_result.insert(tk.END, f"  ... y {len(sem_errors) - 5} errores más\n", "error")
+                if sem_errors.omitidos:
+                    text_result.insert(tk.END, f"  ... y {sem_errors.omitidos} errores más\n", "error")
                 text_result.insert(tk.END, "\nCompilación completada con errores.\n", "warning")
             else:
                 text_result.insert(tk.END, "\nCOMPILACIÓN EXITOSA\n\n", "success_big")
@@ -1206,7 +1267,7 @@ class CompilerIDE:
                 text_result.insert(tk.END, f"Variables en tabla de símbolos: {len(tabla_simbolos.obtener_simbolos())}\n", "info")
                 
                 if advertencias:
-                    text_result.insert(tk.END, f"\nSe generaron {len(advertencias)} advertencias (ver pestaña de errores semánticos)\n", "warning")
+                    text_result.insert(tk.END, f"\nSe generaron {advertencias.total} advertencias (ver pestaña de errores semánticos)\n", "warning")
             
             # Configurar estilos
             text_result.tag_configure("header", foreground="#2c3e50", font=("Consolas", 11, "bold"))
@@ -1246,16 +1307,15 @@ class CompilerIDE:
         # Primero hacer análisis semántico para generar código P
         try:
             code = self.text_area.get("1.0", tk.END)
-            tokens, lex_errors = tokenize(code)
+            fuente = ArchivoFuente(code)
+            # Solo importa si hay errores: cada fase se detiene en el primero
+            tokens, lex_errors = tokenize_flujo(fuente, lista_para_fase("lexico", detener_en=1))
             
             if lex_errors:
                 messagebox.showerror("Error", "Hay errores léxicos. Corrígelos primero.")
                 return
             
-            # Convertir tuplas a objetos Token
-            token_objs = [Token(tipo, lexema, linea, columna) for (tipo, lexema, linea, columna) in tokens]
-            
-            analizador = AnalizadorSintactico(token_objs)
+            analizador = AnalizadorSintactico(tokens, fuente, lista_para_fase("sintactico", detener_en=1))
             ast = analizador.parse()
             
             if analizador.errores:
@@ -1267,7 +1327,7 @@ class CompilerIDE:
             importlib.reload(analisis_semantico)
             from analisis_semantico import AnalizadorSemantico
             
-            analizador_sem = AnalizadorSemantico(ast)
+            analizador_sem = AnalizadorSemantico(ast, fuente=fuente)
             
             try:
                 resultado = analizador_sem.analizar()
@@ -1280,7 +1340,7 @@ class CompilerIDE:
                     return
                 
                 if errores:
-                    msg = "Errores semánticos:\n" + "\n".join(errores[:5])
+                    msg = "Errores semánticos:\n" + "\n".join(errores.mensajes(5))
                     messagebox.showerror("Error", msg)
                     return
                 
@@ -1425,7 +1485,7 @@ class CompilerIDE:
         self.update_line_numbers(event)
         self.update_line_col(event)
         self.sync_scroll(event)
-        self.resaltar_sintaxis()
+        self.actualizar_resaltado()
         self.highlight_current_line()
 
     def sync_scroll(self, event=None):
@@ -0,0 +1,154 @@
+# Diagnósticos estructurados compartidos por todas las fases del compilador.
+# Cada fase guarda un registro (código, severidad, desplazamiento, argumentos) y el mensaje se
+# arma solo cuando se muestra; las listas de diagnósticos tienen un tope configurable por fase y
+# un modo de detención temprana que corta la fase después de cierta cantidad de errores.
+
+ERROR = "error"
+ADVERTENCIA = "advertencia"
+
+# Plantillas de mensajes por código ({0}, {1}, ... son los argumentos del diagnóstico)
+MENSAJES = {
+    # Análisis léxico: los dos primeros argumentos son línea y columna
+    "LEX001": "Línea {0}, Columna {1}: carácter no reconocido.",
+    "LEX002": "Línea {0}, Columna {1}: error en '{2}', se esperaba un dígito después del punto",
+    "LEX003": "Línea {0}, Columna {1}: error en '{2}', después de un número real no se esperaba '{2}'",
+    "LEX004": "Línea {0}, Columna {1}: carácter inválido '.' después de número real",
+    "LEX005": "Línea {0}, Columna {1}: carácter inválido '{2}'",
+
+    # Análisis sintáctico
+    "SIN001": "Error sintáctico en L{0} C{1}: se esperaba '{2}', pero se obtuvo '{3}'",
+    "SIN002": "Error sintáctico en L{0} C{1}: se esperaba '{2}', pero se llegó al final del archivo",
+    "SIN003": "Error sintáctico: se esperaba '{0}', pero se llegó al final del archivo",
+    "SIN004": "Error sintáctico en L{0} C{1}: token inesperado '{2}'",
+    "SIN005": "Error procesando sentencia en L{0} C{1}: {2}",
+    "SIN006": "Error en L{0} C{1}: Se esperaba '=' después del identificador '{2}'",
+    "SIN007": "Error: Expresión no válida en asignación de '{0}'",
+    "SIN008": "Error: Falta ';' al final de la sentencia",
+    "SIN009": "Error: Falta expresión después de operador '{0}'",
+    "SIN010": "Error: Valor no válido en cout después de '<<'",
+    "SIN011": "Error: Se esperaba '>>' después de 'cin'",
+    "SIN012": "Error: Se esperaba un identificador después de 'cin >>'",
+    "SIN013": "Error: Se esperaba '(' después de '{0}'",
+    "SIN014": "Error: Condición no válida en '{0}'",
+    "SIN015": "Error: Se esperaba ')' después de la condición del '{0}'",
+    "SIN016": "Error: Se esperaba '{{' después de la condición del 'if'",
+    "SIN017": "Error: Se esperaba un bloque '{{...}}' después del '{0}'",
+    "SIN018": "Error: Se esperaba '{{' después de 'else'",
+    "SIN019": "Error: Se esperaba un bloque '{{...}}' después de 'do'",
+    "SIN020": "Error: Se esperaba 'while' después del bloque 'do'",
+    "SIN021": "Error: Se esperaba ';' al final de 'do-while'",
+    "SIN022": "Error: Se esperaba un identificador después de '{0}'",
+    "SIN023": "Error: Falta ';' al final de la declaración de variable",
+    "SIN024": "Error: Operador '{0}' sin operando derecho",
+    "SIN025": "Error: Se esperaba el exponente después de '^'",
+    "SIN026": "Error: Falta operando después de '-' unario",
+    "SIN027": "Error: Falta ')' después de la expresión",
+    "SIN028": "Error: Falta operando después de '!'",
+    "SIN029": "Error: Falta '}}' al final del bloque",
+
+    # Análisis semántico
+    "SEM001": "Error semántico en L{0} C{1}: Variable '{2}' ya declarada en L{3} C{4}",
+    "SEM002": "Error semántico en L{0} C{1}: Variable '{2}' no declarada",
+    "SEM003": "Error semántico en L{0} C{1}: Incompatibilidad de tipos: no se puede asignar '{2}' a '{3}'",
+    "SEM004": "Error semántico: Operación '{0}' con tipos incompatibles '{1}' y '{2}'",
+    "SEM005": "Error semántico: Operador unario '-' requiere tipo numérico, se recibió '{0}'",
+    "SEM006": "Error semántico en L{0} C{1}: Operador unario solo aplica a tipos numéricos, no a '{2}'",
+    "SEM007": "Error semántico: Operador '!' requiere tipo 'bool', se recibió '{0}'",
+    "SEM008": "Error crítico en análisis semántico: {0}",
+    "SEM101": "Advertencia en L{0} C{1}: Variable '{2}' declarada pero no usada",
+    "SEM102": "Advertencia en L{0} C{1}: Variable '{2}' puede no estar inicializada",
+    "SEM103": "Advertencia: La condición del '{0}' debería ser de tipo 'bool', se recibió '{1}'",
+}
+
+class Diagnostico:
+    """Error o advertencia de una fase. 'offset' es el desplazamiento en el texto fuente cuando
+    la fase lo conoce (None si no); el mensaje se arma con str()."""
+    __slots__ = ("codigo", "severidad", "offset", "args")
+
+    def __init__(self, codigo, severidad, offset, args):
+        self.codigo = codigo
+        self.severidad = severidad
+        self.offset = offset
+        self.args = args
+
+    def mensaje(self):
+        return MENSAJES[self.codigo].format(*self.args)
+
+    __str__ = mensaje
+
+    def __repr__(self):
+        return f"Diagnostico({self.codigo!r}, {self.severidad!r}, {self.offset!r}, {self.args!r})"
+
+    def __eq__(self, otro):
+        if not isinstance(otro, Diagnostico):
+            return NotImplemented
+        return (self.codigo, self.severidad, self.offset, self.args) == (otro.codigo, otro.severidad, otro.offset, otro.args)
+
+    def __hash__(self):
+        return hash((self.codigo, self.offset, self.args))
+
+class FaseDetenida(Exception):
+    """Se lanza al llegar al límite de errores en modo de detención temprana"""
+    def __init__(self, diagnosticos):
+        super().__init__(f"se alcanzó el límite de {diagnosticos.detener_en} errores")
+        self.diagnosticos = diagnosticos
+
+class ListaDiagnosticos(list):
+    """Lista de diagnósticos de una fase.
+
+    Conserva como máximo 'maximo' diagnósticos (los demás solo se cuentan en 'total') y, si
+    'detener_en' no es None, lanza FaseDetenida al registrar esa cantidad. Es verdadera si se
+    registró algún diagnóstico, aunque no se haya conservado.
+    """
+    def __init__(self, maximo=None, detener_en=None):
+        super().__init__()
+        self.maximo = maximo
+        self.detener_en = detener_en
+        self.total = 0
+
+    def append(self, diagnostico):
+        self.total += 1
+        if self.maximo is None or len(self) < self.maximo:
+            super().append(diagnostico)
+        if self.detener_en is not None and self.total >= self.detener_en:
+            raise FaseDetenida(self)
+
+    def extend(self, diagnosticos):
+        for diagnostico in diagnosticos:
+            self.append(diagnostico)
+
+    def __iadd__(self, diagnosticos):
+        self.extend(diagnosticos)
+        return self
+
+    def __bool__(self):
+        return self.total > 0
+
+    @property
+    def omitidos(self):
+        return self.total - len(self)
+
+    @property
+    def detenida(self):
+        """Si la fase se detuvo al llegar a 'detener_en': sus tokens o su AST están incompletos"""
+        return self.detener_en is not None and self.total >= self.detener_en
+
+    def mensajes(self, cuantos=None):
+        """Mensajes de los primeros 'cuantos' diagnósticos conservados (todos si es None)"""
+        return [str(diagnostico) for diagnostico in self[:cuantos]]
+
+# Límites por fase. 'maximo': diagnósticos que se conservan (los demás solo se cuentan);
+# 'detener_en': con un número, la fase se detiene al registrar esa cantidad (None = no se detiene).
+# Por omisión ninguna fase se detiene; quien quiera un presupuesto de errores (el IDE, para no
+# recorrer entera una entrada que no es un programa) lo pasa con lista_para_fase y consulta
+# 'detenida' en la lista para saber si el resultado quedó incompleto.
+LIMITES = {
+    "lexico": {"maximo": 1000, "detener_en": None},
+    "sintactico": {"maximo": 1000, "detener_en": None},
+    "semantico": {"maximo": 1000, "detener_en": None},
+}
+
+def lista_para_fase(fase, **cambios):
+    """ListaDiagnosticos con los límites configurados para 'fase' ('lexico', 'sintactico' o
+    'semantico'); 'cambios' reemplaza alguno de ellos, p. ej. detener_en=1"""
+    return ListaDiagnosticos(**{**LIMITES[fase], **cambios})
@@ -0,0 +1,587 @@
+import os
+import pickle
+import hashlib
+import re
+
+from analisis_sintactico import ASTNode, OPERADORES_INFIJOS
+from diagnosticos import Diagnostico, ERROR, FaseDetenida, lista_para_fase
+
+# Analizador sintáctico LL(1) generado a partir de una gramática declarativa. La gramática se
+# escribe en GRAMATICA; construir_tablas calcula los conjuntos FIRST y FOLLOW y la tabla LL(1)
+# indexada por clase de token (un entero pequeño), y las tablas se guardan en disco mientras la
+# gramática no cambie, igual que las del autómata léxico. AnalizadorLL1 recorre la tabla con una
+# pila explícita y arma el mismo ASTNode que AnalizadorSintactico para los programas correctos.
+
+# Notación: 'x' es un terminal que se reconoce por su lexema, MAYUSCULAS un terminal que se
+# reconoce por el tipo de token, minúsculas un no terminal y {accion} una acción de ACCIONES.
+# Cada terminal reconocido se apila en la pila de valores; una acción toma los últimos valores
+# (tantos como su aridad) y deja su resultado. ε es la alternativa vacía.
+GRAMATICA = r"""
+programa            : 'main' '{' {lista} lista_declaracion '}' {programa}
+lista_declaracion   : declaracion {agregar} lista_declaracion
+                    | ε
+declaracion         : declaracion_variable
+                    | sentencia
+declaracion_variable: tipo IDENTIFICADOR {identificadores} mas_identificadores ';' {declaracion}
+tipo                : 'int' | 'float' | 'bool'
+mas_identificadores : ',' IDENTIFICADOR {agregar_id} mas_identificadores
+                    | ε
+
+sentencia           : IDENTIFICADOR resto_identificador
+                    | sent_out | sent_in | seleccion | iteracion | repeticion
+# x = e;  x++;  o una expresión suelta que empieza con x (el ';' es opcional salvo en la asignación)
+resto_identificador : '=' expresion ';' {asignacion}
+                    | incremento punto_coma {unario}
+                    | {hoja} cola_sentencia punto_coma {expresion_sentencia}
+incremento          : '++' | '--'
+punto_coma          : ';' | {nada}
+sent_out            : 'cout' {sent_out} salidas punto_coma {fin_sentencia}
+salidas             : '<<' valor_salida {salida} salidas
+                    | ε
+valor_salida        : CADENA | IDENTIFICADOR | NUMERO_ENTERO | NUMERO_REAL
+sent_in             : 'cin' '>>' IDENTIFICADOR punto_coma {sent_in}
+seleccion           : 'if' '(' expresion ')' bloque sino {seleccion}
+sino                : 'else' bloque {sino}
+                    | {nada}
+iteracion           : 'while' '(' expresion ')' cuerpo {iteracion}
+repeticion          : 'do' cuerpo 'while' '(' expresion ')' ';' {repeticion}
+# El bloque de if/else no puede estar vacío; el cuerpo de while y do puede ser una sola sentencia.
+# Un bloque con llaves puede declarar variables, locales a él
+bloque              : '{' {bloque} declaracion {agregar} lista_declaracion '}' {fin_bloque}
+cuerpo              : '{' {bloque} lista_declaracion '}' {fin_bloque}
+                    | sentencia {bloque_unico}
+
+# Un nivel por precedencia, de menor a mayor (ver OPERADORES_INFIJOS); las colas arman los nodos
+# binarios de izquierda a derecha sobre el operando que ya está en la pila de valores
+expresion           : relacional cola_logica
+cola_logica         : operador_logico relacional {binario} cola_logica
+                    | ε
+relacional          : simple cola_relacional
+cola_relacional     : operador_relacional simple {binario} cola_relacional
+                    | ε
+simple              : termino cola_simple
+cola_simple         : operador_suma termino {binario} cola_simple
+                    | incremento {postfijo} cola_simple
+                    | ε
+termino             : factor cola_termino
+cola_termino        : operador_mult factor {binario} cola_termino
+                    | ε
+factor              : componente cola_factor
+cola_factor         : '^' componente {binario} cola_factor
+                    | ε
+componente          : '-' componente {negativo}
+                    | '(' expresion ')' {parentesis}
+                    | NUMERO_ENTERO {hoja} | NUMERO_REAL {hoja} | IDENTIFICADOR {hoja} | CADENA {hoja}
+                    | 'true' {booleano} | 'false' {booleano}
+                    | '!' componente {negacion}
+operador_logico     : '&&' | '||' | '!' | '&'
+operador_relacional : '<<' | '>>' | '<=' | '>=' | '==' | '!=' | '<' | '>'
+operador_suma       : '+' | '-'
+operador_mult       : '*' | '/' | '%'
+# Resto de una expresión suelta después de su primer identificador; no empieza con ++ ni --,
+# que después de un identificador forman la sentencia 'x++'
+cola_sentencia      : '^' componente {binario} cola_factor cola_termino cola_simple cola_relacional cola_logica
+                    | operador_mult factor {binario} cola_termino cola_simple cola_relacional cola_logica
+                    | operador_suma termino {binario} cola_simple cola_relacional cola_logica
+                    | operador_relacional simple {binario} cola_relacional cola_logica
+                    | operador_logico relacional {binario} cola_logica
+                    | ε
+"""
+
+# Se incrementa cuando cambia el formato de las tablas o la forma de construirlas
+VERSION_TABLAS = 2
+
+ARCHIVO_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__pycache__", "gramatica.pickle")
+
+# Terminales que se reconocen por el tipo de token; los demás tokens se clasifican por su lexema
+TIPOS_TERMINALES = ("IDENTIFICADOR", "NUMERO_ENTERO", "NUMERO_REAL", "CADENA")
+
+# ---------------------------------------------------------------------------------------------
+# Acciones: reciben los valores de la producción (None si faltaba el símbolo) y arman el AST
+
+def _nodo(tipo, token):
+    return None if token is None else ASTNode(tipo, token.lexema, token.linea, token.columna)
+
+def _con_hijos(nodo, *hijos):
+    for hijo in hijos:
+        if hijo is not None:
+            nodo.agregar_hijo(hijo)
+    return nodo
+
+def _binario(izquierdo, operador, derecho):
+    if derecho is None or izquierdo is None:
+        return izquierdo if derecho is None else derecho
+    return _con_hijos(ASTNode(OPERADORES_INFIJOS[(operador.tipo, operador.lexema)][1], operador.lexema),
+                      izquierdo, derecho)
+
+def _prefijo(tipo, operador, operando):
+    if operando is None or operador is None:
+        return None
+    return _con_hijos(ASTNode(tipo, operador.lexema, operador.linea, operador.columna), operando)
+
+def _incremento(operador):
+    return +1 if operador.lexema == "++" else -1
+
+def _unario(identificador, operador, punto_coma):
+    nodo = _con_hijos(ASTNode("unario"), _nodo("id", identificador))
+    if operador is not None:
+        nodo.agregar_hijo(ASTNode("op", _incremento(operador), operador.linea, operador.columna))
+    return nodo
+
+def _seleccion(si, abre, condicion, cierra, bloque, sino):
+    nodo = _con_hijos(ASTNode("seleccion"), _nodo("RESERVADA", si), condicion, bloque)
+    return _con_hijos(nodo, *sino) if sino else nodo
+
+def _bloque_unico(sentencia):
+    return None if sentencia is None else _con_hijos(ASTNode("bloque"), sentencia)
+
+# nombre -> (aridad, función)
+ACCIONES = {
+    "nada": (0, lambda: None),
+    "lista": (0, lambda: ASTNode("lista_declaracion")),
+    "agregar": (2, _con_hijos),
+    "programa": (4, lambda main, abre, lista, cierra: _con_hijos(ASTNode("programa"), lista)),
+    "identificadores": (1, lambda identificador: _con_hijos(ASTNode("identificadores"), _nodo("id", identificador))),
+    "agregar_id": (3, lambda nodo, coma, identificador: _con_hijos(nodo, _nodo("id", identificador))),
+    "declaracion": (3, lambda tipo, nodo, punto_coma: _con_hijos(ASTNode("declaracion_variable"), _nodo("tipo", tipo), nodo)),
+    "asignacion": (4, lambda identificador, igual, expresion, punto_coma:
+                   _con_hijos(ASTNode("asignacion"), _nodo("id", identificador), expresion)),
+    "unario": (3, _unario),
+    "expresion_sentencia": (2, lambda expresion, punto_coma: _con_hijos(ASTNode("expresion_sentencia"), expresion)),
+    "sent_out": (1, lambda cout: _con_hijos(ASTNode("sent_out"), _nodo("RESERVADA", cout))),
+    "salida": (3, lambda nodo, operador, valor: _con_hijos(nodo, _nodo("id", valor))),
+    "fin_sentencia": (2, lambda nodo, punto_coma: nodo),
+    "sent_in": (4, lambda cin, operador, identificador, punto_coma:
+                _con_hijos(ASTNode("sent_in"), _nodo("RESERVADA", cin), _nodo("id", identificador))),
+    "seleccion": (6, _seleccion),
+    "sino": (2, lambda sino, bloque: (_nodo("RESERVADA", sino), bloque)),
+    "iteracion": (5, lambda mientras, abre, condicion, cierra, cuerpo: _con_hijos(ASTNode("while"), condicion, cuerpo)),
+    "repeticion": (7, lambda hacer, cuerpo, mientras, abre, condicion, cierra, punto_coma:
+                   _con_hijos(ASTNode("do_while"), cuerpo, condicion)),
+    "bloque": (1, lambda abre: ASTNode("bloque")),
+    "fin_bloque": (2, lambda nodo, cierra: nodo),
+    "bloque_unico": (1, _bloque_unico),
+    "binario": (3, _binario),
+    "postfijo": (2, lambda operando, operador: None if operando is None else
+                 _con_hijos(ASTNode("unario_op", _incremento(operador)), operando)),
+    "negativo": (2, lambda signo, operando: _prefijo("unario_op", signo, operando)),
+    "negacion": (2, lambda signo, operando: _prefijo("op_logico", signo, operando)),
+    "parentesis": (3, lambda abre, expresion, cierra: expresion),
+    "hoja": (1, lambda token: None if token is None else _nodo(token.tipo, token)),
+    "booleano": (1, lambda token: _nodo("bool", token)),
+}
+
+# ---------------------------------------------------------------------------------------------
+# Generación de las tablas
+
+_SIMBOLO_GRAMATICA = re.compile(r"'[^']+'|\{\w+\}|[\wε]+|[:|]|\S")
+
+def leer_gramatica(texto=GRAMATICA):
+    """Reglas de la especificación en orden: lista de (cabeza, alternativas), donde cada
+    alternativa es una lista de símbolos tal como están escritos ('x', TIPO, nombre, {accion})"""
+    reglas = []
+    for numero, linea in enumerate(texto.splitlines(), 1):
+        simbolos = _SIMBOLO_GRAMATICA.findall(linea.split("#", 1)[0])
+        if not simbolos:
+            continue
+        if simbolos[0] == "|":
+            if not reglas:
+                raise ValueError(f"línea {numero} de la gramática: alternativa sin regla")
+        elif len(simbolos) > 1 and simbolos[1] == ":":
+            reglas.append((simbolos[0], [[]]))
+            simbolos = simbolos[2:]
+        else:
+            raise ValueError(f"línea {numero} de la gramática: se esperaba 'nombre :' o '|'")
+        alternativas = reglas[-1][1]
+        for simbolo in simbolos:
+            if simbolo == "|":
+                alternativas.append([])
+            elif simbolo != "ε":
+                alternativas[-1].append(simbolo)
+    return reglas
+
+def firma_gramatica(texto, aridades):
+    contenido = repr((VERSION_TABLAS, texto, sorted(aridades.items()), TIPOS_TERMINALES))
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+def construir_tablas(texto=GRAMATICA, aridades=None):
+    """Calcula FIRST, FOLLOW y la tabla LL(1) de la gramática.
+
+    Los símbolos se codifican como enteros: las clases de token (terminales) van de 0 a K - 1,
+    los no terminales de K a K + N - 1 y las acciones desde K + N. Las dos últimas clases son
+    el fin del texto y la de cualquier token que la gramática no usa. Lanza ValueError si la
+    gramática no es LL(1) o si el efecto de un no terminal sobre la pila de valores depende de
+    la alternativa elegida.
+    """
+    aridades = {nombre: aridad for nombre, (aridad, _) in ACCIONES.items()} if aridades is None else aridades
+    reglas = leer_gramatica(texto)
+    no_terminales = [cabeza for cabeza, _ in reglas]
+    if len(set(no_terminales)) != len(no_terminales):
+        raise ValueError("la gramática define dos veces el mismo no terminal")
+
+    terminales, acciones = [], []
+    for _, alternativas in reglas:
+        for alternativa in alternativas:
+            for simbolo in alternativa:
+                if simbolo.startswith("{"):
+                    if simbolo[1:-1] not in aridades:
+                        raise ValueError(f"acción desconocida: {simbolo}")
+                    if simbolo[1:-1] not in acciones:
+                        acciones.append(simbolo[1:-1])
+                elif simbolo.startswith("'") or simbolo.isupper():
+                    if simbolo not in terminales:
+                        terminales.append(simbolo)
+                elif simbolo not in no_terminales:
+                    raise ValueError(f"no terminal sin reglas: {simbolo}")
+    for tipo in (t for t in terminales if not t.startswith("'")):
+        if tipo not in TIPOS_TERMINALES:
+            raise ValueError(f"tipo de token que no es terminal: {tipo}")
+    fin, otro = len(terminales), len(terminales) + 1
+    K, N = len(terminales) + 2, len(no_terminales)
+
+    def codigo(simbolo):
+        if simbolo.startswith("{"):
+            return K + N + acciones.index(simbolo[1:-1])
+        if simbolo.startswith("'") or simbolo.isupper():
+            return terminales.index(simbolo)
+        return K + no_terminales.index(simbolo)
+
+    producciones = [(j, tuple(codigo(s) for s in alternativa))
+                    for j, (_, alternativas) in enumerate(reglas) for alternativa in alternativas]
+
+    # FIRST y anulables: punto fijo; las acciones no derivan nada
+    anulables = [False] * N
+    primeros = [set() for _ in range(N)]
+
+    def primeros_de(simbolos):
+        """FIRST de una secuencia y si es anulable"""
+        resultado = set()
+        for s in simbolos:
+            if s < K:
+                resultado.add(s)
+                return resultado, False
+            if s < K + N:
+                resultado |= primeros[s - K]
+                if not anulables[s - K]:
+                    return resultado, False
+        return resultado, True
+
+    cambio = True
+    while cambio:
+        cambio = False
+        for j, derecha in producciones:
+            conjunto, anulable = primeros_de(derecha)
+            if not conjunto <= primeros[j] or (anulable and not anulables[j]):
+                primeros[j] |= conjunto
+                anulables[j] = anulables[j] or anulable
+                cambio = True
+
+    # FOLLOW: lo que puede seguir a cada no terminal; el programa termina con el fin del texto
+    siguientes = [set() for _ in range(N)]
+    siguientes[0].add(fin)
+    cambio = True
+    while cambio:
+        cambio = False
+        for j, derecha in producciones:
+            for posicion, s in enumerate(derecha):
+                if not K <= s < K + N:
+                    continue
+                conjunto, anulable = primeros_de(derecha[posicion + 1:])
+                if anulable:
+                    conjunto |= siguientes[j]
+                if not conjunto <= siguientes[s - K]:
+                    siguientes[s - K] |= conjunto
+                    cambio = True
+
+    # Tabla LL(1): fila del no terminal, columna de la clase de token -> producción (-1: error)
+    tabla = [-1] * (N * K)
+    for p, (j, derecha) in enumerate(producciones):
+        conjunto, anulable = primeros_de(derecha)
+        if anulable:
+            conjunto |= siguientes[j]
+        for clase in conjunto:
+            anterior = tabla[j * K + clase]
+            if anterior >= 0 and anterior != p:
+                nombre = terminales[clase] if clase < fin else "fin del texto"
+                raise ValueError(f"la gramática no es LL(1): '{no_terminales[j]}' tiene dos "
+                                 f"alternativas para {nombre}")
+            tabla[j * K + clase] = p
+
+    # Efecto de cada no terminal sobre la pila de valores: cada terminal agrega un valor y cada
+    # acción quita su aridad y agrega uno
+    efectos = [None] * N
+    cambio = True
+    while cambio:
+        cambio = False
+        for j, derecha in producciones:
+            if efectos[j] is not None:
+                continue
+            efecto = 0
+            for s in derecha:
+                if s < K:
+                    efecto += 1
+                elif s < K + N:
+                    if efectos[s - K] is None:
+                        break
+                    efecto += efectos[s - K]
+                else:
+                    efecto += 1 - aridades[acciones[s - K - N]]
+            else:
+                efectos[j] = efecto
+                cambio = True
+    for j, derecha in producciones:
+        efecto = sum(1 if s < K else efectos[s - K] if s < K + N else 1 - aridades[acciones[s - K - N]]
+                     for s in derecha)
+        if efecto != efectos[j] or efecto < 0:
+            raise ValueError(f"las alternativas de '{no_terminales[j]}' dejan distinta cantidad de valores")
+
+    # Valores que cada no terminal toma de los que ya estaban en la pila (los terminales que la
+    # producción de arriba apiló antes de él, como el identificador de resto_identificador): el
+    # mayor entre sus alternativas
+    consumos = [0] * N
+    cambio = True
+    while cambio:
+        cambio = False
+        for j, derecha in producciones:
+            altura = minima = 0
+            for s in derecha:
+                if s < K:
+                    altura += 1
+                elif s < K + N:
+                    minima = min(minima, altura - consumos[s - K])
+                    altura += efectos[s - K]
+                else:
+                    altura -= aridades[acciones[s - K - N]]
+                    minima = min(minima, altura)
+                    altura += 1
+            if -minima > consumos[j]:
+                consumos[j] = -minima
+                cambio = True
+
+    return {
+        "version": VERSION_TABLAS,
+        "firma": firma_gramatica(texto, aridades),
+        "terminales": terminales,
+        "literales": {t[1:-1]: k for k, t in enumerate(terminales) if t.startswith("'")},
+        "clases": {t: k for k, t in enumerate(terminales) if not t.startswith("'")},
+        "fin": fin,
+        "otro": otro,
+        "no_terminales": no_terminales,
+        "acciones": acciones,
+        "producciones": producciones,
+        "tabla": tabla,
+        "primeros": [sorted(c) for c in primeros],
+        "siguientes": [sorted(c) for c in siguientes],
+        "anulables": anulables,
+        "efectos": efectos,
+        "consumos": consumos,
+    }
+
+def cargar_tablas(texto=GRAMATICA, archivo=ARCHIVO_CACHE):
+    """Lee las tablas del archivo de caché o las construye y las guarda.
+    Si el archivo no se puede escribir las tablas se usan igual desde memoria."""
+    aridades = {nombre: aridad for nombre, (aridad, _) in ACCIONES.items()}
+    firma = firma_gramatica(texto, aridades)
+    try:
+        with open(archivo, "rb") as f:
+            tablas = pickle.load(f)
+        if tablas.get("version") == VERSION_TABLAS and tablas.get("firma") == firma:
+            return tablas
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+        pass
+    tablas = construir_tablas(texto, aridades)
+    try:
+        os.makedirs(os.path.dirname(archivo), exist_ok=True)
+        temporal = f"{archivo}.{os.getpid()}"
+        with open(temporal, "wb") as f:
+            pickle.dump(tablas, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, archivo)
+    except OSError:
+        pass
+    return tablas
+
+# ---------------------------------------------------------------------------------------------
+# Recorrido
+
+class GramaticaLL1:
+    """Tablas LL(1) listas para el recorrido"""
+    def __init__(self, tablas):
+        self.tablas = tablas
+        self.literales = tablas["literales"]
+        self.clases = tablas["clases"]
+        self.fin = tablas["fin"]
+        self.otro = tablas["otro"]
+        K = self.num_clases = tablas["otro"] + 1
+        N = len(tablas["no_terminales"])
+        self.inicial = K
+        self.nombres = [t[1:-1] if t.startswith("'") else t for t in tablas["terminales"]]
+        self.nombres += ["fin del texto", "token desconocido"] + tablas["no_terminales"]
+        # Parte derecha de cada producción invertida, lista para apilar
+        derechas = [tuple(reversed(derecha)) for _, derecha in tablas["producciones"]]
+        tabla = tablas["tabla"]
+
+        def expandida(p, clase):
+            # Con la misma clase de token, el no terminal que quede a la izquierda elegiría
+            # siempre la misma producción: se expande de una vez (derecha invertida, lista
+            # para apilar)
+            simbolos = list(tablas["producciones"][p][1])
+            while simbolos and K <= simbolos[0] < K + N and tabla[(simbolos[0] - K) * K + clase] >= 0:
+                simbolos[:1] = tablas["producciones"][tabla[(simbolos[0] - K) * K + clase]][1]
+            return tuple(reversed(simbolos))
+
+        self.filas = [[expandida(p, clase) if p >= 0 else None for clase, p in enumerate(tabla[j * K:(j + 1) * K])]
+                      for j in range(N)]
+        # Producción vacía de los no terminales anulables y la única de los que tienen una sola
+        self.vacias = [None] * N
+        self.unicas = [None] * N
+        cantidades = [0] * N
+        for p, (j, derecha) in enumerate(tablas["producciones"]):
+            cantidades[j] += 1
+            self.unicas[j] = derechas[p]
+            if tablas["anulables"][j] and self.vacias[j] is None and all(s >= K + N for s in derecha):
+                self.vacias[j] = derechas[p]
+        self.unicas = [derecha if cantidad == 1 else None for derecha, cantidad in zip(self.unicas, cantidades)]
+        self.efectos = tablas["efectos"]
+        self.consumos = tablas["consumos"]
+        # Tokens donde termina la recuperación de un error en cada no terminal
+        self.sincronizacion = [frozenset(primeros) | frozenset(siguientes) | {self.fin}
+                               for primeros, siguientes in zip(tablas["primeros"], tablas["siguientes"])]
+        self.acciones = [ACCIONES[nombre] for nombre in tablas["acciones"]]
+
+    def clase(self, token):
+        """Clase de un token (None es el fin del texto)"""
+        if token is None:
+            return self.fin
+        clase = self.clases.get(token.tipo)
+        if clase is None:
+            clase = self.literales.get(token.lexema, self.otro)
+        return clase
+
+_GRAMATICA = None
+
+def gramatica():
+    """Tablas del analizador (se cargan una sola vez por proceso)"""
+    global _GRAMATICA
+    if _GRAMATICA is None:
+        _GRAMATICA = GramaticaLL1(cargar_tablas())
+    return _GRAMATICA
+
+class AnalizadorLL1:
+    """Analizador sintáctico dirigido por la tabla LL(1) de GRAMATICA.
+
+    Recibe lo mismo que AnalizadorSintactico (lista de Token o FlujoTokens) y, para los
+    programas correctos, devuelve el mismo AST. El anidamiento no está limitado por la pila de
+    Python. Ante un error se descartan tokens hasta uno de FIRST o FOLLOW del no terminal que
+    se estaba analizando (un solo diagnóstico por tramo descartado); si falta un terminal se
+    informa y se continúa como si estuviera.
+    """
+    def __init__(self, tokens, fuente=None, errores=None):
+        self.tokens = tokens
+        self.index = 0
+        self.errores = lista_para_fase("sintactico") if errores is None else errores
+        self.fuente = fuente
+        self.gramatica = gramatica()
+
+    def registrar_error(self, codigo, *args, token=None):
+        offset = None
+        if token is not None and self.fuente is not None:
+            offset = self.fuente.offset(token.linea, token.columna)
+        self.errores.append(Diagnostico(codigo, ERROR, offset, args))
+
+    def registrar_faltante(self, esperado, token):
+        """Error de símbolo esperado que no está (mismos códigos que AnalizadorSintactico.coincidir)"""
+        if token is not None:
+            self.registrar_error("SIN001", token.linea, token.columna, esperado, token.lexema, token=token)
+        elif self.fuente is not None:
+            linea, columna = self.fuente.linea_columna(len(self.fuente.texto))
+            self.errores.append(Diagnostico("SIN002", ERROR, len(self.fuente.texto), (linea, columna, esperado)))
+        else:
+            self.registrar_error("SIN003", esperado)
+
+    def parse(self):
+        try:
+            return self._recorrer()
+        except FaseDetenida:
+            return ASTNode("programa")
+
+    def _recorrer(self):
+        g = self.gramatica
+        K = g.num_clases
+        KN = K + len(g.filas)
+        filas, acciones, clase_de = g.filas, g.acciones, g.clase
+        tokens = self.tokens
+        n = len(tokens)
+
+        i = self.index
+        token = tokens[i] if i < n else None
+        clase = clase_de(token)
+        pila = [g.inicial]
+        valores = []
+        while pila:
+            s = pila.pop()
+            if s < K:
+                if s == clase:
+                    valores.append(token)
+                    i += 1
+                    token = tokens[i] if i < n else None
+                    clase = clase_de(token)
+                else:
+                    # Falta un terminal: se informa y se sigue como si estuviera
+                    self.registrar_faltante(g.nombres[s], token)
+                    valores.append(None)
+            elif s < KN:
+                derecha = filas[s - K][clase]
+                if derecha is None:
+                    i, derecha = self._recuperar(s - K, i)
+                    token = tokens[i] if i < n else None
+                    clase = clase_de(token)
+                    if derecha is None:
+                        # Lo que el no terminal iba a tomar de la pila (p. ej. el Token de un
+                        # identificador) se descarta: a las acciones solo llegan ASTNode o None
+                        consumo = g.consumos[s - K]
+                        if consumo:
+                            del valores[-consumo:]
+                        valores.extend([None] * (consumo + g.efectos[s - K]))
+                        continue
+                pila.extend(derecha)
+            else:
+                aridad, funcion = acciones[s - KN]
+                if aridad:
+                    argumentos = valores[-aridad:]
+                    del valores[-aridad:]
+                    valores.append(funcion(*argumentos))
+                else:
+                    valores.append(funcion())
+        self.index = i
+        # Sin ningún token del programa no queda ni siquiera el nodo raíz
+        return ASTNode("programa") if valores[-1] is None else valores[-1]
+
+    def _recuperar(self, j, i):
+        """El no terminal j no tiene producción para el token i. Si tiene una sola producción se
+        usa esa; si no, se descartan tokens hasta uno de su conjunto de sincronización. Devuelve
+        el nuevo índice y la parte derecha a apilar, que es None si el no terminal se abandona."""
+        g = self.gramatica
+        tokens, n = self.tokens, len(self.tokens)
+        sincronizacion, clase_de = g.sincronizacion[j], g.clase
+        if g.unicas[j] is not None and clase_de(tokens[i] if i < n else None) not in sincronizacion:
+            # Con una sola producción no hay nada que elegir: faltará su primer terminal
+            return i, g.unicas[j]
+        inicio = i
+        while i < n and clase_de(tokens[i]) not in sincronizacion:
+            i += 1
+        if i > inicio:
+            token = tokens[inicio]
+            self.registrar_error("SIN004", token.linea, token.columna, token.lexema, token=token)
+        clase = clase_de(tokens[i] if i < n else None)
+        derecha = g.filas[j][clase]
+        if derecha is None:
+            # Un no terminal anulable se da por vacío; si no, se informa qué faltaba
+            derecha = g.vacias[j]
+            if derecha is None and i == inicio:
+                self.registrar_faltante(g.nombres[g.num_clases + j], tokens[i] if i < n else None)
+        return i, derecha
+
+def parse_ll1(tokens, fuente=None, errores=None):
+    """Atajo: (AST, errores) de AnalizadorLL1"""
+    analizador = AnalizadorLL1(tokens, fuente, errores)
+    return analizador.parse(), analizador.errores
@@ -2,6 +2,7 @@
 Intérprete de Código P (P-code)
 Ejecuta las instrucciones generadas por el compilador
 """
+import math
 
 class InterpreteP:
     def __init__(self, input_func=None, output_func=None):
@@ -100,6 +101,24 @@ class InterpreteP:
             a = self.pila.pop()
             self.pila.append(a % b)
         
+        elif opcode == 'pot':  # Potencia
+            b = self.pila.pop()
+            a = self.pila.pop()
+            try:
+                # Con enteros el resultado no desborda, pero puede tener millones de dígitos:
+                # se limita al rango de un float, como con reales
+                if isinstance(a, int) and isinstance(b, int) and abs(a) > 1 and b * math.log2(abs(a)) > 1024:
+                    raise OverflowError
+                resultado = a ** b
+            except (OverflowError, ZeroDivisionError):
+                resultado = None
+            if isinstance(resultado, (int, float)):
+                self.pila.append(resultado)
+            else:
+                # Desborde, 0 con exponente negativo o base negativa con exponente fraccionario
+                self.output_func("ERROR: Potencia inválida", end='')
+                self.pila.append(0)
+        
         # Operaciones relacionales
         elif opcode == 'les':  # Menor que
             b = self.pila.pop()
@@ -1,5 +1,5 @@
-from analisis_lexico import tokenize
-from analisis_sintactico import AnalizadorSintactico, ASTNode, Token
+from analisis_lexico import tokenize_flujo
+from analisis_sintactico import AnalizadorSintactico, ASTNode
 from analisis_semantico import AnalizadorSemantico
 
 program = '''
@@ -24,16 +24,13 @@ main {
 print('--- Fuente ---')
 print(program)
 
-tokens, lex_errors = tokenize(program)
+tokens, lex_errors = tokenize_flujo(program)
 if lex_errors:
     print('\nErrores léxicos:')
     for e in lex_errors:
         print(e)
 
-# Convert tokens to Token objects expected by parser
-token_objs = [Token(t[0], t[1], t[2], t[3]) for t in tokens]
-
-parser = AnalizadorSintactico(token_objs)
+parser = AnalizadorSintactico(tokens)
 ast = parser.parse()
 if parser.errores:
     print('\nErrores sintácticos:')
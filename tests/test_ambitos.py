@@ -0,0 +1,14 @@
+from test_codigo_p import compilar, ejecutar
+
+
+def test_direccion_reutilizada_empieza_en_cero():
+    # b ocupa la dirección que liberó a; sin inicializar debe leer 0, no el 5 que dejó a
+    codigo_p = compilar("main { if (1 == 1) { int a; a = 5; } "
+                        "if (1 == 1) { int b; int c; c = b + 2; cout << c; } }")
+    assert codigo_p[codigo_p.index("sto 1"):][:3] == ["sto 1", "ldc 0", "sto 1"]
+    assert ejecutar(codigo_p) == [2]
+
+
+def test_local_de_un_ciclo_empieza_en_cero_en_cada_vuelta():
+    codigo_p = compilar("main { int i; i = 0; while (i < 3) { int x; x = x + 5; cout << x; i = i + 1; } }")
+    assert ejecutar(codigo_p) == [5, 5, 5]
@@ -0,0 +1,64 @@
+from analisis_lexico import tokenize_flujo
+from analisis_sintactico import AnalizadorSintactico
+from analisis_semantico import AnalizadorSemantico
+from interprete_p import ejecutar_codigo_p
+
+
+def compilar(fuente):
+    """Código P del programa, sin los comentarios"""
+    tokens, _ = tokenize_flujo(fuente)
+    codigo_p = AnalizadorSemantico(AnalizadorSintactico(tokens).parse()).analizar()[5]
+    return [instruccion for instruccion in codigo_p if not instruccion.startswith(";")]
+
+
+def ejecutar(codigo_p):
+    salida = []
+    ejecutar_codigo_p(codigo_p, output_func=lambda *valores, **_: salida.extend(valores))
+    return salida
+
+
+def test_potencia():
+    codigo_p = compilar("main { int x; x = 2; x = x ^ 10; cout << x; }")
+    assert codigo_p == ["ldc 2", "sto 0", "lod 0", "ldc 10", "pot", "sto 1", "lod 1", "sto 0",
+                        "lod 0", "wr", "hlt"]
+    assert ejecutar(codigo_p) == [1024]
+
+
+def test_potencia_invalida():
+    assert ejecutar(["ldc 0", "ldc -1", "pot", "wr", "hlt"]) == ["ERROR: Potencia inválida", "false"]
+    assert ejecutar(["ldc 10", "ldc 1000", "pot", "wr", "hlt"]) == ["ERROR: Potencia inválida", "false"]
+
+
+def test_booleanos_como_constantes():
+    codigo_p = compilar("main { bool b; int x; x = 3; b = x > 2 && true; cout << b; }")
+    assert codigo_p == ["ldc 3", "sto 1", "lod 1", "ldc 2", "grt", "sto 2", "lod 2", "ldc 1", "and",
+                        "sto 3", "lod 3", "sto 0", "lod 0", "wr", "hlt"]
+    assert ejecutar(codigo_p) == ["true"]
+
+
+def test_negacion_logica():
+    codigo_p = compilar("main { bool b; bool c; b = false; c = !b; cout << c; }")
+    assert codigo_p == ["ldc 0", "sto 0", "lod 0", "ldc 0", "equ", "sto 2", "lod 2", "sto 1",
+                        "lod 1", "wr", "hlt"]
+    assert ejecutar(codigo_p) == ["true"]
+
+
+def test_constante_negativa_a_la_izquierda():
+    codigo_p = compilar("main { int x; x = 2; x = -3 - x; cout << x; }")
+    assert codigo_p == ["ldc 2", "sto 0", "ldc -3", "lod 0", "sbi", "sto 1", "lod 1", "sto 0",
+                        "lod 0", "wr", "hlt"]
+    assert ejecutar(codigo_p) == [-5]
+
+
+def test_condicion_temporal_queda_en_pila():
+    codigo_p = compilar("main { int x; x = 1; if (x < 2) { cout << x; } }")
+    assert codigo_p == ["ldc 1", "sto 0", "lod 0", "ldc 2", "les", "fjp L0", "lod 0", "wr", "lab L0",
+                        "hlt"]
+
+
+def test_variable_que_empieza_con_t_se_almacena():
+    # Antes cualquier destino que empezara con 't' seguido de un if quedaba en la pila
+    codigo_p = compilar("main { int total; total = 0; total = total + 1; if (total) { cout << total; } }")
+    assert codigo_p == ["ldc 0", "sto 0", "lod 0", "ldc 1", "adi", "sto 1", "lod 1", "sto 0",
+                        "lod 0", "fjp L0", "lod 0", "wr", "lab L0", "hlt"]
+    assert ejecutar(codigo_p) == ["true"]
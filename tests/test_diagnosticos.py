@@ -0,0 +1,27 @@
+from analisis_lexico import ArchivoFuente, tokenize_flujo
+from analisis_sintactico import AnalizadorSintactico
+from analisis_semantico import AnalizadorSemantico
+
+
+def analizar(texto):
+    fuente = ArchivoFuente(texto)
+    tokens, _ = tokenize_flujo(fuente)
+    ast = AnalizadorSintactico(tokens, fuente).parse()
+    _, errores, advertencias, *_ = AnalizadorSemantico(ast, fuente=fuente).analizar()
+    return errores, advertencias
+
+
+def test_diagnosticos_semanticos_con_desplazamiento():
+    texto = "main {\n  int x;\n  int x;\n  y = 1;\n  bool b;\n  b = !x;\n}"
+    errores, advertencias = analizar(texto)
+    offsets = {error.codigo: error.offset for error in errores}
+    assert offsets["SEM001"] == texto.index("x;\n  y")
+    assert offsets["SEM002"] == texto.index("y =")
+    assert offsets["SEM007"] == texto.index("!x")
+    assert all(advertencia.offset is not None for advertencia in advertencias)
+
+
+def test_sin_fuente_no_hay_desplazamiento():
+    tokens, _ = tokenize_flujo("main { y = 1; }")
+    errores = AnalizadorSemantico(AnalizadorSintactico(tokens).parse()).analizar()[1]
+    assert [error.offset for error in errores] == [None]
@@ -0,0 +1,35 @@
+import os
+
+from analisis_lexico import tokenize_flujo
+from analisis_sintactico import ASTNode
+from gramatica import parse_ll1
+
+EJEMPLO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ejemplo_prueba.txt")
+
+
+def nodos_que_no_son_ast(ast):
+    pendientes, otros = [ast], []
+    while pendientes:
+        nodo = pendientes.pop()
+        if isinstance(nodo, ASTNode):
+            pendientes.extend(nodo.hijos)
+        else:
+            otros.append(nodo)
+    return otros
+
+
+def test_error_al_final_dentro_de_una_sentencia():
+    ast, errores = parse_ll1(tokenize_flujo("main { z")[0])
+    assert errores
+    assert [hijo.tipo for hijo in ast.hijos] == ["lista_declaracion"]
+    assert nodos_que_no_son_ast(ast) == []
+
+
+def test_programa_cortado_en_cada_token():
+    # La recuperación de errores no debe dejar ningún Token en el árbol
+    with open(EJEMPLO, encoding="utf-8") as f:
+        flujo, _ = tokenize_flujo(f.read())
+    tokens = [flujo[i] for i in range(len(flujo))]
+    for cantidad in range(len(tokens) + 1):
+        ast, _ = parse_ll1(tokens[:cantidad])
+        assert nodos_que_no_son_ast(ast) == [], cantidad